@@ -1,7 +1,8 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MinValueValidator
 from apps.users.models import User
 from apps.products.models import Product, ProductVariant
+from .pricing import cart_totals
 
 
 class Cart(models.Model):
@@ -36,33 +37,66 @@ class Cart(models.Model):
     @property
     def total_items(self):
         """Get total number of items in cart."""
-        return self.items.aggregate(total=models.Sum('quantity'))['total'] or 0
+        return cart_totals(self)['total_items']
     
     @property
     def subtotal(self):
-        """Calculate cart subtotal."""
-        total = sum(item.total_price for item in self.items.all())
-        return total
+        """Calculate cart subtotal (use cart_totals() when both are needed)."""
+        return cart_totals(self)['subtotal']
+    
+    def lines(self):
+        """Quantities keyed by `(product_id, variant_id)`."""
+        if self.pk is None:
+            return {}
+        return {
+            (product_id, variant_id): quantity
+            for product_id, variant_id, quantity in self.items.values_list('product_id', 'variant_id', 'quantity')
+        }
     
     def merge_with_guest_cart(self, guest_cart):
-        """Merge guest cart items into user cart."""
-        for guest_item in guest_cart.items.all():
-            # Check if item already exists in user cart
-            try:
-                user_item = self.items.get(
-                    product=guest_item.product,
-                    variant=guest_item.variant
-                )
-                # Update quantity
-                user_item.quantity += guest_item.quantity
-                user_item.save()
-            except CartItem.DoesNotExist:
-                # Create new item in user cart
-                guest_item.cart = self
-                guest_item.save()
+        """
+        Merge guest cart items into user cart. `guest_cart` is a Cart or a
+        guest cart storage (see apps.cart.storage); existing lines are
+        updated and new ones inserted in one batch each.
+        """
+        lines = guest_cart.lines()
+        if lines:
+            # Guest carts outside the database may still hold deleted products
+            product_ids = set(Product.objects.filter(
+                pk__in={product_id for product_id, _ in lines}
+            ).values_list('pk', flat=True))
+            variant_ids = set(ProductVariant.objects.filter(
+                pk__in={variant_id for _, variant_id in lines if variant_id is not None}
+            ).values_list('pk', flat=True))
+            lines = {
+                (product_id, variant_id): quantity
+                for (product_id, variant_id), quantity in lines.items()
+                if product_id in product_ids and (variant_id is None or variant_id in variant_ids)
+            }
         
-        # Delete guest cart
-        guest_cart.delete()
+        with transaction.atomic():
+            existing = {
+                (item.product_id, item.variant_id): item
+                for item in self.items.filter(product_id__in={product_id for product_id, _ in lines})
+            } if lines else {}
+            updated = []
+            created = []
+            for (product_id, variant_id), quantity in lines.items():
+                item = existing.get((product_id, variant_id))
+                if item:
+                    item.quantity += quantity
+                    updated.append(item)
+                else:
+                    created.append(CartItem(cart=self, product_id=product_id, variant_id=variant_id, quantity=quantity))
+            CartItem.objects.bulk_update(updated, ['quantity'])
+            CartItem.objects.bulk_create(created)
+            
+            if isinstance(guest_cart, Cart):
+                guest_cart.delete()
+            else:
+                # Storages may live outside the database (Redis), drop them
+                # only once the merged lines are committed
+                transaction.on_commit(guest_cart.delete)
 
 
 class CartItem(models.Model):
@@ -0,0 +1,73 @@
+"""
+Cart pricing in SQL.
+
+A line's unit price is its variant's price (the variant product's price
+plus `price_adjustment`) or the product price, the same rule as
+`CartItem.unit_price`. `cart_totals` computes it as a query expression and
+sums item count and subtotal in one aggregate query instead of loading
+every line's product and variant. `line_totals` does the same for guest
+carts kept outside the database.
+"""
+from decimal import Decimal
+
+from django.db import models
+from django.db.models.functions import Coalesce
+
+PRICE_FIELD = models.DecimalField(max_digits=12, decimal_places=2)
+QUANTITY_FIELD = models.PositiveIntegerField()
+
+
+def unit_price():
+    return models.Case(
+        models.When(
+            variant__isnull=False,
+            then=models.F('variant__product__price') + models.F('variant__price_adjustment')
+        ),
+        default=models.F('product__price'),
+        output_field=PRICE_FIELD,
+    )
+
+
+def line_total():
+    return models.ExpressionWrapper(unit_price() * models.F('quantity'), output_field=PRICE_FIELD)
+
+
+def cart_totals(cart):
+    """`{'total_items': ..., 'subtotal': ...}` of a cart, in one query."""
+    if cart.pk is None:
+        return {'total_items': 0, 'subtotal': Decimal('0.00')}
+    return cart.items.aggregate(
+        total_items=Coalesce(models.Sum('quantity'), 0, output_field=QUANTITY_FIELD),
+        subtotal=Coalesce(models.Sum(line_total()), Decimal('0.00'), output_field=PRICE_FIELD),
+    )
+
+
+def line_totals(lines):
+    """
+    cart_totals() for `{(product_id, variant_id): quantity}` lines, with one
+    query for products and one for variants. Lines of deleted products or
+    variants are left out.
+    """
+    from apps.products.models import Product, ProductVariant
+    
+    product_ids = {product_id for product_id, variant_id in lines if variant_id is None}
+    variant_ids = {variant_id for _, variant_id in lines if variant_id is not None}
+    product_prices = dict(
+        Product.objects.filter(pk__in=product_ids).values_list('pk', 'price')
+    ) if product_ids else {}
+    variant_prices = dict(
+        ProductVariant.objects.filter(pk__in=variant_ids).values_list(
+            'pk', models.F('product__price') + models.F('price_adjustment')
+        )
+    ) if variant_ids else {}
+    
+    total_items, subtotal = 0, Decimal('0.00')
+    for (product_id, variant_id), quantity in lines.items():
+        if variant_id is None:
+            price = product_prices.get(product_id)
+        else:
+            price = variant_prices.get(variant_id)
+        if price is not None:
+            total_items += quantity
+            subtotal += price * quantity
+    return {'total_items': total_items, 'subtotal': subtotal}
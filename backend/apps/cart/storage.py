@@ -0,0 +1,187 @@
+"""
+Cart storage backends.
+
+Carts of authenticated users are `Cart`/`CartItem` rows. Guest carts use
+the backend named by CART_GUEST_STORAGE: `RedisCartStorage` keeps them in
+one Redis hash per guest that expires GUEST_CART_TTL seconds after the
+last change, so anonymous browsing writes no database rows at all. On
+login or registration `merge_guest_cart` moves the guest cart into the
+user's `Cart` with one batched write and drops it.
+
+A guest is identified by a cart token when the request has one, and by
+the session otherwise. API clients authenticating with JWT have no
+session: they keep a random token (e.g. from `new_cart_token()`) and send
+it in the X-Cart-Token header with every cart request and with login or
+registration, where a `cart_token` field works as well.
+
+Every backend exposes the same methods, with cart lines keyed by
+`(product_id, variant_id)`; `variant_id` is None for products without
+variants. The cart endpoint itself is still to be implemented: it should
+use `DatabaseCartStorage.for_user()` for authenticated requests and
+`get_guest_cart_storage(guest_cart_key(request))` for guests.
+"""
+import re
+import secrets
+
+from django.conf import settings
+from django.db import models
+from django.utils.module_loading import import_string
+
+from apps.core.redis import get_redis
+
+from .models import Cart, CartItem
+from .pricing import cart_totals, line_totals
+
+GUEST_CART_KEY = 'cart:guest:{}'
+CART_TOKEN_HEADER = 'X-Cart-Token'
+CART_TOKEN_FIELD = 'cart_token'
+CART_TOKEN_PATTERN = re.compile(r'[A-Za-z0-9_-]{22,64}')
+
+
+class DatabaseCartStorage:
+    """Cart rows; guest carts are only created on their first write."""
+    
+    def __init__(self, cart):
+        self.cart = cart
+    
+    @classmethod
+    def for_session(cls, key):
+        return cls(Cart.objects.filter(session_key=key).first() or Cart(session_key=key))
+    
+    @classmethod
+    def for_user(cls, user):
+        cart, _ = Cart.objects.get_or_create(user=user)
+        return cls(cart)
+    
+    def lines(self):
+        return self.cart.lines()
+    
+    def totals(self):
+        return cart_totals(self.cart)
+    
+    def add(self, product_id, variant_id=None, quantity=1):
+        self._save_cart()
+        item, created = CartItem.objects.get_or_create(
+            cart=self.cart,
+            product_id=product_id,
+            variant_id=variant_id,
+            defaults={'quantity': quantity}
+        )
+        if not created:
+            CartItem.objects.filter(pk=item.pk).update(quantity=models.F('quantity') + quantity)
+    
+    def set_quantity(self, product_id, variant_id, quantity):
+        """Set a line's quantity, 0 removes it."""
+        if quantity <= 0:
+            if self.cart.pk:
+                self.cart.items.filter(product_id=product_id, variant_id=variant_id).delete()
+            return
+        self._save_cart()
+        CartItem.objects.update_or_create(
+            cart=self.cart,
+            product_id=product_id,
+            variant_id=variant_id,
+            defaults={'quantity': quantity}
+        )
+    
+    def clear(self):
+        if self.cart.pk:
+            self.cart.items.all().delete()
+    
+    def delete(self):
+        if self.cart.pk:
+            self.cart.delete()
+    
+    def _save_cart(self):
+        if self.cart.pk is None:
+            self.cart.save()
+
+
+class RedisCartStorage:
+    """
+    Guest cart in a Redis hash of `"product_id:variant_id"` -> quantity.
+    Falls back to DatabaseCartStorage when the cache is not Redis backed.
+    """
+    
+    def __init__(self, key, redis):
+        self.key = GUEST_CART_KEY.format(key)
+        self.redis = redis
+    
+    @classmethod
+    def for_session(cls, key):
+        """The guest cart of a guest_cart_key()."""
+        redis = get_redis()
+        if redis is None:
+            return DatabaseCartStorage.for_session(key)
+        return cls(key, redis)
+    
+    def lines(self):
+        lines = {}
+        for field, quantity in self.redis.hgetall(self.key).items():
+            product_id, _, variant_id = field.decode().partition(':')
+            if int(quantity) > 0:
+                lines[int(product_id), int(variant_id) if variant_id else None] = int(quantity)
+        return lines
+    
+    def totals(self):
+        return line_totals(self.lines())
+    
+    def add(self, product_id, variant_id=None, quantity=1):
+        pipeline = self.redis.pipeline()
+        pipeline.hincrby(self.key, self._field(product_id, variant_id), quantity)
+        pipeline.expire(self.key, settings.GUEST_CART_TTL)
+        pipeline.execute()
+    
+    def set_quantity(self, product_id, variant_id, quantity):
+        """Set a line's quantity, 0 removes it."""
+        pipeline = self.redis.pipeline()
+        if quantity <= 0:
+            pipeline.hdel(self.key, self._field(product_id, variant_id))
+        else:
+            pipeline.hset(self.key, self._field(product_id, variant_id), quantity)
+        pipeline.expire(self.key, settings.GUEST_CART_TTL)
+        pipeline.execute()
+    
+    def clear(self):
+        self.redis.delete(self.key)
+    
+    delete = clear
+    
+    @staticmethod
+    def _field(product_id, variant_id):
+        return f"{product_id}:{variant_id or ''}"
+
+
+def new_cart_token():
+    return secrets.token_urlsafe(24)
+
+
+def guest_cart_key(request):
+    """
+    Key of the request's guest cart: its cart token, else its session key.
+    Malformed tokens are ignored. None when there is neither.
+    """
+    token = request.headers.get(CART_TOKEN_HEADER)
+    if token is None:
+        data = getattr(request, 'data', None)
+        token = data.get(CART_TOKEN_FIELD) if isinstance(data, dict) else None
+    if isinstance(token, str) and CART_TOKEN_PATTERN.fullmatch(token):
+        # Apart from session keys, which are lowercase letters and digits
+        return f'token:{token}'
+    return request.session.session_key
+
+
+def get_guest_cart_storage(key):
+    return import_string(settings.CART_GUEST_STORAGE).for_session(key)
+
+
+def merge_guest_cart(request, user):
+    """Move the request's guest cart, if any, into the cart of `user`."""
+    key = guest_cart_key(request)
+    if not key:
+        return
+    
+    guest_cart = get_guest_cart_storage(key)
+    if guest_cart.lines():
+        cart, _ = Cart.objects.get_or_create(user=user)
+        cart.merge_with_guest_cart(guest_cart)
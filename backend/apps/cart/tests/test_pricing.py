@@ -0,0 +1,65 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from apps.cart.models import Cart, CartItem
+from apps.cart.pricing import cart_totals, line_total, line_totals, unit_price
+from apps.products.models import ProductVariant
+from apps.products.tests.factories import create_product, create_user
+
+
+class CartPricingTests(TestCase):
+
+    def setUp(self):
+        self.cart = Cart.objects.create(user=create_user())
+        on_sale = create_product(price=Decimal('80.00'), compare_at_price=Decimal('100.00'))
+        with_variants = create_product(price=Decimal('20.00'))
+        larger = ProductVariant.objects.create(
+            product=with_variants, name='Large', sku='VAR-L', price_adjustment=Decimal('5.50')
+        )
+        smaller = ProductVariant.objects.create(
+            product=with_variants, name='Small', sku='VAR-S', price_adjustment=Decimal('-2.25')
+        )
+        removed = create_product(price=Decimal('9.99'))
+        
+        CartItem.objects.create(cart=self.cart, product=on_sale, quantity=2)
+        CartItem.objects.create(cart=self.cart, product=with_variants, variant=larger, quantity=3)
+        CartItem.objects.create(cart=self.cart, product=with_variants, variant=smaller, quantity=1)
+        # The model validator is not enforced on save
+        CartItem.objects.create(cart=self.cart, product=removed, quantity=0)
+    
+    def test_line_prices_match_python(self):
+        items = self.cart.items.annotate(sql_unit_price=unit_price(), sql_line_total=line_total())
+        expected = {
+            Decimal('80.00'): Decimal('160.00'),
+            Decimal('25.50'): Decimal('76.50'),
+            Decimal('17.75'): Decimal('17.75'),
+            Decimal('9.99'): Decimal('0.00'),
+        }
+        self.assertEqual(len(items), len(expected))
+        for item in items:
+            with self.subTest(item=item):
+                self.assertEqual(item.sql_unit_price, item.unit_price)
+                self.assertEqual(item.sql_line_total, item.total_price)
+                self.assertEqual(expected[item.unit_price], item.total_price)
+    
+    def test_totals_match_python(self):
+        items = list(self.cart.items.select_related('product', 'variant__product'))
+        expected = {
+            'total_items': sum(item.quantity for item in items),
+            'subtotal': sum(item.total_price for item in items),
+        }
+        self.assertEqual(expected, {'total_items': 6, 'subtotal': Decimal('254.25')})
+        
+        with self.assertNumQueries(1):
+            self.assertEqual(cart_totals(self.cart), expected)
+        self.assertEqual(self.cart.total_items, 6)
+        self.assertEqual(self.cart.subtotal, Decimal('254.25'))
+        self.assertEqual(line_totals(self.cart.lines()), expected)
+    
+    def test_empty_carts(self):
+        empty = {'total_items': 0, 'subtotal': Decimal('0.00')}
+        with self.assertNumQueries(0):
+            self.assertEqual(cart_totals(Cart(session_key='unsaved')), empty)
+        self.assertEqual(cart_totals(Cart.objects.create(session_key='saved')), empty)
+        self.assertEqual(line_totals({}), empty)
@@ -0,0 +1,125 @@
+from types import SimpleNamespace
+from unittest import SkipTest
+
+import redis
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.cache import SessionStore
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.cart.models import Cart
+from apps.cart.storage import (
+    CART_TOKEN_HEADER, DatabaseCartStorage, RedisCartStorage, get_guest_cart_storage,
+    guest_cart_key, new_cart_token,
+)
+from apps.products.tests.factories import create_product, create_user
+
+
+def guest_request(headers=None, data=None):
+    return SimpleNamespace(
+        user=AnonymousUser(),
+        session=SessionStore(),
+        headers=headers or {},
+        data=data or {},
+    )
+
+
+class GuestCartKeyTests(TestCase):
+
+    def test_token_header(self):
+        token = new_cart_token()
+        self.assertEqual(guest_cart_key(guest_request({CART_TOKEN_HEADER: token})), f'token:{token}')
+    
+    def test_token_field(self):
+        token = new_cart_token()
+        self.assertEqual(guest_cart_key(guest_request(data={'cart_token': token})), f'token:{token}')
+    
+    def test_session(self):
+        request = guest_request()
+        self.assertIsNone(guest_cart_key(request))
+        
+        request.session.save()
+        self.assertEqual(guest_cart_key(request), request.session.session_key)
+    
+    def test_malformed_token_is_ignored(self):
+        for token in ('short', 'a' * 65, 'x' * 30 + ':*', ['x' * 30]):
+            with self.subTest(token=token):
+                self.assertIsNone(guest_cart_key(guest_request(data={'cart_token': token})))
+
+
+class MergeGuestCartTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient(SERVER_NAME='localhost', REMOTE_ADDR='10.0.0.1')
+        self.user = create_user(email='buyer@example.com')
+        self.product = create_product()
+        self.token = new_cart_token()
+    
+    def add_as_guest(self, quantity):
+        storage = get_guest_cart_storage(guest_cart_key(guest_request({CART_TOKEN_HEADER: self.token})))
+        storage.add(self.product.pk, quantity=quantity)
+    
+    def user_lines(self):
+        return Cart.objects.get(user=self.user).lines()
+    
+    def test_login_with_token_header(self):
+        self.add_as_guest(2)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/api/auth/login/',
+                {'email': 'buyer@example.com', 'password': 'password'},
+                format='json',
+                HTTP_X_CART_TOKEN=self.token,
+            )
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.user_lines(), {(self.product.pk, None): 2})
+        self.assertFalse(Cart.objects.filter(session_key=f'token:{self.token}').exists())
+    
+    def test_register_with_token_field(self):
+        self.add_as_guest(1)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/auth/register/', {
+                'email': 'new@example.com',
+                'username': 'new',
+                'password': 'Unguessable-Pass-42',
+                'password2': 'Unguessable-Pass-42',
+                'first_name': 'New',
+                'last_name': 'Buyer',
+                'cart_token': self.token,
+            }, format='json')
+        
+        self.assertEqual(response.status_code, 201, response.data)
+        cart = Cart.objects.get(user__email='new@example.com')
+        self.assertEqual(cart.lines(), {(self.product.pk, None): 1})
+
+
+class RedisGuestCartTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.redis = redis.Redis()
+        try:
+            cls.redis.ping()
+        except redis.ConnectionError:
+            raise SkipTest('Needs a Redis server on localhost')
+    
+    def test_guest_cart_is_dropped_after_commit(self):
+        product = create_product()
+        user = create_user()
+        guest_cart = RedisCartStorage(f'token:{new_cart_token()}', self.redis)
+        self.addCleanup(guest_cart.clear)
+        guest_cart.add(product.pk, quantity=3)
+        
+        with self.captureOnCommitCallbacks() as callbacks:
+            Cart.objects.create(user=user).merge_with_guest_cart(guest_cart)
+            # Kept until the merged lines are committed
+            self.assertEqual(guest_cart.lines(), {(product.pk, None): 3})
+        
+        for callback in callbacks:
+            callback()
+        self.assertEqual(guest_cart.lines(), {})
+        self.assertEqual(DatabaseCartStorage.for_user(user).lines(), {(product.pk, None): 3})
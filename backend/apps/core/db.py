@@ -0,0 +1,134 @@
+"""
+Bulk write helpers
+"""
+from django.db import connections, models
+
+
+def bulk_increment(model, field, deltas, key='pk', batch_size=1000, using='default'):
+    """
+    Add per-row deltas to a numeric column: `deltas` maps values of `key`
+    (the primary key by default, or any unique column) to the amount to add.
+    
+    On PostgreSQL every batch is a single `UPDATE ... FROM (VALUES ...)`,
+    other databases get an equivalent `CASE` expression. The column is
+    incremented in place, so concurrent writers never lose updates.
+    Returns the number of rows updated.
+    """
+    items = [(value, delta) for value, delta in deltas.items() if delta]
+    if not items:
+        return 0
+    
+    connection = connections[using]
+    updated = 0
+    for start in range(0, len(items), batch_size):
+        batch = items[start:start + batch_size]
+        if connection.vendor == 'postgresql':
+            updated += _increment_from_values(connection, model, field, key, batch)
+        else:
+            updated += model._default_manager.using(using).filter(
+                **{f'{key}__in': [value for value, _ in batch]}
+            ).update(**{field: models.F(field) + models.Case(
+                *[models.When(**{key: value, 'then': models.Value(delta)}) for value, delta in batch],
+                default=models.Value(0),
+                output_field=model._meta.get_field(field),
+            )})
+    return updated
+
+
+def _increment_from_values(connection, model, field, key, batch):
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    column = quote(model._meta.get_field(field).column)
+    key_field = model._meta.pk if key == 'pk' else model._meta.get_field(key)
+    key_column = quote(key_field.column)
+    values = ', '.join(['(%s, %s)'] * len(batch))
+    sql = (
+        f'UPDATE {table} SET {column} = {table}.{column} + v.delta '
+        f'FROM (VALUES {values}) AS v(id, delta) '
+        f'WHERE {table}.{key_column} = v.id'
+    )
+    params = [value for row in batch for value in row]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+def bulk_update_from_values(model, rows, fields, key='pk', filters=None, constants=None,
+                            batch_size=1000, using='default'):
+    """
+    Write per-row values: `rows` maps values of `key` to dicts holding a
+    value for every name in `fields`. Only rows also matching the equality
+    `filters` are written, and `constants` are assigned to all of them.
+    
+    On PostgreSQL every batch is a single `UPDATE ... FROM (VALUES ...)`,
+    other databases get a `CASE` expression per field. Returns a dict of
+    updated `key` values to primary keys.
+    """
+    items = list(rows.items())
+    filters = filters or {}
+    constants = constants or {}
+    connection = connections[using]
+    updated = {}
+    for start in range(0, len(items), batch_size):
+        batch = items[start:start + batch_size]
+        if connection.vendor == 'postgresql':
+            updated.update(_update_from_values(connection, model, fields, key, filters, constants, batch))
+            continue
+        
+        queryset = model._default_manager.using(using).filter(
+            **{f'{key}__in': [value for value, _ in batch]}, **filters
+        )
+        matched = dict(queryset.values_list(key, 'pk'))
+        if not matched:
+            continue
+        assignments = {
+            field: models.Case(
+                *[models.When(**{key: value, 'then': models.Value(row[field])}) for value, row in batch],
+                default=models.F(field),
+                output_field=model._meta.get_field(field),
+            )
+            for field in fields
+        }
+        queryset.filter(**{f'{key}__in': list(matched)}).update(**assignments, **constants)
+        updated.update(matched)
+    return updated
+
+
+def _update_from_values(connection, model, fields, key, filters, constants, batch):
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    key_field = model._meta.pk if key == 'pk' else model._meta.get_field(key)
+    model_fields = [model._meta.get_field(field) for field in fields]
+    
+    # VALUES parameters are untyped, cast them to the column types
+    casts = [f'CAST(%s AS {field.db_type(connection)})' for field in [key_field, *model_fields]]
+    values = ', '.join([f"({', '.join(casts)})"] * len(batch))
+    aliases = ', '.join(['_key', *[f'_v{index}' for index in range(len(model_fields))]])
+    assignments = [
+        f'{quote(field.column)} = v._v{index}' for index, field in enumerate(model_fields)
+    ]
+    params = []
+    for name, value in constants.items():
+        field = model._meta.get_field(name)
+        assignments.append(f'{quote(field.column)} = %s')
+        params.append(field.get_db_prep_save(value, connection))
+    
+    for value, row in batch:
+        params.append(key_field.get_db_prep_save(value, connection))
+        params.extend(field.get_db_prep_save(row[field.name], connection) for field in model_fields)
+    
+    conditions = [f'{table}.{quote(key_field.column)} = v._key']
+    for name, value in filters.items():
+        field = model._meta.get_field(name)
+        conditions.append(f'{table}.{quote(field.column)} = %s')
+        params.append(field.get_db_prep_value(value, connection))
+    
+    sql = (
+        f"UPDATE {table} SET {', '.join(assignments)} "
+        f'FROM (VALUES {values}) AS v({aliases}) '
+        f"WHERE {' AND '.join(conditions)} "
+        f'RETURNING {table}.{quote(key_field.column)}, {table}.{quote(model._meta.pk.column)}'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return dict(cursor.fetchall())
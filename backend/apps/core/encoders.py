@@ -0,0 +1,132 @@
+"""
+Serializer-compatible encoding of `.values()` rows
+"""
+import threading
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import fields as drf_fields
+from rest_framework import relations
+
+# Fields whose to_representation() returns database values unchanged
+PASSTHROUGH_FIELDS = (
+    drf_fields.CharField,
+    drf_fields.IntegerField,
+    drf_fields.BooleanField,
+    drf_fields.ChoiceField,
+    relations.PrimaryKeyRelatedField,
+)
+
+# Compiled encoders by serializer class and field names. `?fields=` and
+# `?omit=` let clients ask for any subset, so only the most recently used
+# ones are kept.
+ENCODER_CACHE_SIZE = 64
+_encoders = OrderedDict()
+_encoders_lock = threading.Lock()
+
+
+class RowEncoder:
+    """
+    Turns flat `.values()` rows into the dicts a ModelSerializer would
+    produce for the same objects, without instantiating models or running
+    DRF field lookups.
+    
+    The encoder is generated once per serializer class and field set (the
+    last `ENCODER_CACHE_SIZE` are kept): each field becomes one expression
+    in a compiled function, model properties listed in the serializer's
+    `field_dependencies` are evaluated against just their dependency
+    columns. Serializers with nested, method or hyperlinked fields are not
+    supported (`for_serializer` returns None).
+    """
+    
+    def __init__(self, columns, encode_row):
+        self.columns = columns
+        self.encode_row = encode_row
+    
+    def encode(self, rows):
+        encode_row = self.encode_row
+        return [encode_row(row) for row in rows]
+    
+    @classmethod
+    def for_serializer(cls, serializer):
+        key = (type(serializer), tuple(serializer.fields))
+        with _encoders_lock:
+            if key in _encoders:
+                _encoders.move_to_end(key)
+                return _encoders[key]
+        
+        encoder = cls.compile(serializer)
+        with _encoders_lock:
+            _encoders[key] = encoder
+            while len(_encoders) > ENCODER_CACHE_SIZE:
+                _encoders.popitem(last=False)
+        return encoder
+    
+    @classmethod
+    def compile(cls, serializer):
+        model = serializer.Meta.model
+        opts = model._meta
+        dependencies = getattr(serializer, 'field_dependencies', {})
+        namespace = {'Row': SimpleNamespace}
+        columns = []
+        lines = ['def encode_row(row):', '    data = {}']
+        
+        for index, (name, field) in enumerate(serializer.fields.items()):
+            if field.write_only:
+                continue
+            if isinstance(field, drf_fields.SerializerMethodField) or getattr(field, 'many', False):
+                return None
+            if not isinstance(field, drf_fields.Field) or isinstance(field, relations.HyperlinkedRelatedField):
+                return None
+            if hasattr(field, 'fields'):
+                # Nested serializer
+                return None
+            
+            if isinstance(field, relations.PrimaryKeyRelatedField) and field.pk_field is not None:
+                return None
+            
+            convert = f'convert_{index}'
+            namespace[convert] = field.to_representation
+            passthrough = type(field) in PASSTHROUGH_FIELDS
+            
+            if name in dependencies:
+                # Model property, evaluated on its dependency columns only
+                prop = getattr(model, field.source, None)
+                if not isinstance(prop, property):
+                    return None
+                getter = f'getter_{index}'
+                namespace[getter] = prop.fget
+                columns.extend(dependencies[name])
+                args = ', '.join(f'{column}=row[{column!r}]' for column in dependencies[name])
+                lines.append(f'    value = {getter}(Row({args}))')
+            elif '.' in field.source:
+                relation, attribute = field.source.split('.', 1)
+                if '.' in attribute:
+                    return None
+                relation_field = opts.get_field(relation)
+                if not relation_field.many_to_one and not relation_field.one_to_one:
+                    return None
+                column = f'{relation}__{attribute}'
+                columns.extend([relation, column])
+                # A missing related object makes DRF skip the field
+                lines.append(f'    if row[{relation!r}] is not None:')
+                lines.append(f'        value = row[{column!r}]')
+                lines.append(f'        data[{name!r}] = value if value is None else {convert}(value)')
+                continue
+            else:
+                try:
+                    opts.get_field(field.source)
+                except FieldDoesNotExist:
+                    return None
+                columns.append(field.source)
+                lines.append(f'    value = row[{field.source!r}]')
+            
+            if passthrough:
+                lines.append(f'    data[{name!r}] = value')
+            else:
+                lines.append(f'    data[{name!r}] = value if value is None else {convert}(value)')
+        
+        lines.append('    return data')
+        exec('\n'.join(lines), namespace)
+        return cls(list(dict.fromkeys(columns)), namespace['encode_row'])
@@ -0,0 +1,103 @@
+import datetime
+import statistics
+import time
+import uuid
+from decimal import Decimal
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from apps.core.parsers import ORJSONParser
+from apps.core.renderers import ORJSONRenderer
+from apps.orders.models import Order
+from apps.orders.serializers import OrderSerializer
+from apps.products.models import Product
+from apps.products.serializers import ProductDetailSerializer, ProductListSerializer
+
+
+class Command(BaseCommand):
+    help = 'Check that ORJSONRenderer/ORJSONParser match the DRF JSON classes byte for byte and time both'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Runs per payload, the median is reported',
+        )
+    
+    def handle(self, *args, **options):
+        stdlib_renderer, orjson_renderer = JSONRenderer(), ORJSONRenderer()
+        stdlib_parser, orjson_parser = JSONParser(), ORJSONParser()
+        mismatches = 0
+        
+        self.stdout.write(
+            f"{'payload':<22} {'bytes':>9} {'json ms':>9} {'orjson ms':>10} {'speedup':>8}  result"
+        )
+        for name, data in self.get_payloads():
+            expected = stdlib_renderer.render(data)
+            rendered = orjson_renderer.render(data)
+            parsed_equal = (
+                stdlib_parser.parse(BytesIO(expected)) == orjson_parser.parse(BytesIO(expected))
+            )
+            identical = expected == rendered and parsed_equal
+            if not identical:
+                mismatches += 1
+            
+            slow = self._measure(lambda: stdlib_renderer.render(data), options['repeat'])
+            fast = self._measure(lambda: orjson_renderer.render(data), options['repeat'])
+            line = (
+                f'{name:<22} {len(expected):>9} {slow:>9.3f} {fast:>10.3f} {slow / fast:>7.1f}x  '
+                f"{'identical' if identical else 'DIFFERENT'}"
+            )
+            self.stdout.write(self.style.SUCCESS(line) if identical else self.style.ERROR(line))
+            if expected != rendered:
+                self.stdout.write(f'  json:   {expected[:300]!r}')
+                self.stdout.write(f'  orjson: {rendered[:300]!r}')
+        
+        if mismatches:
+            self.stdout.write(self.style.ERROR(f'{mismatches} payloads differ'))
+        else:
+            self.stdout.write(self.style.SUCCESS('All payloads identical'))
+    
+    def get_payloads(self):
+        products = Product.objects.with_stock_status().select_related('category', 'seller').defer('search_vector')
+        orders = Order.objects.prefetch_related('items')
+        now = timezone.now()
+        
+        yield 'edge cases', {
+            'decimal': Decimal('19.99'),
+            'decimal_int': Decimal('10'),
+            'utc_datetime': now,
+            'utc_datetime_no_us': now.replace(microsecond=0),
+            'moscow_datetime': timezone.localtime(now, datetime.timezone(datetime.timedelta(hours=3))),
+            'naive_datetime': datetime.datetime(2024, 2, 29, 12, 30, 5, 123),
+            'date': datetime.date(2024, 2, 29),
+            'time': datetime.time(23, 59, 1, 500),
+            'timedelta': datetime.timedelta(hours=1, microseconds=5),
+            'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'lazy': gettext_lazy('Products'),
+            'unicode': 'Привет, мир ✓ 🛒 "quoted" \\    \x01',
+            'floats': [0.1, 1.5, -2.25, 1e16, 123456.789],
+            'int_keys': {1: 'one', 2: 'two'},
+            'nested': [(1, 2), {'a': [None, True, False]}],
+            'bytes': b'raw',
+            'big_int': 2 ** 70,
+        }
+        yield 'product list (500)', ProductListSerializer(list(products[:500]), many=True).data
+        product = products.prefetch_related('images').first()
+        if product is not None:
+            yield 'product detail', ProductDetailSerializer(product).data
+        yield 'order list (200)', OrderSerializer(list(orders[:200]), many=True).data
+    
+    @staticmethod
+    def _measure(func, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
@@ -0,0 +1,201 @@
+"""
+Shared view mixins
+"""
+import hashlib
+from datetime import datetime
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from .encoders import RowEncoder
+from .serializers import SparseFieldsetMixin
+
+
+class ConditionalGetMixin:
+    """
+    ETag and Last-Modified validators for `retrieve` (and optionally `list`)
+    on model viewsets.
+    
+    Validators are read with one narrow `values_list()` query over
+    `conditional_fields`, so a matching If-None-Match / If-Modified-Since
+    returns 304 before the object is loaded and serialized. List this way
+    every column whose change is visible in the response and is written
+    without touching `updated_at` (counters updated with F() expressions);
+    entries may also be expressions such as `Max('images__updated_at')`.
+    Last-Modified is only sent when every validator is a timestamp, a
+    counter or row count change would not move it and a client revalidating
+    with If-Modified-Since alone would keep a stale copy.
+    
+    With `conditional_list = True` the list endpoint is validated by the
+    latest `updated_at` and the row count of the filtered queryset (ETag
+    only, see above). Anonymous lists of views with a response cache
+    (`get_list_cache_key`) are validated by the cache key instead, so a
+    cache hit or a 304 costs no query.
+    
+    Only use on viewsets without object-level permission checks: a 304 is
+    returned without calling `get_object()`.
+    """
+    conditional_fields = ('updated_at',)
+    conditional_list = False
+    
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+            values = queryset.prefetch_related(None).values_list(*self.conditional_fields).order_by().first()
+        except (TypeError, ValueError, ValidationError):
+            # Malformed lookup value, get_object() answers it with a 404
+            values = None
+        if values is None:
+            return super().retrieve(request, *args, **kwargs)
+        return self._conditional_response(request, values, super().retrieve, args, kwargs)
+    
+    def list(self, request, *args, **kwargs):
+        if not self.conditional_list:
+            return super().list(request, *args, **kwargs)
+        
+        get_list_cache_key = getattr(self, 'get_list_cache_key', None)
+        if get_list_cache_key is not None and not request.user.is_authenticated:
+            # The cached page is keyed on the catalog version, which every
+            # write bumps: validating against that key needs no query
+            values = (get_list_cache_key(request),)
+        else:
+            stats = self.filter_queryset(self.get_queryset()).prefetch_related(None).order_by().aggregate(
+                last_modified=Max('updated_at'), total=Count('pk')
+            )
+            values = (stats['last_modified'], stats['total'], request.META.get('QUERY_STRING', ''))
+        return self._conditional_response(request, values, super().list, args, kwargs)
+    
+    def _conditional_response(self, request, values, handler, args, kwargs):
+        renderer = getattr(request, 'accepted_renderer', None)
+        payload = repr((self.__class__.__name__, getattr(renderer, 'format', None), values))
+        etag = '"%s"' % hashlib.sha1(payload.encode('utf-8')).hexdigest()
+        
+        timestamps = [value for value in values if isinstance(value, datetime)]
+        last_modified = None
+        if timestamps and all(value is None or isinstance(value, datetime) for value in values):
+            last_modified = int(max(timestamps).timestamp())
+        
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class SparseFieldsetQuerysetMixin:
+    """
+    Restricts the queryset to the columns used by the fields a
+    `SparseFieldsetMixin` serializer keeps for the current request.
+    
+    Concrete fields and `relation.attribute` sources are loaded with
+    `.only()` (relations through `select_related`), ordering columns are
+    kept for the paginator, and prefetches of omitted reverse relations are
+    dropped. If any field cannot be mapped to columns the queryset is left
+    unchanged.
+    """
+    
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method not in ('GET', 'HEAD'):
+            return queryset
+        if not self.request.query_params.keys() & {'fields', 'omit'}:
+            return queryset
+        serializer = self.get_serializer()
+        if not isinstance(serializer, SparseFieldsetMixin):
+            return queryset
+        return self._restrict_queryset(queryset, serializer)
+    
+    def _restrict_queryset(self, queryset, serializer):
+        opts = queryset.model._meta
+        columns = {opts.pk.name}
+        related = {}
+        many = set()
+        
+        sources = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if name in serializer.field_dependencies:
+                sources.extend(serializer.field_dependencies[name])
+            else:
+                sources.append(field.source)
+        ordering = queryset.query.order_by or opts.ordering
+        for term in ordering:
+            if isinstance(term, str) and term.lstrip('-') not in ('?', 'pk') + tuple(queryset.query.annotations):
+                sources.append(term.lstrip('-'))
+        
+        for source in sources:
+            parts = source.split('.') if '.' in source else source.split('__')
+            try:
+                model_field = opts.get_field(parts[0])
+            except FieldDoesNotExist:
+                # Property or method without declared dependencies
+                return queryset
+            if model_field.many_to_many or model_field.one_to_many:
+                many.add(model_field.name)
+            elif not model_field.concrete:
+                # Reverse one-to-one, loaded from the other table
+                continue
+            elif model_field.is_relation and len(parts) > 1:
+                columns.add(model_field.name)
+                related.setdefault(model_field.name, set()).add(parts[1])
+            else:
+                columns.add(model_field.name)
+        
+        only = list(columns)
+        for relation, attributes in related.items():
+            related_opts = opts.get_field(relation).related_model._meta
+            for attribute in attributes:
+                try:
+                    related_opts.get_field(attribute)
+                except FieldDoesNotExist:
+                    return queryset
+                only.append(f'{relation}__{attribute}')
+        
+        prefetches = [
+            lookup for lookup in queryset._prefetch_related_lookups
+            if getattr(lookup, 'prefetch_through', lookup).split('__')[0] in many
+        ]
+        return queryset.select_related(None).select_related(*related).prefetch_related(None).prefetch_related(
+            *prefetches
+        ).only(*only)
+
+
+class ValuesListMixin:
+    """
+    Serves `list` from `.values()` rows encoded by a `RowEncoder` instead of
+    model instances and the serializer. The output is identical to the
+    serializer's; serializers the encoder cannot handle use the regular path.
+    """
+    values_list_enabled = True
+    
+    def list(self, request, *args, **kwargs):
+        encoder = None
+        if self.values_list_enabled:
+            encoder = RowEncoder.for_serializer(self.get_serializer())
+        if encoder is None:
+            return super().list(request, *args, **kwargs)
+        
+        queryset = self.filter_queryset(self.get_queryset())
+        columns = list(encoder.columns)
+        # Keyset pagination reads the ordering values from the rows
+        if self.paginator is not None and hasattr(self.paginator, 'get_ordering'):
+            for term in self.paginator.get_ordering(request, queryset, self):
+                name = term.lstrip('-')
+                if name != 'pk' and name not in columns:
+                    columns.append(name)
+        rows = queryset.values(*columns)
+        
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(encoder.encode(page))
+        return Response(encoder.encode(rows))
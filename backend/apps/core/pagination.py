@@ -0,0 +1,277 @@
+"""
+Shared pagination classes
+"""
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination that works with any ordering a view allows.
+
+    The requested ordering is extended with a primary key tie-breaker and the
+    cursor stores the values of the last row seen, so every page is a single
+    indexed range scan instead of an OFFSET. The total count is only computed
+    when `?count=true` is passed. Requests that still send `?page=` are served
+    by the classic page-number pagination.
+    """
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    page_query_param = 'page'
+    ordering = '-created_at'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        if self.page_query_param in request.query_params:
+            self.legacy = PageNumberPagination()
+            self.legacy.page_size = self.page_size
+            return self.legacy.paginate_queryset(queryset, request, view)
+        self.legacy = None
+
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        self.count = None
+        if self.should_count(request):
+            self.count = queryset.count()
+
+        self.ordering = self.get_ordering(request, queryset, view)
+        position, reverse = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.get_seek_filter(position, reverse))
+
+        order_by = self.ordering
+        if reverse:
+            order_by = [self._flip(term) for term in order_by]
+
+        results = list(queryset.order_by(*order_by)[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        if reverse:
+            has_next, has_previous = position is not None, has_more
+        else:
+            has_next, has_previous = has_more, position is not None
+
+        self.next_position = self.get_position(results[-1]) if has_next and results else None
+        self.previous_position = self.get_position(results[0]) if has_previous and results else None
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                page_size = int(request.query_params[self.page_size_query_param])
+                if page_size > 0:
+                    return min(page_size, self.max_page_size)
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def should_count(self, request):
+        value = request.query_params.get(self.count_query_param, '')
+        return value.lower() in ('1', 'true', 'yes')
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Return the view's effective ordering plus a unique tie-breaker.
+        """
+        ordering = None
+        for backend in getattr(view, 'filter_backends', []):
+            if hasattr(backend, 'get_ordering'):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        if not ordering:
+            ordering = (
+                getattr(view, 'ordering', None) or
+                queryset.query.order_by or
+                queryset.model._meta.ordering or
+                self.ordering
+            )
+        if isinstance(ordering, str):
+            ordering = [ordering]
+        ordering = [term for term in ordering if isinstance(term, str) and term != '?']
+
+        pk_name = queryset.model._meta.pk.name
+        names = {term.lstrip('-') for term in ordering}
+        if not names & {'pk', pk_name}:
+            descending = bool(ordering) and ordering[0].startswith('-')
+            ordering.append(f'-{pk_name}' if descending else pk_name)
+        return ordering
+
+    def get_seek_filter(self, position, reverse):
+        """
+        Build `(a, b, id) < (x, y, z)` style row comparison as nested Q objects.
+        """
+        condition = Q()
+        equal = Q()
+        for term, value in zip(self.ordering, position):
+            name = term.lstrip('-')
+            descending = term.startswith('-') != reverse
+            lookup = 'lt' if descending else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def get_position(self, row):
+        position = []
+        for term in self.ordering:
+            value = row
+            for attr in term.lstrip('-').split('__'):
+                if isinstance(value, dict):
+                    value = value[attr]
+                else:
+                    value = getattr(value, attr)
+            position.append(getattr(value, 'pk', value))
+        return position
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+
+        try:
+            padding = '=' * (-len(encoded) % 4)
+            data = json.loads(urlsafe_b64decode(encoded + padding).decode('utf-8'))
+            values = data['p']
+            reverse = bool(data.get('r'))
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError
+            position = [
+                self._to_python(term.lstrip('-'), value)
+                for term, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if any(value is None for value in position):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, position, reverse):
+        data = {'p': [self._encode_value(value) for value in position]}
+        if reverse:
+            data['r'] = 1
+        encoded = urlsafe_b64encode(
+            json.dumps(data, separators=(',', ':')).encode('utf-8')
+        ).decode('ascii').rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if self.legacy:
+            return self.legacy.get_next_link()
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if self.legacy:
+            return self.legacy.get_previous_link()
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def get_paginated_response(self, data):
+        if self.legacy:
+            return self.legacy.get_paginated_response(data)
+
+        payload = OrderedDict()
+        if self.count is not None:
+            payload['count'] = self.count
+        payload['next'] = self.get_next_link()
+        payload['previous'] = self.get_previous_link()
+        payload['results'] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'count': {
+                    'type': 'integer',
+                    'description': f'Only present when `?{self.count_query_param}=true` is passed.',
+                },
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'previous': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page.',
+                'schema': {'type': 'integer'},
+            },
+            {
+                'name': self.count_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Include the total number of results.',
+                'schema': {'type': 'boolean'},
+            },
+        ]
+
+    @staticmethod
+    def _flip(term):
+        return term[1:] if term.startswith('-') else f'-{term}'
+
+    def _to_python(self, name, value):
+        if name == 'pk':
+            field = self.model._meta.pk
+        else:
+            try:
+                field = self.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                # Annotations (e.g. search rank) are stored as plain JSON values
+                return value
+        if field.is_relation:
+            field = field.target_field
+        return field.to_python(value)
+
+    @staticmethod
+    def _encode_value(value):
+        if isinstance(value, (datetime, date, time)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
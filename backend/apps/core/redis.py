@@ -0,0 +1,19 @@
+"""
+Access to the raw Redis client behind the default cache
+"""
+from django.conf import settings
+
+
+def get_redis(alias='default'):
+    """
+    Return the Redis client used by a django-redis cache alias.
+    
+    Returns None when the cache is not Redis backed (e.g. LocMemCache in
+    local development), so callers can fall back to a direct code path.
+    """
+    backend = settings.CACHES.get(alias, {}).get('BACKEND', '')
+    if not backend.startswith('django_redis.'):
+        return None
+    
+    from django_redis import get_redis_connection
+    return get_redis_connection(alias)
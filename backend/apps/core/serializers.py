@@ -0,0 +1,41 @@
+"""
+Shared serializer mixins
+"""
+
+
+class SparseFieldsetMixin:
+    """
+    Lets read requests choose fields with `?fields=a,b` and drop fields with
+    `?omit=c,d`.
+    
+    Unselected fields are removed when the serializer is built, so their
+    sources and methods are never evaluated. Only the top-level serializer
+    of a GET request is affected; nested serializers and writes keep all
+    fields. Use together with `SparseFieldsetQuerysetMixin` on the view to
+    also load fewer columns.
+    
+    `field_dependencies` maps fields whose source is not a model column
+    (properties, methods) to the columns they read.
+    """
+    fields_query_param = 'fields'
+    omit_query_param = 'omit'
+    field_dependencies = {}
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in ('GET', 'HEAD'):
+            return
+        
+        requested = self._parse_param(request, self.fields_query_param)
+        omitted = self._parse_param(request, self.omit_query_param)
+        if not requested and not omitted:
+            return
+        for name in list(self.fields):
+            if (requested and name not in requested) or name in omitted:
+                self.fields.pop(name)
+    
+    @staticmethod
+    def _parse_param(request, param):
+        values = request.query_params.getlist(param)
+        return {name.strip() for value in values for name in value.split(',') if name.strip()}
@@ -0,0 +1,68 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.payments.models import BalanceTransaction
+from apps.users.models import User
+
+
+class KeysetPaginationTests(TestCase):
+    url = '/api/payments/transactions/'
+    
+    def setUp(self):
+        self.user = User.objects.create_user(email='buyer@example.com', username='buyer', password='password')
+        self.client = APIClient(SERVER_NAME='localhost', REMOTE_ADDR='10.0.0.1')
+        self.client.force_authenticate(self.user)
+        
+        # Three groups of rows sharing a created_at, so pages split inside a tie
+        now = timezone.now()
+        for minutes, rows in ((0, 3), (1, 1), (2, 3)):
+            for _ in range(rows):
+                transaction = BalanceTransaction.objects.create(
+                    user=self.user,
+                    transaction_type='deposit',
+                    amount=Decimal('1.00'),
+                    balance_after=Decimal('1.00'),
+                    description='Top-up',
+                )
+                BalanceTransaction.objects.filter(pk=transaction.pk).update(
+                    created_at=now - timedelta(minutes=minutes)
+                )
+    
+    def walk(self, url, link='next'):
+        """Follow `link` cursors from `url`; returns the ids of every page."""
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append([row['id'] for row in response.data['results']])
+            url = response.data[link]
+        return pages
+    
+    def test_next_cursors_cover_every_row_once(self):
+        for ordering in ('-created_at', 'created_at'):
+            with self.subTest(ordering=ordering):
+                expected = list(
+                    BalanceTransaction.objects.order_by(ordering, ordering.replace('created_at', 'id'))
+                    .values_list('id', flat=True)
+                )
+                pages = self.walk(f'{self.url}?ordering={ordering}&page_size=2')
+                
+                self.assertEqual(len(pages), 4)
+                self.assertEqual([pk for page in pages for pk in page], expected)
+    
+    def test_previous_cursors_walk_back(self):
+        pages = self.walk(f'{self.url}?page_size=2')
+        response = self.client.get(f'{self.url}?page_size=2')
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+        
+        previous = self.walk(response.data['previous'], link='previous')
+        self.assertEqual(previous, pages[-2::-1])
+    
+    def test_invalid_cursor(self):
+        response = self.client.get(f'{self.url}?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,89 @@
+import datetime
+import decimal
+import json
+import math
+import uuid
+from zoneinfo import ZoneInfo
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from apps.core.renderers import ORJSONRenderer
+
+
+class ORJSONRendererTests(SimpleTestCase):
+
+    def assertSameOutput(self, data, accepted_media_type=None, renderer=None, expected=None):
+        renderer = renderer or ORJSONRenderer()
+        expected = expected or JSONRenderer()
+        self.assertEqual(
+            renderer.render(data, accepted_media_type),
+            expected.render(data, accepted_media_type),
+        )
+    
+    def test_same_bytes_as_drf(self):
+        values = {
+            'none': None,
+            'bool': [True, False],
+            'int': [0, -1, 2 ** 63 - 1],
+            'float': [0.1, 2.0, -0.0, 3.14, 1e15],
+            'str': 'ÿ "quoted" \\ </script> \U0001F680 \x00\x1f',
+            'line_separators': '\u2028\u2029',
+            'decimal': decimal.Decimal('12.50'),
+            'lazy': gettext_lazy('Product'),
+            'datetime_utc': datetime.datetime(2024, 1, 2, 3, 4, 5, 123456, tzinfo=datetime.timezone.utc),
+            'datetime_local': datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=ZoneInfo('Europe/Moscow')),
+            'datetime_naive': datetime.datetime(2024, 1, 2, 3, 4, 5, 120000),
+            'date': datetime.date(2024, 1, 2),
+            'time': datetime.time(3, 4, 5, 123456),
+            'timedelta': datetime.timedelta(minutes=1, seconds=5),
+            'uuid': uuid.UUID(int=5),
+            'tuple': (1, 2),
+            'bytes': b'abc',
+            'non_str_keys': {1: 'a'},
+            'nested': {'a': [None, {}, []]},
+        }
+        for name, value in values.items():
+            with self.subTest(name):
+                self.assertSameOutput({name: value})
+        self.assertSameOutput(values)
+    
+    def test_empty(self):
+        self.assertSameOutput(None)
+        self.assertSameOutput({})
+    
+    def test_parent_renders_what_orjson_cannot(self):
+        self.assertSameOutput({'big': 2 ** 64})
+        self.assertSameOutput({'a': [1, {'b': 2}]}, 'application/json; indent=4')
+    
+    def test_parent_settings(self):
+        class ASCIIRenderer(ORJSONRenderer):
+            ensure_ascii = True
+        
+        class ASCIIJSONRenderer(JSONRenderer):
+            ensure_ascii = True
+        
+        class LooseRenderer(ORJSONRenderer):
+            strict = False
+        
+        class LooseJSONRenderer(JSONRenderer):
+            strict = False
+        
+        self.assertSameOutput({'a': 'ÿ'}, renderer=ASCIIRenderer(), expected=ASCIIJSONRenderer())
+        self.assertSameOutput({'a': math.nan}, renderer=LooseRenderer(), expected=LooseJSONRenderer())
+    
+    def test_float_exponents(self):
+        # Documented difference: same values, exponents written differently
+        values = [1e-6, 1e-5, 1e16, 1.5e300, 123456789012345678.0]
+        ours = ORJSONRenderer().render(values)
+        self.assertEqual(ours, b'[1e-6,0.00001,1e16,1.5e300,1.2345678901234568e17]')
+        self.assertEqual(json.loads(ours), json.loads(JSONRenderer().render(values)))
+    
+    def test_non_finite_floats(self):
+        # Documented difference: null instead of a ValueError
+        for value in (math.nan, math.inf, -math.inf):
+            with self.subTest(value):
+                self.assertEqual(ORJSONRenderer().render([value]), b'[null]')
+                with self.assertRaises(ValueError):
+                    JSONRenderer().render([value])
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db import models, transaction
 from .models import DigitalKey, DigitalKeyDelivery
 
 
@@ -23,6 +24,39 @@ class DigitalKeyAdmin(admin.ModelAdmin):
             'fields': ('created_at',)
         }),
     )
+    
+    def get_readonly_fields(self, request, obj=None):
+        if obj is not None:
+            return self.readonly_fields + ['product']
+        return self.readonly_fields
+    
+    # Keep Product.available_keys_count in sync like the API does
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            if not change:
+                delta = 0 if obj.is_used else 1
+            elif 'is_used' in form.changed_data:
+                delta = -1 if obj.is_used else 1
+            else:
+                delta = 0
+            DigitalKey.change_available_count(obj.product_id, delta)
+    
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            super().delete_model(request, obj)
+            if not obj.is_used:
+                DigitalKey.change_available_count(obj.product_id, -1)
+    
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            unused = dict(
+                queryset.filter(is_used=False).order_by().values('product_id')
+                .annotate(total=models.Count('pk')).values_list('product_id', 'total')
+            )
+            super().delete_queryset(request, queryset)
+            for product_id, total in unused.items():
+                DigitalKey.change_available_count(product_id, -total)
 
 
 @admin.register(DigitalKeyDelivery)
@@ -1,5 +1,7 @@
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from apps.products.models import Product
+from apps.products.cache import product_data_changed
 from apps.users.models import User
 
 
@@ -37,18 +39,51 @@ class DigitalKey(models.Model):
         status = "Used" if self.is_used else "Available"
         return f"{self.product.name} - {status}"
     
+    @classmethod
+    def bulk_upload(cls, product, key_codes):
+        """
+        Create unused keys for a product and increase its available key
+        counter in the same transaction.
+        """
+        keys = [cls(product=product, key_code=code) for code in key_codes]
+        with transaction.atomic():
+            created = cls.objects.bulk_create(keys, batch_size=1000)
+            cls.change_available_count(product.pk, len(created))
+        return created
+    
+    @staticmethod
+    def change_available_count(product_id, delta):
+        """
+        Add `delta` to a product's available key counter; call it in the
+        transaction that creates, uses or deletes the keys.
+        """
+        if not delta:
+            return
+        if delta > 0:
+            Product.objects.filter(pk=product_id).update(
+                available_keys_count=models.F('available_keys_count') + delta
+            )
+        else:
+            Product.objects.filter(
+                pk=product_id,
+                available_keys_count__gte=-delta
+            ).update(available_keys_count=models.F('available_keys_count') + delta)
+        product_data_changed([product_id])
+    
     def mark_as_used(self, user, order_item=None):
         """Mark key as used and assign to user."""
-        self.is_used = True
-        self.purchased_by = user
-        self.purchased_at = models.DateTimeField(auto_now_add=True)
-        self.save()
-        
-        if order_item:
-            DigitalKeyDelivery.objects.create(
-                order_item=order_item,
-                key=self
-            )
+        with transaction.atomic():
+            self.is_used = True
+            self.purchased_by = user
+            self.purchased_at = timezone.now()
+            self.save()
+            self.change_available_count(self.product_id, -1)
+            
+            if order_item:
+                DigitalKeyDelivery.objects.create(
+                    order_item=order_item,
+                    key=self
+                )
 
 
 class DigitalKeyDelivery(models.Model):
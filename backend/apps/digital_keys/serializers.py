@@ -0,0 +1,39 @@
+from rest_framework import serializers
+from apps.products.models import Product
+from .models import DigitalKey
+
+
+class DigitalKeySerializer(serializers.ModelSerializer):
+    """Serializer for digital keys."""
+    product_name = serializers.CharField(source='product.name', read_only=True)
+    
+    class Meta:
+        model = DigitalKey
+        fields = [
+            'id', 'product', 'product_name', 'key_code', 'is_used',
+            'purchased_by', 'purchased_at', 'created_at'
+        ]
+        read_only_fields = ['id', 'is_used', 'purchased_by', 'purchased_at', 'created_at']
+    
+    def get_extra_kwargs(self):
+        extra_kwargs = super().get_extra_kwargs()
+        if self.instance is not None:
+            # Moving a key would skip both products' available key counters
+            extra_kwargs['product'] = {**extra_kwargs.get('product', {}), 'read_only': True}
+        return extra_kwargs
+
+
+class DigitalKeyBulkUploadSerializer(serializers.Serializer):
+    """Serializer for uploading many keys for one digital product."""
+    product = serializers.PrimaryKeyRelatedField(
+        queryset=Product.objects.filter(product_type='digital')
+    )
+    keys = serializers.ListField(
+        child=serializers.CharField(allow_blank=True, trim_whitespace=True),
+        allow_empty=False,
+        max_length=10000
+    )
+    
+    def validate_keys(self, value):
+        # Drop blanks and duplicates inside the upload, keeping order
+        return list(dict.fromkeys(key for key in value if key))
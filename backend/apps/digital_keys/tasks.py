@@ -0,0 +1,32 @@
+from celery import shared_task
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+@shared_task
+def reconcile_available_key_counts():
+    """
+    Rebuild Product.available_keys_count from the unused digital keys.
+    
+    Only products whose stored counter drifted are written.
+    """
+    from apps.products.models import Product
+    from apps.products.cache import product_data_changed
+    from apps.digital_keys.models import DigitalKey
+    
+    unused_keys = DigitalKey.objects.filter(
+        product=OuterRef('pk'),
+        is_used=False
+    ).order_by().values('product').annotate(total=Count('pk')).values('total')
+    expected = Coalesce(Subquery(unused_keys), 0)
+    
+    stale_ids = list(
+        Product.objects.annotate(expected_keys=expected)
+        .exclude(available_keys_count=F('expected_keys'))
+        .values_list('pk', flat=True)
+    )
+    if stale_ids:
+        Product.objects.filter(pk__in=stale_ids).update(available_keys_count=expected)
+        product_data_changed(stale_ids)
+    
+    return f"Reconciled available key counts for {len(stale_ids)} products"
@@ -1,15 +1,58 @@
 """
 Digital Keys app views
 """
+from django.db import transaction
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
 from .models import DigitalKey, DigitalKeyDelivery
+from .serializers import DigitalKeySerializer, DigitalKeyBulkUploadSerializer
 
 
 class DigitalKeyViewSet(viewsets.ModelViewSet):
-    """Digital key viewset - to be implemented"""
-    queryset = DigitalKey.objects.all()
+    """Digital key viewset"""
+    serializer_class = DigitalKeySerializer
     permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        """Staff see all keys, sellers only keys of their own products"""
+        queryset = DigitalKey.objects.select_related('product')
+        if self.request.user.is_staff:
+            return queryset
+        return queryset.filter(product__seller=self.request.user)
+    
+    def check_product_owner(self, product):
+        if not self.request.user.is_staff and product.seller_id != self.request.user.id:
+            raise PermissionDenied('You can only manage keys of your own products.')
+    
+    def perform_create(self, serializer):
+        """Create a single key and bump the product's available key counter"""
+        product = serializer.validated_data['product']
+        self.check_product_owner(product)
+        with transaction.atomic():
+            serializer.save()
+            DigitalKey.change_available_count(product.pk, 1)
+    
+    def perform_destroy(self, instance):
+        """Delete a key and keep the product's available key counter in sync"""
+        with transaction.atomic():
+            instance.delete()
+            if not instance.is_used:
+                DigitalKey.change_available_count(instance.product_id, -1)
+    
+    @action(detail=False, methods=['post'], url_path='bulk-upload')
+    def bulk_upload(self, request):
+        """Upload many keys for one digital product in a single transaction"""
+        serializer = DigitalKeyBulkUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        product = serializer.validated_data['product']
+        self.check_product_owner(product)
+        
+        created = DigitalKey.bulk_upload(product, serializer.validated_data['keys'])
+        return Response(
+            {'product': product.pk, 'created': len(created)},
+            status=status.HTTP_201_CREATED
+        )
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.10 on 2026-10-18 03:08
+
+from django.db import migrations, models
+
+
+def mark_counted_items(apps, schema_editor):
+    # Items of paid orders were already counted by the old per-item signal
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    OrderItem.objects.filter(order__payment_status='completed').update(sales_recorded=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_order_user_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='sales_recorded',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Counted in Sales Statistics'),
+        ),
+        migrations.RunPython(mark_counted_items, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,13 @@
-from django.db import models
+from collections import defaultdict
+from django.db import models, transaction
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 import uuid
-from apps.users.models import User
+from apps.core.db import bulk_increment
+from apps.users.models import SellerProfile, User
 from apps.products.models import Product, ProductVariant
+from apps.products.cache import product_data_changed
+from apps.products.trending import record_trending
 
 
 class Order(models.Model):
@@ -93,6 +97,7 @@ class Order(models.Model):
         indexes = [
             models.Index(fields=['order_number']),
             models.Index(fields=['user', 'status']),
+            models.Index(fields=['user', '-created_at']),
             models.Index(fields=['-created_at']),
         ]
     
@@ -125,6 +130,51 @@ class Order(models.Model):
         return self.items.filter(is_digital=False).exists()
 
 
+class OrderItemQuerySet(models.QuerySet):
+    """Order item helpers."""
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        """Items inserted into already paid orders count as sales right away."""
+        created = super().bulk_create(objs, *args, **kwargs)
+        order_ids = {item.order_id for item in created}
+        if order_ids:
+            self.model.objects.filter(order_id__in=order_ids).record_sales()
+        return created
+    
+    def record_sales(self):
+        """
+        Add paid, not yet counted items to `Product.sold_count` and
+        `SellerProfile.total_sales`.
+        
+        Items are locked and flagged in the caller's transaction, so an item
+        is counted exactly once no matter how many times this runs. Counters
+        get one in-place increment per product and per seller.
+        """
+        with transaction.atomic():
+            items = list(
+                self.filter(sales_recorded=False, order__payment_status='completed')
+                .select_for_update(of=('self',))
+                .values_list('pk', 'product_id', 'seller_id', 'quantity', 'subtotal')
+            )
+            if not items:
+                return 0
+            
+            sold = defaultdict(int)
+            sales = defaultdict(Decimal)
+            for _, product_id, seller_id, quantity, subtotal in items:
+                if product_id is not None:
+                    sold[product_id] += quantity
+                if seller_id is not None:
+                    sales[seller_id] += subtotal
+            
+            self.model.objects.filter(pk__in=[item[0] for item in items]).update(sales_recorded=True)
+            bulk_increment(Product, 'sold_count', sold)
+            bulk_increment(SellerProfile, 'total_sales', sales, key='user')
+            product_data_changed(sold)
+            record_trending('sale', sold)
+        return len(items)
+
+
 class OrderItem(models.Model):
     """Items in an order."""
     STATUS_CHOICES = (
@@ -197,6 +247,13 @@ class OrderItem(models.Model):
     is_digital = models.BooleanField(default=False, verbose_name='Is Digital Product')
     product_name = models.CharField(max_length=255, verbose_name='Product Name (Snapshot)')
     product_sku = models.CharField(max_length=100, verbose_name='SKU (Snapshot)')
+    sales_recorded = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Counted in Sales Statistics'
+    )
+    
+    objects = OrderItemQuerySet.as_manager()
     
     class Meta:
         verbose_name = 'Order Item'
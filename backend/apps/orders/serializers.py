@@ -0,0 +1,32 @@
+from rest_framework import serializers
+from apps.core.serializers import SparseFieldsetMixin
+from .models import Order, OrderItem
+
+
+class OrderItemSerializer(serializers.ModelSerializer):
+    """Serializer for order items."""
+    
+    class Meta:
+        model = OrderItem
+        fields = [
+            'id', 'product', 'variant', 'seller', 'product_name', 'product_sku',
+            'quantity', 'price', 'subtotal', 'status', 'is_digital'
+        ]
+        read_only_fields = fields
+
+
+class OrderSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Serializer for orders with their items."""
+    field_dependencies = {'final_amount': ['total_amount', 'discount_amount']}
+    items = OrderItemSerializer(many=True, read_only=True)
+    final_amount = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+    
+    class Meta:
+        model = Order
+        fields = [
+            'id', 'order_number', 'user', 'status', 'payment_status',
+            'payment_method', 'payment_source', 'total_amount', 'discount_amount',
+            'final_amount', 'promo_code', 'shipping_address', 'billing_address',
+            'notes', 'items', 'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
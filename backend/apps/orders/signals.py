@@ -16,18 +16,20 @@ def handle_order_completion(sender, instance, created, **kwargs):
             deliver_digital_keys.delay(instance.id)
 
 
+@receiver(post_save, sender=Order)
+def record_order_sales(sender, instance, **kwargs):
+    """
+    Count the items of a paid order in product and seller sales totals,
+    inside the transaction that completed the payment.
+    """
+    if instance.payment_status == 'completed':
+        OrderItem.objects.filter(order_id=instance.pk).record_sales()
+
+
 @receiver(post_save, sender=OrderItem)
-def update_product_sold_count(sender, instance, created, **kwargs):
+def record_item_sales(sender, instance, created, **kwargs):
     """
-    Update product sold count when order item is created or status changes.
+    Items added to an order that is already paid.
     """
-    if created and instance.order.payment_status == 'completed':
-        product = instance.product
-        product.sold_count += instance.quantity
-        product.save(update_fields=['sold_count'])
-        
-        # Update seller total sales
-        if instance.seller and hasattr(instance.seller, 'seller_profile'):
-            seller_profile = instance.seller.seller_profile
-            seller_profile.total_sales += instance.subtotal
-            seller_profile.save(update_fields=['total_sales'])
+    if created:
+        OrderItem.objects.filter(pk=instance.pk).record_sales()
@@ -33,6 +33,9 @@ def deliver_digital_keys(order_id):
                     available_key.purchased_at = timezone.now()
                     available_key.save()
                     
+                    # Keep the stored availability counter in the same transaction
+                    DigitalKey.change_available_count(item.product_id, -1)
+                    
                     # Create delivery record
                     DigitalKeyDelivery.objects.create(
                         order_item=item,
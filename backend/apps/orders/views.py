@@ -3,13 +3,27 @@ Orders app views
 """
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.filters import OrderingFilter
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
+from apps.core.mixins import SparseFieldsetQuerysetMixin
+
 from .models import Order, OrderItem
+from .serializers import OrderSerializer
 
 
-class OrderViewSet(viewsets.ModelViewSet):
-    """Order viewset - to be implemented"""
-    queryset = Order.objects.all()
+class OrderViewSet(SparseFieldsetQuerysetMixin, viewsets.ReadOnlyModelViewSet):
+    """Order viewset - read access, checkout is to be implemented"""
+    serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
+    filter_backends = [OrderingFilter]
+    ordering_fields = ['created_at', 'total_amount']
+    ordering = ['-created_at']
+    
+    def get_queryset(self):
+        """Staff see all orders, customers only their own"""
+        queryset = Order.objects.prefetch_related('items')
+        if self.request.user.is_staff:
+            return queryset
+        return queryset.filter(user=self.request.user)
@@ -0,0 +1,14 @@
+from rest_framework import serializers
+from .models import BalanceTransaction
+
+
+class BalanceTransactionSerializer(serializers.ModelSerializer):
+    """Serializer for balance transactions."""
+    
+    class Meta:
+        model = BalanceTransaction
+        fields = [
+            'id', 'transaction_type', 'amount', 'balance_after',
+            'description', 'related_order', 'created_at'
+        ]
+        read_only_fields = fields
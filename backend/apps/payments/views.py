@@ -4,15 +4,23 @@ Payments app views
 from rest_framework import viewsets, status, views
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
+from rest_framework.filters import OrderingFilter
 from rest_framework.permissions import IsAuthenticated
 
 from .models import BalanceTransaction, BalanceTopUp
+from .serializers import BalanceTransactionSerializer
 
 
-class BalanceTransactionViewSet(viewsets.ModelViewSet):
-    """Balance transaction viewset - to be implemented"""
-    queryset = BalanceTransaction.objects.all()
+class BalanceTransactionViewSet(viewsets.ReadOnlyModelViewSet):
+    """Balance transaction viewset - current user's balance history"""
+    serializer_class = BalanceTransactionSerializer
     permission_classes = [IsAuthenticated]
+    filter_backends = [OrderingFilter]
+    ordering_fields = ['created_at']
+    ordering = ['-created_at']
+    
+    def get_queryset(self):
+        return BalanceTransaction.objects.filter(user=self.request.user)
 
 
 class BalanceView(views.APIView):
@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Category, Product, ProductImage, ProductVariant, Wishlist, PromoCode
+from .models import (
+    Category, Product, ProductImage, ProductImport, ProductVariant, Wishlist, PromoCode, PromoCodeRedemption
+)
 
 
 class ProductImageInline(admin.TabularInline):
@@ -30,7 +32,8 @@ class ProductAdmin(admin.ModelAdmin):
     list_filter = ['product_type', 'is_active', 'is_approved', 'category', 'created_at']
     search_fields = ['name', 'description', 'sku', 'seller__email']
     prepopulated_fields = {'slug': ('name',)}
-    readonly_fields = ['sold_count', 'view_count', 'created_at', 'updated_at']
+    readonly_fields = ['available_keys_count', 'sold_count', 'view_count', 'rating_average', 'rating_count',
+                       'rating_histogram', 'created_at', 'updated_at']
     inlines = [ProductImageInline, ProductVariantInline]
     
     fieldsets = (
@@ -41,13 +44,14 @@ class ProductAdmin(admin.ModelAdmin):
             'fields': ('price', 'compare_at_price')
         }),
         ('Inventory', {
-            'fields': ('sku', 'stock_quantity')
+            'fields': ('sku', 'stock_quantity', 'available_keys_count')
         }),
         ('Status', {
             'fields': ('is_active', 'is_approved')
         }),
         ('Statistics', {
-            'fields': ('sold_count', 'view_count', 'created_at', 'updated_at')
+            'fields': ('sold_count', 'view_count', 'rating_average', 'rating_count',
+                       'rating_histogram', 'created_at', 'updated_at')
         }),
     )
 
@@ -75,8 +79,26 @@ class WishlistAdmin(admin.ModelAdmin):
 
 @admin.register(PromoCode)
 class PromoCodeAdmin(admin.ModelAdmin):
-    list_display = ['code', 'discount_type', 'discount_value', 'valid_from', 'valid_to', 
+    list_display = ['code', 'campaign', 'discount_type', 'discount_value', 'valid_from', 'valid_to', 
                     'used_count', 'usage_limit', 'is_active']
     list_filter = ['discount_type', 'is_active', 'valid_from', 'valid_to']
-    search_fields = ['code']
+    search_fields = ['code', 'campaign']
     readonly_fields = ['used_count', 'created_at']
+
+
+@admin.register(ProductImport)
+class ProductImportAdmin(admin.ModelAdmin):
+    list_display = ['id', 'seller', 'file_format', 'status', 'processed_rows', 'created_count',
+                    'updated_count', 'error_count', 'created_at']
+    list_filter = ['status', 'file_format', 'created_at']
+    search_fields = ['seller__email']
+    readonly_fields = ['status', 'processed_rows', 'created_count', 'updated_count', 'error_count',
+                       'errors', 'failure_reason', 'started_at', 'finished_at', 'created_at', 'updated_at']
+
+
+@admin.register(PromoCodeRedemption)
+class PromoCodeRedemptionAdmin(admin.ModelAdmin):
+    list_display = ['promo_code', 'user', 'use_number', 'discount_amount', 'created_at']
+    list_filter = ['created_at']
+    search_fields = ['promo_code__code', 'user__email']
+    readonly_fields = ['promo_code', 'user', 'use_number', 'discount_amount', 'created_at']
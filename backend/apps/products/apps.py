@@ -1,7 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ProductsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.products'
     verbose_name = 'Products'
+    
+    def ready(self):
+        import apps.products.checks
+        import apps.products.signals
+        post_migrate.connect(apps.products.signals.sync_product_search_trigger, sender=self)
@@ -0,0 +1,153 @@
+"""
+Cache key helpers for the products app
+"""
+import hashlib
+import json
+import pickle
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import translation
+from rest_framework.response import Response
+
+from .search_index import queue_product_index
+
+CATEGORY_TREE_VERSION = 'category_tree'
+# Anything shown in product or category listings
+CATALOG_VERSION = 'catalog'
+# Per user, formatted with the user id
+WISHLIST_VERSION = 'wishlist:{}'
+
+LIST_CACHE_STATS_KEY = 'list_cache:stats:{}'
+
+# Query parameters that never change which products match a filter
+PAGINATION_PARAMS = {'cursor', 'page', 'page_size', 'count', 'ordering', 'format'}
+
+
+def query_signature(query_params, ignore=PAGINATION_PARAMS):
+    """
+    Stable hash of a request's query parameters: parameter order, repeated
+    keys and blank values do not produce different signatures.
+    """
+    items = sorted(
+        (key, value)
+        for key, values in query_params.lists()
+        if key not in ignore
+        for value in values
+        if value != ''
+    )
+    return hashlib.sha1(urlencode(items).encode('utf-8')).hexdigest()
+
+
+def _version_key(name):
+    return f'version:{name}'
+
+
+def get_version(name):
+    """
+    Current value of a cache version counter. Keys built from it are never
+    invalidated explicitly; bumping the version simply makes them unreachable.
+    """
+    key = _version_key(name)
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so a lost counter never reuses an old version
+        cache.add(key, int(time.time()), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(name):
+    """Invalidate everything cached under `name` once the transaction commits."""
+    transaction.on_commit(lambda: _incr_version(name))
+
+
+def _incr_version(name):
+    try:
+        cache.incr(_version_key(name))
+    except ValueError:
+        get_version(name)
+
+
+def strong_etag(data):
+    """Quoted ETag derived from the canonical JSON form of `data`."""
+    payload = json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+    return '"%s"' % hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def product_data_changed(product_ids):
+    """
+    Products changed outside of a model save (counters updated with F()
+    expressions): reindex them and drop cached listing pages.
+    """
+    queue_product_index(product_ids)
+    bump_version(CATALOG_VERSION)
+
+
+def _count(stat):
+    key = LIST_CACHE_STATS_KEY.format(stat)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def list_cache_stats():
+    """Hit, miss and oversized-page counters of the listing response cache."""
+    return {
+        stat: cache.get(LIST_CACHE_STATS_KEY.format(stat), 0)
+        for stat in ('hit', 'miss', 'skip')
+    }
+
+
+class CachedListMixin:
+    """
+    Response cache for anonymous `list` requests.
+    
+    Pages are keyed on the catalog version, the active language, the
+    response format, the host (pagination links are absolute) and the
+    normalized query string. Every catalog write bumps the version, so a
+    cached page is never older than the last change; entries also expire
+    after `LIST_RESPONSE_CACHE_TIMEOUT` and pages larger than
+    `LIST_RESPONSE_CACHE_MAX_BYTES` are not stored.
+    """
+    list_cache_prefix = None
+    
+    def list(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().list(request, *args, **kwargs)
+        
+        cache_key = self.get_list_cache_key(request)
+        data = cache.get(cache_key)
+        if data is not None:
+            _count('hit')
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+        
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            _count('miss')
+            payload = pickle.dumps(response.data, pickle.HIGHEST_PROTOCOL)
+            if len(payload) <= settings.LIST_RESPONSE_CACHE_MAX_BYTES:
+                cache.set(cache_key, response.data, settings.LIST_RESPONSE_CACHE_TIMEOUT)
+            else:
+                _count('skip')
+            response['X-Cache'] = 'MISS'
+        return response
+    
+    def get_list_cache_key(self, request):
+        renderer = getattr(request, 'accepted_renderer', None)
+        return ':'.join([
+            'list_cache',
+            self.list_cache_prefix or self.__class__.__name__,
+            str(get_version(CATALOG_VERSION)),
+            translation.get_language() or '',
+            getattr(renderer, 'format', '') or '',
+            hashlib.sha1(request.get_host().encode('utf-8')).hexdigest()[:8],
+            query_signature(request.query_params, ignore=()),
+        ])
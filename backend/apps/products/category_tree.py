@@ -0,0 +1,51 @@
+"""
+Nested category tree for the navigation menu
+"""
+from django.core.files.storage import default_storage
+from django.db.models import Count
+
+from .models import Category, Product
+
+
+def build_category_tree():
+    """
+    Whole active hierarchy with product counts, in two queries.
+    
+    Each node's `product_count` includes products of its descendants. Nodes
+    below an inactive category are left out together with their parent.
+    """
+    rows = Category.objects.filter(is_active=True).order_by('depth', 'order', 'name').values(
+        'id', 'name', 'slug', 'parent_id', 'icon', 'path', 'order'
+    )
+    direct_counts = dict(
+        Product.objects.filter(is_active=True, is_approved=True, category__is_active=True)
+        .order_by().values_list('category_id').annotate(total=Count('id'))
+    )
+    
+    nodes = {}
+    roots = []
+    for row in rows:
+        node = {
+            'id': row['id'],
+            'name': row['name'],
+            'slug': row['slug'],
+            'icon': default_storage.url(row['icon']) if row['icon'] else None,
+            'product_count': 0,
+            'children': [],
+        }
+        if row['parent_id'] is None:
+            roots.append(node)
+        elif row['parent_id'] in nodes:
+            nodes[row['parent_id']]['children'].append(node)
+        else:
+            continue
+        nodes[row['id']] = node
+        
+        # Roll the direct count up to every ancestor on the materialized path
+        count = direct_counts.get(row['id'], 0)
+        if count:
+            for ancestor_id in row['path'].strip('/').split('/'):
+                ancestor = nodes.get(int(ancestor_id))
+                if ancestor is not None:
+                    ancestor['product_count'] += count
+    return roots
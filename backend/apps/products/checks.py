@@ -0,0 +1,21 @@
+"""
+System checks of the products app.
+"""
+from django.core.checks import Tags, Warning, register
+from django.db import connections
+
+from .search import search_trigger_in_sync
+
+
+@register(Tags.database)
+def check_search_trigger(app_configs, databases=None, **kwargs):
+    """The product search trigger must follow SEARCH_LANGUAGE_CONFIGS."""
+    errors = []
+    for alias in databases or []:
+        if search_trigger_in_sync(connections[alias]) is False:
+            errors.append(Warning(
+                'The product search trigger does not match SEARCH_LANGUAGE_CONFIGS.',
+                hint='Run `manage.py migrate` to regenerate it and refill the search vectors.',
+                id='products.W001',
+            ))
+    return errors
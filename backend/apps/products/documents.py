@@ -0,0 +1,65 @@
+"""
+Elasticsearch documents for the products app
+"""
+from django_elasticsearch_dsl import Document, fields
+from django_elasticsearch_dsl.registries import registry
+
+from .models import Product
+
+
+@registry.register_document
+class ProductDocument(Document):
+    """Product search document, kept in sync by apps.products.search_index"""
+    name = fields.TextField(fields={'raw': fields.KeywordField()})
+    sku = fields.KeywordField()
+    product_type = fields.KeywordField()
+    price = fields.FloatField()
+    category = fields.ObjectField(properties={
+        'id': fields.IntegerField(),
+        'name': fields.TextField(),
+    })
+    category_path = fields.TextField()
+    seller = fields.ObjectField(properties={
+        'id': fields.IntegerField(),
+        'email': fields.KeywordField(),
+    })
+    in_stock = fields.BooleanField()
+    rating = fields.FloatField()
+    rating_count = fields.IntegerField()
+    
+    class Index:
+        name = 'products'
+        settings = {
+            'number_of_shards': 1,
+            'number_of_replicas': 0,
+        }
+    
+    class Django:
+        model = Product
+        fields = [
+            'id',
+            'description',
+            'is_active',
+            'is_approved',
+            'sold_count',
+            'created_at',
+        ]
+        # Updates are batched by apps.products.search_index
+        ignore_signals = True
+        auto_refresh = False
+        queryset_pagination = 500
+    
+    def get_queryset(self):
+        return super().get_queryset().select_related('category', 'seller').defer('search_vector')
+    
+    def prepare_price(self, instance):
+        return float(instance.price)
+    
+    def prepare_category_path(self, instance):
+        return instance.category.full_path if instance.category else ''
+    
+    def prepare_in_stock(self, instance):
+        return instance.is_in_stock
+    
+    def prepare_rating(self, instance):
+        return float(instance.rating_average)
@@ -0,0 +1,90 @@
+"""
+Facet counts for the product list sidebar
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Case, Count, IntegerField, Value, When
+
+RATING_BANDS = [4, 3, 2, 1]
+
+
+def price_bucket_expression(edges):
+    """Index of the price range a product falls into (0 .. len(edges) - 1)."""
+    whens = [
+        When(price__lt=Decimal(str(upper)), then=Value(index))
+        for index, upper in enumerate(edges[1:])
+    ]
+    return Case(*whens, default=Value(len(edges) - 1), output_field=IntegerField())
+
+
+def rating_band_expression():
+    """Whole-star floor of the stored average rating."""
+    whens = [When(rating_average__gte=band, then=Value(band)) for band in RATING_BANDS]
+    return Case(*whens, default=Value(0), output_field=IntegerField())
+
+
+def compute_facets(queryset):
+    """
+    Count products per category, product type, price range and rating band
+    for an already filtered queryset.
+    
+    All dimensions are grouped together in one SQL query; the number of
+    groups is bounded by categories x types x price ranges x rating bands,
+    and the per-facet totals are folded in Python.
+    """
+    edges = settings.PRODUCT_PRICE_FACET_EDGES
+    rows = queryset.order_by().annotate(
+        price_bucket=price_bucket_expression(edges),
+        rating_band=rating_band_expression(),
+    ).values(
+        'category_id', 'category__name', 'product_type', 'price_bucket', 'rating_band'
+    ).annotate(total=Count('id'))
+    
+    categories = {}
+    category_counts = defaultdict(int)
+    type_counts = defaultdict(int)
+    price_counts = defaultdict(int)
+    rating_counts = defaultdict(int)
+    total = 0
+    for row in rows:
+        count = row['total']
+        total += count
+        if row['category_id'] is not None:
+            categories[row['category_id']] = row['category__name']
+            category_counts[row['category_id']] += count
+        type_counts[row['product_type']] += count
+        price_counts[row['price_bucket']] += count
+        rating_counts[row['rating_band']] += count
+    
+    price_facet = []
+    for index, lower in enumerate(edges):
+        upper = edges[index + 1] if index + 1 < len(edges) else None
+        price_facet.append({'min': lower, 'max': upper, 'count': price_counts[index]})
+    
+    # Rating facet is cumulative: "N stars & up"
+    rating_facet = [
+        {
+            'min_rating': band,
+            'count': sum(count for value, count in rating_counts.items() if value >= band),
+        }
+        for band in RATING_BANDS
+    ]
+    
+    return {
+        'total': total,
+        'category': sorted(
+            (
+                {'id': pk, 'name': categories[pk], 'count': count}
+                for pk, count in category_counts.items()
+            ),
+            key=lambda item: (-item['count'], item['name'])
+        ),
+        'product_type': sorted(
+            ({'value': value, 'count': count} for value, count in type_counts.items()),
+            key=lambda item: -item['count']
+        ),
+        'price': price_facet,
+        'rating': rating_facet,
+    }
@@ -0,0 +1,59 @@
+"""
+Products app filters
+"""
+import django_filters
+from rest_framework.filters import OrderingFilter, SearchFilter
+
+from .models import Category, Product
+
+
+class ProductSearchFilter(SearchFilter):
+    """
+    `?search=` backed by Product.objects.search (full-text on PostgreSQL,
+    substring match elsewhere).
+    """
+    
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        return queryset.search(' '.join(terms))
+
+
+class ProductOrderingFilter(OrderingFilter):
+    """
+    Order search results by relevance unless an explicit ordering is given.
+    `trending` is accepted as an alias of the stored `trending_score`.
+    """
+    aliases = {'trending': 'trending_score'}
+    
+    def get_ordering(self, request, queryset, view):
+        if not request.query_params.get(self.ordering_param) and 'search_rank' in queryset.query.annotations:
+            return ['-search_rank']
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        return [
+            f"{'-' if term.startswith('-') else ''}{self.aliases.get(term.lstrip('-'), term.lstrip('-'))}"
+            for term in ordering
+        ]
+
+
+class ProductFilter(django_filters.FilterSet):
+    """Product list filters"""
+    in_stock = django_filters.BooleanFilter(method='filter_in_stock')
+    category__subtree = django_filters.NumberFilter(method='filter_category_subtree')
+    
+    class Meta:
+        model = Product
+        fields = ['category', 'category__subtree', 'product_type', 'is_active', 'is_approved', 'in_stock']
+    
+    def filter_in_stock(self, queryset, name, value):
+        return queryset.in_stock(value)
+    
+    def filter_category_subtree(self, queryset, name, value):
+        """Products in the category or any of its descendants (path prefix scan)."""
+        path = Category.objects.filter(pk=value).values_list('path', flat=True).first()
+        if path is None:
+            return queryset.none()
+        return queryset.filter(category__path__startswith=path)
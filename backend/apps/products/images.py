@@ -0,0 +1,142 @@
+"""
+Product image derivatives.
+
+Every uploaded ProductImage gets resized copies in the formats and widths
+configured by `PRODUCT_IMAGE_DERIVATIVE_FORMATS` and
+`PRODUCT_IMAGE_DERIVATIVE_WIDTHS`, stored next to the original
+(`products/shoe.jpg` -> `products/shoe_320w.webp`). `ProductImage.derivatives`
+maps format -> width -> storage name, and `derivatives_source` records which
+upload they were made from, so a changed image is detected and processed
+again.
+
+`render_derivatives` only works on bytes, so it can run in a worker process
+of a process pool; reading and writing files and rows stays in the caller.
+"""
+import io
+import logging
+import posixpath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+FORMAT_EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+
+
+def render_derivatives(source, widths, formats):
+    """
+    Resize image bytes to every width (never upscaling) in every format.
+    Returns a list of `(format, width, bytes)`.
+    """
+    with Image.open(io.BytesIO(source)) as original:
+        original = ImageOps.exif_transpose(original)
+        original.load()
+    if original.mode == 'P' or 'transparency' in original.info:
+        # Palette images only resize with nearest neighbour, and their
+        # transparency is a palette entry that RGB conversion would drop
+        original = original.convert('RGBA' if 'transparency' in original.info else 'RGB')
+    
+    targets = {width for width in widths if width < original.width}
+    if len(targets) < len(set(widths)):
+        # Narrower than the largest width: keep the original size as the top entry
+        targets.add(original.width)
+    targets = sorted(targets)
+    
+    rendered = []
+    for width in targets:
+        height = max(1, round(original.height * width / original.width))
+        resized = original.resize((width, height), Image.LANCZOS) if width != original.width else original
+        for fmt, options in formats.items():
+            image = resized
+            if fmt == 'jpeg' and image.mode != 'RGB':
+                image = _flatten(image)
+            elif image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+            buffer = io.BytesIO()
+            image.save(buffer, format=fmt.upper(), **options)
+            rendered.append((fmt, width, buffer.getvalue()))
+    return rendered
+
+
+def _flatten(image):
+    """JPEG has no alpha channel: composite transparent images on white."""
+    image = image.convert('RGBA')
+    background = Image.new('RGB', image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+
+def read_source(product_image):
+    with product_image.image.open('rb') as source:
+        return source.read()
+
+
+def render_for(source):
+    """render_derivatives with the configured widths and formats."""
+    return render_derivatives(
+        source,
+        settings.PRODUCT_IMAGE_DERIVATIVE_WIDTHS,
+        settings.PRODUCT_IMAGE_DERIVATIVE_FORMATS,
+    )
+
+
+def store_derivatives(product_image, rendered):
+    """
+    Save rendered copies next to the original and record them on the row.
+    
+    The row is only updated if the image was not replaced meanwhile;
+    copies of a stale upload are removed again. Returns True on success.
+    """
+    source_name = product_image.image.name
+    stem, _ = posixpath.splitext(source_name)
+    derivatives = {}
+    for fmt, width, content in rendered:
+        name = default_storage.save(f'{stem}_{width}w.{FORMAT_EXTENSIONS[fmt]}', ContentFile(content))
+        derivatives.setdefault(fmt, {})[str(width)] = name
+    
+    previous = product_image.derivatives
+    updated = type(product_image).objects.filter(pk=product_image.pk, image=source_name).update(
+        derivatives=derivatives,
+        derivatives_source=source_name,
+        updated_at=timezone.now(),
+    )
+    if not updated:
+        delete_derivative_files(derivatives)
+        return False
+    
+    delete_derivative_files(previous)
+    product_image.derivatives = derivatives
+    product_image.derivatives_source = source_name
+    return True
+
+
+def delete_derivative_files(derivatives):
+    for names in (derivatives or {}).values():
+        for name in names.values():
+            try:
+                default_storage.delete(name)
+            except Exception:
+                logger.warning('Could not delete image derivative %s', name, exc_info=True)
+
+
+def generate_derivatives(product_image):
+    """Render and store derivatives in the current process."""
+    return store_derivatives(product_image, render_for(read_source(product_image)))
+
+
+def srcset(derivatives, build_url):
+    """
+    `{'webp': 'url 160w, url 320w', ...}` for a `derivatives` map;
+    `build_url` turns a storage name into the URL to emit.
+    """
+    return {
+        fmt: ', '.join(
+            f'{build_url(names[width])} {width}w'
+            for width in sorted(names, key=int)
+        )
+        for fmt, names in derivatives.items()
+    }
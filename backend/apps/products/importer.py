@@ -0,0 +1,425 @@
+"""
+Bulk product import from CSV or JSON Lines files.
+
+A ProductImport file is streamed in chunks of PRODUCT_IMPORT_CHUNK_SIZE
+rows. Each chunk is validated, matched against the database and written
+with a fixed number of queries, in one transaction that also stores the
+import's progress, which doubles as a heartbeat. After a failure
+`run_import` skips the rows already committed and continues with the next
+chunk; a running import without heartbeat for PRODUCT_IMPORT_STALE_AFTER
+seconds was killed (e.g. at the task time limit) and is taken over the
+same way.
+
+Rows are matched to products by SKU: the importing seller's products are
+updated, SKUs owned by another seller are reported as row errors. Variants
+are upserted by their own SKU and images are added to the product unless it
+already has them; nothing is deleted.
+
+Columns (CSV header or JSON keys): sku, name, description, price,
+compare_at_price, category (id or slug), product_type, stock_quantity,
+is_active, images (names of files the seller uploaded below
+`image_prefix()`, "|" separated in CSV) and variants (list of objects with sku, name, price_adjustment,
+stock_quantity, attributes and is_active; JSON encoded in CSV). Only sku
+is required for updates; new products also need name, description and
+price.
+"""
+import csv
+import io
+import json
+import logging
+import posixpath
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+from django.utils.text import slugify
+from rest_framework import serializers
+
+from .cache import CATEGORY_TREE_VERSION, bump_version, product_data_changed
+from .models import Category, Product, ProductImage, ProductImport, ProductVariant
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_FIELDS = [
+    'name', 'description', 'price', 'compare_at_price', 'category',
+    'product_type', 'stock_quantity', 'is_active',
+]
+REQUIRED_FOR_CREATE = ['name', 'description', 'price']
+VARIANT_FIELDS = ['name', 'price_adjustment', 'stock_quantity', 'attributes', 'is_active']
+
+
+class VariantRowSerializer(serializers.Serializer):
+    sku = serializers.CharField(max_length=100)
+    name = serializers.CharField(max_length=255)
+    price_adjustment = serializers.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
+    stock_quantity = serializers.IntegerField(min_value=0, default=0)
+    attributes = serializers.DictField(default=dict)
+    is_active = serializers.BooleanField(default=True)
+
+
+class ProductRowSerializer(serializers.Serializer):
+    sku = serializers.CharField(max_length=100)
+    name = serializers.CharField(max_length=255, required=False)
+    description = serializers.CharField(required=False)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'), required=False)
+    compare_at_price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, required=False, allow_null=True
+    )
+    category = serializers.CharField(required=False, allow_null=True)
+    product_type = serializers.ChoiceField(choices=Product.PRODUCT_TYPE_CHOICES, required=False)
+    stock_quantity = serializers.IntegerField(min_value=0, required=False)
+    is_active = serializers.BooleanField(required=False)
+    images = serializers.ListField(child=serializers.CharField(max_length=100), required=False)
+    variants = VariantRowSerializer(many=True, required=False)
+
+
+class ImportFileError(Exception):
+    """The file cannot be read any further."""
+
+
+def image_prefix(seller_id):
+    """Storage directory of the images a seller uploads for imports."""
+    return settings.PRODUCT_IMPORT_IMAGE_PREFIX.format(seller_id=seller_id)
+
+
+def foreign_images(names, seller_id):
+    """The image names that are not normalized paths below the seller's prefix."""
+    prefix = image_prefix(seller_id)
+    return [
+        name for name in names
+        if not name.startswith(prefix) or posixpath.normpath(name) != name or name.endswith('/')
+    ]
+
+
+def iter_rows(fileobj, file_format):
+    """
+    Yield `(line, data)` for every data row of a binary file object. Rows
+    that cannot be decoded are yielded with `data=None`.
+    """
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    if file_format == 'csv':
+        reader = csv.DictReader(text)
+        try:
+            for row in reader:
+                yield reader.line_num, _normalize_csv_row(row)
+        except csv.Error as exc:
+            raise ImportFileError(f'CSV error on line {reader.line_num}: {exc}')
+        return
+    
+    for line, raw in enumerate(text, start=1):
+        if not raw.strip():
+            continue
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            data = None
+        yield line, data if isinstance(data, dict) else None
+
+
+def _normalize_csv_row(row):
+    """Blank cells are left out, list columns are decoded."""
+    data = {
+        key.strip(): value.strip()
+        for key, value in row.items()
+        if key and value is not None and value.strip()
+    }
+    if 'images' in data:
+        data['images'] = [name.strip() for name in data['images'].split('|') if name.strip()]
+    if 'variants' in data:
+        try:
+            data['variants'] = json.loads(data['variants'])
+        except ValueError:
+            pass  # Reported by the row serializer
+    return data
+
+
+def allocate_slugs(items):
+    """
+    Unique slugs for new products from `{key: (name, sku)}`.
+    
+    Every round checks all remaining candidates with one query: the plain
+    name first, then name plus SKU, then a random suffix.
+    """
+    pending = {
+        key: (slugify(name)[:200] or 'product', slugify(sku)[:40])
+        for key, (name, sku) in items.items()
+    }
+    slugs = {}
+    attempt = 0
+    while pending:
+        candidates = {key: _slug_candidate(base, sku, attempt) for key, (base, sku) in pending.items()}
+        taken = set(
+            Product.objects.filter(slug__in=set(candidates.values())).values_list('slug', flat=True)
+        )
+        taken.update(slugs.values())
+        for key, slug in candidates.items():
+            if slug not in taken:
+                slugs[key] = slug
+                taken.add(slug)
+                del pending[key]
+        attempt += 1
+    return slugs
+
+
+def _slug_candidate(base, sku, attempt):
+    if attempt == 0:
+        return base
+    if attempt == 1 and sku:
+        return f'{base}-{sku}'
+    return f'{base}-{get_random_string(6, "abcdefghijklmnopqrstuvwxyz0123456789")}'
+
+
+def run_import(product_import, chunk_size=None, resumable_statuses=('pending', 'failed'), progress=None):
+    """
+    Run an import from its first unprocessed row. Returns False when the
+    import is not in one of `resumable_statuses` and not a stale running
+    import (e.g. running in another worker).
+    """
+    chunk_size = chunk_size or settings.PRODUCT_IMPORT_CHUNK_SIZE
+    now = timezone.now()
+    claimed = ProductImport.objects.filter(
+        Q(status__in=resumable_statuses) | Q(status='running', updated_at__lt=ProductImport.stale_before()),
+        pk=product_import.pk,
+    ).update(
+        status='running',
+        started_at=Coalesce(F('started_at'), Value(now)),
+        finished_at=None,
+        failure_reason='',
+        updated_at=now
+    )
+    if not claimed:
+        return False
+    product_import.refresh_from_db()
+    
+    try:
+        with product_import.file.open('rb') as fileobj:
+            rows = iter_rows(fileobj, product_import.file_format)
+            # Rows committed by an earlier run
+            for _ in range(product_import.processed_rows):
+                if next(rows, None) is None:
+                    break
+            
+            chunk = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    _import_chunk(product_import, chunk)
+                    chunk = []
+                    if progress:
+                        progress(product_import)
+            if chunk:
+                _import_chunk(product_import, chunk)
+                if progress:
+                    progress(product_import)
+    except Exception as exc:
+        logger.exception('Product import %s failed', product_import.pk)
+        product_import.status = 'failed'
+        product_import.failure_reason = str(exc)
+        product_import.finished_at = timezone.now()
+        product_import.save(update_fields=['status', 'failure_reason', 'finished_at', 'updated_at'])
+        return True
+    
+    product_import.status = 'completed'
+    product_import.finished_at = timezone.now()
+    product_import.save(update_fields=['status', 'finished_at', 'updated_at'])
+    return True
+
+
+def _import_chunk(product_import, chunk):
+    seller_id = product_import.seller_id
+    errors = []
+    
+    def reject(line, sku, detail):
+        errors.append({'line': line, 'sku': sku, 'errors': detail})
+    
+    # Validation without queries, later rows for the same SKU override earlier ones
+    rows = {}
+    for line, data in chunk:
+        if data is None:
+            reject(line, None, {'non_field_errors': ['Row could not be decoded.']})
+            continue
+        serializer = ProductRowSerializer(data=data)
+        if not serializer.is_valid():
+            sku = data.get('sku') if isinstance(data.get('sku'), str) else None
+            reject(line, sku, json.loads(json.dumps(serializer.errors)))
+            continue
+        values = serializer.validated_data
+        previous = rows.get(values['sku'])
+        rows[values['sku']] = (line, {**previous[1], **values} if previous else dict(values))
+    
+    category_ids = _resolve_categories({
+        values['category'] for line, values in rows.values() if values.get('category')
+    })
+    variant_skus = {
+        variant['sku']
+        for line, values in rows.values()
+        for variant in values.get('variants', [])
+    }
+    
+    with transaction.atomic():
+        existing = {
+            product.sku: product
+            for product in Product.objects.select_for_update().filter(sku__in=rows)
+        }
+        existing_variants = {
+            variant.sku: variant
+            for variant in ProductVariant.objects.select_for_update().filter(sku__in=variant_skus)
+        }
+        
+        to_create, to_update = {}, {}
+        update_fields = set()
+        seen_variants = set()
+        for sku, (line, values) in rows.items():
+            product = existing.get(sku)
+            if product is not None and product.seller_id != seller_id:
+                reject(line, sku, {'sku': ['This SKU belongs to another seller.']})
+                continue
+            if product is None:
+                missing = [field for field in REQUIRED_FOR_CREATE if field not in values]
+                if missing:
+                    reject(line, sku, {field: ['This field is required for new products.'] for field in missing})
+                    continue
+            
+            foreign = foreign_images(values.get('images', []), seller_id)
+            if foreign:
+                reject(line, sku, {'images': [f'"{name}" is not one of your uploaded images.' for name in foreign]})
+                continue
+            
+            category = values.get('category')
+            if category and category not in category_ids:
+                reject(line, sku, {'category': [f'Unknown category "{category}".']})
+                continue
+            
+            variant_errors = []
+            for variant in values.get('variants', []):
+                owner = existing_variants.get(variant['sku'])
+                if variant['sku'] in seen_variants:
+                    variant_errors.append(f'Variant SKU "{variant["sku"]}" is used more than once.')
+                elif owner is not None and (product is None or owner.product_id != product.pk):
+                    variant_errors.append(f'Variant SKU "{variant["sku"]}" belongs to another product.')
+                seen_variants.add(variant['sku'])
+            if variant_errors:
+                reject(line, sku, {'variants': variant_errors})
+                continue
+            
+            fields = {
+                field: values[field]
+                for field in PRODUCT_FIELDS
+                if field in values and field != 'category'
+            }
+            if 'category' in values:
+                fields['category_id'] = category_ids.get(category)
+            
+            if product is None:
+                to_create[sku] = Product(seller_id=seller_id, sku=sku, **fields)
+            else:
+                for field, value in fields.items():
+                    setattr(product, field, value)
+                update_fields.update(fields)
+                to_update[sku] = product
+        
+        if to_create:
+            slugs = allocate_slugs({sku: (product.name, sku) for sku, product in to_create.items()})
+            for sku, product in to_create.items():
+                product.slug = slugs[sku]
+            Product.objects.bulk_create(to_create.values())
+        if to_update:
+            now = timezone.now()
+            for product in to_update.values():
+                product.updated_at = now
+            Product.objects.bulk_update(to_update.values(), [*update_fields, 'updated_at'])
+        
+        products = {**to_update, **to_create}
+        _upsert_variants(products, rows, existing_variants)
+        _add_images(products, rows)
+        
+        product_import.processed_rows += len(chunk)
+        product_import.created_count += len(to_create)
+        product_import.updated_count += len(to_update)
+        product_import.error_count += len(errors)
+        errors.sort(key=lambda error: error['line'])
+        room = settings.PRODUCT_IMPORT_MAX_STORED_ERRORS - len(product_import.errors)
+        if room > 0:
+            product_import.errors = product_import.errors + errors[:room]
+        product_import.save(update_fields=[
+            'processed_rows', 'created_count', 'updated_count', 'error_count', 'errors', 'updated_at'
+        ])
+        
+        if products:
+            # Bulk writes skip the Product signals
+            product_data_changed([product.pk for product in products.values()])
+            bump_version(CATEGORY_TREE_VERSION)
+
+
+def _resolve_categories(values):
+    """Map category ids and slugs from the file to category ids in one query."""
+    if not values:
+        return {}
+    ids = {int(value) for value in values if value.isdigit()}
+    found = {}
+    for pk, slug in Category.objects.filter(Q(pk__in=ids) | Q(slug__in=values)).values_list('pk', 'slug'):
+        found[slug] = pk
+        if pk in ids:
+            found[str(pk)] = pk
+    return found
+
+
+def _upsert_variants(products, rows, existing_variants):
+    to_create, to_update = [], []
+    for sku, product in products.items():
+        for values in rows[sku][1].get('variants', []):
+            variant = existing_variants.get(values['sku'])
+            if variant is None:
+                to_create.append(ProductVariant(product=product, **values))
+                continue
+            for field in VARIANT_FIELDS:
+                setattr(variant, field, values[field])
+            to_update.append(variant)
+    if to_create:
+        ProductVariant.objects.bulk_create(to_create)
+    if to_update:
+        ProductVariant.objects.bulk_update(to_update, VARIANT_FIELDS)
+
+
+def _add_images(products, rows):
+    with_images = {
+        product.pk: rows[sku][1]['images']
+        for sku, product in products.items()
+        if rows[sku][1].get('images')
+    }
+    if not with_images:
+        return
+    
+    present = set()
+    has_primary = set()
+    for product_id, image, is_primary in ProductImage.objects.filter(
+        product_id__in=with_images
+    ).values_list('product_id', 'image', 'is_primary'):
+        present.add((product_id, image))
+        if is_primary:
+            has_primary.add(product_id)
+    
+    to_create = []
+    for product_id, names in with_images.items():
+        for position, name in enumerate(dict.fromkeys(names)):
+            if (product_id, name) in present:
+                continue
+            to_create.append(ProductImage(
+                product_id=product_id,
+                image=name,
+                order=position,
+                is_primary=position == 0 and product_id not in has_primary
+            ))
+    if not to_create:
+        return
+    
+    created = ProductImage.objects.bulk_create(to_create)
+    from .tasks import generate_product_image_derivatives
+    image_ids = [image.pk for image in created]
+    transaction.on_commit(
+        lambda: [generate_product_image_derivatives.delay(pk) for pk in image_ids]
+    )
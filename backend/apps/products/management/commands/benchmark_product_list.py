@@ -0,0 +1,68 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from apps.core.encoders import RowEncoder
+from apps.products.models import Product
+from apps.products.serializers import ProductListSerializer
+
+
+class Command(BaseCommand):
+    help = 'Compare ProductListSerializer with the .values() row encoder used by the product list'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--page-sizes',
+            type=int,
+            nargs='+',
+            default=[20, 100, 500],
+            help='Page sizes to measure',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Runs per page size, the median is reported',
+        )
+    
+    def handle(self, *args, **options):
+        queryset = Product.objects.with_stock_status().select_related(
+            'category', 'seller'
+        ).defer('search_vector').order_by('-created_at', '-id')
+        encoder = RowEncoder.for_serializer(ProductListSerializer())
+        renderer = JSONRenderer()
+        total = Product.objects.count()
+        
+        self.stdout.write(
+            f"{'page size':>10} {'serializer ms':>14} {'encoder ms':>11} {'speedup':>8}  output"
+        )
+        for page_size in options['page_sizes']:
+            if total < page_size:
+                self.stdout.write(self.style.WARNING(
+                    f'Only {total} products in the database, page size {page_size} is not full'
+                ))
+            
+            def serializer_page():
+                return ProductListSerializer(list(queryset[:page_size]), many=True).data
+            
+            def encoder_page():
+                return encoder.encode(queryset.values(*encoder.columns)[:page_size])
+            
+            identical = renderer.render(serializer_page()) == renderer.render(encoder_page())
+            slow = self._measure(serializer_page, options['repeat'])
+            fast = self._measure(encoder_page, options['repeat'])
+            line = (
+                f'{page_size:>10} {slow:>14.2f} {fast:>11.2f} {slow / fast:>7.1f}x  '
+                f"{'identical' if identical else 'DIFFERENT'}"
+            )
+            self.stdout.write(self.style.SUCCESS(line) if identical else self.style.ERROR(line))
+    
+    @staticmethod
+    def _measure(func, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
@@ -0,0 +1,83 @@
+"""
+Management command to backfill resized product image copies.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+from django.core.management.base import BaseCommand
+from django.db.models import F
+from apps.products.images import read_source, render_for, store_derivatives
+from apps.products.models import ProductImage
+
+
+def _render(source):
+    # Runs in a worker process, only bytes cross the process boundary
+    return render_for(source)
+
+
+class Command(BaseCommand):
+    help = 'Generate WebP/JPEG derivatives for product images that have none or stale ones'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Number of processes used to resize images',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Number of images read and submitted to the pool at a time',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate derivatives for every image',
+        )
+    
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        images = ProductImage.objects.exclude(image='').only(
+            'id', 'image', 'derivatives', 'derivatives_source'
+        ).order_by('pk')
+        if not options['force']:
+            # Images already processed are skipped, so an interrupted run resumes
+            images = images.exclude(derivatives_source=F('image'))
+        
+        done = failed = 0
+        last_pk = 0
+        with ProcessPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+            while True:
+                batch = list(images.filter(pk__gt=last_pk)[:batch_size])
+                if not batch:
+                    break
+                last_pk = batch[-1].pk
+                
+                jobs = []
+                for product_image in batch:
+                    try:
+                        jobs.append((product_image, pool.submit(_render, read_source(product_image))))
+                    except OSError as exc:
+                        failed += 1
+                        self.stdout.write(self.style.WARNING(
+                            f'Could not read image #{product_image.pk}: {exc}'
+                        ))
+                
+                for product_image, job in jobs:
+                    try:
+                        stored = store_derivatives(product_image, job.result())
+                    except Exception as exc:
+                        failed += 1
+                        self.stdout.write(self.style.WARNING(
+                            f'Could not process image #{product_image.pk}: {exc}'
+                        ))
+                        continue
+                    done += stored
+                
+                self.stdout.write(f'Processed images up to #{last_pk}')
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated derivatives for {done} images, {failed} failed'
+        ))
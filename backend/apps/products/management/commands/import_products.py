@@ -0,0 +1,89 @@
+"""
+Management command to bulk import products from a CSV or JSONL file.
+"""
+import os
+
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+from apps.products.importer import run_import
+from apps.products.models import ProductImport
+from apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Import or update products of a seller from a CSV or JSONL file, or resume an import'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', help='CSV or JSONL file to import')
+        parser.add_argument('--seller', help='Email of the seller the products belong to')
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'jsonl'],
+            help='File format, detected from the extension by default',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            help='Rows written per transaction',
+        )
+        parser.add_argument(
+            '--resume',
+            type=int,
+            metavar='IMPORT_ID',
+            help='Continue an unfinished import after its last committed chunk',
+        )
+    
+    def handle(self, *args, **options):
+        if options['resume']:
+            try:
+                product_import = ProductImport.objects.get(pk=options['resume'])
+            except ProductImport.DoesNotExist:
+                raise CommandError(f"Import #{options['resume']} does not exist")
+            # Also take over imports left "running" by a crashed worker
+            statuses = ('pending', 'running', 'failed')
+        else:
+            product_import = self.create_import(options)
+            statuses = ('pending',)
+        
+        self.stdout.write(f'Running import #{product_import.pk} from row {product_import.processed_rows + 1}')
+        if not run_import(product_import, options['chunk_size'], statuses, progress=self.report):
+            raise CommandError(f'Import #{product_import.pk} is already {product_import.status}')
+        
+        summary = (
+            f'Import #{product_import.pk} {product_import.status}: {product_import.processed_rows} rows, '
+            f'{product_import.created_count} created, {product_import.updated_count} updated, '
+            f'{product_import.error_count} errors'
+        )
+        for error in product_import.errors[:20]:
+            self.stdout.write(self.style.WARNING(f"Line {error['line']} ({error['sku']}): {error['errors']}"))
+        if product_import.status == 'failed':
+            raise CommandError(f'{summary}. {product_import.failure_reason}')
+        self.stdout.write(self.style.SUCCESS(summary))
+    
+    def create_import(self, options):
+        path = options['path']
+        if not path or not options['seller']:
+            raise CommandError('Pass a file and --seller, or --resume IMPORT_ID')
+        try:
+            seller = User.objects.get(email=options['seller'], user_type='seller')
+        except User.DoesNotExist:
+            raise CommandError(f"No seller with email {options['seller']}")
+        
+        file_format = options['format'] or {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}.get(
+            os.path.splitext(path)[1].lower()
+        )
+        if not file_format:
+            raise CommandError('Could not detect the file format, pass --format')
+        
+        with open(path, 'rb') as fileobj:
+            return ProductImport.objects.create(
+                seller=seller,
+                file=File(fileobj, name=os.path.basename(path)),
+                file_format=file_format,
+            )
+    
+    def report(self, product_import):
+        self.stdout.write(
+            f'{product_import.processed_rows} rows: {product_import.created_count} created, '
+            f'{product_import.updated_count} updated, {product_import.error_count} errors'
+        )
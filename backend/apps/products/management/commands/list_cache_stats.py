@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from apps.products.cache import CATALOG_VERSION, get_version, list_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Show hit/miss counters of the anonymous listing response cache'
+    
+    def handle(self, *args, **options):
+        stats = list_cache_stats()
+        lookups = stats['hit'] + stats['miss']
+        ratio = stats['hit'] / lookups * 100 if lookups else 0
+        
+        self.stdout.write(f"Catalog version: {get_version(CATALOG_VERSION)}")
+        self.stdout.write(
+            f"Hits: {stats['hit']}, misses: {stats['miss']}, "
+            f"too large to store: {stats['skip']}"
+        )
+        self.stdout.write(self.style.SUCCESS(f'Hit ratio: {ratio:.1f}%'))
@@ -0,0 +1,21 @@
+"""
+Management command to recompute trending scores from order and wishlist history.
+"""
+from django.core.management.base import BaseCommand
+from apps.products.trending import rebuild_trending_scores
+
+
+class Command(BaseCommand):
+    help = 'Recompute product trending scores from recent sales and wishlist adds'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=30,
+            help='How far back to read events',
+        )
+    
+    def handle(self, *args, **options):
+        scored = rebuild_trending_scores(options['days'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt trending scores for {scored} products'))
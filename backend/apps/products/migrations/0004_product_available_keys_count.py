@@ -0,0 +1,34 @@
+# Generated by Django 4.2.10 on 2026-10-18 02:57
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_available_keys_count(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    DigitalKey = apps.get_model('digital_keys', 'DigitalKey')
+    unused_keys = DigitalKey.objects.filter(
+        product=OuterRef('pk'),
+        is_used=False
+    ).order_by().values('product').annotate(total=Count('pk')).values('total')
+    Product.objects.filter(product_type='digital').update(
+        available_keys_count=Coalesce(Subquery(unused_keys), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_rating_aggregates'),
+        ('digital_keys', '0003_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='available_keys_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Available Digital Keys'),
+        ),
+        migrations.RunPython(backfill_available_keys_count, migrations.RunPython.noop),
+    ]
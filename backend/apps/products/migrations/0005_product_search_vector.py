@@ -0,0 +1,53 @@
+# Generated by Django 4.2.10 on 2026-10-18 02:59
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+from apps.products import search
+
+
+def create_search_trigger(apps, schema_editor):
+    # Full-text search is PostgreSQL only, SQLite dev databases fall back to ILIKE
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    # Generated from SEARCH_LANGUAGE_CONFIGS, kept in sync after every migrate
+    search.create_search_trigger(schema_editor.connection)
+    schema_editor.execute("CREATE INDEX products_pr_search_gin_idx ON products_product USING gin (search_vector);")
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS products_pr_search_gin_idx;")
+    search.drop_search_trigger(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_product_available_keys_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Search Vector'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['sku'], name='products_pr_sku_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='product',
+                    index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='products_pr_search_gin_idx'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(create_search_trigger, drop_search_trigger),
+            ],
+        ),
+    ]
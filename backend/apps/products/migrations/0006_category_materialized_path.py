@@ -0,0 +1,56 @@
+# Generated by Django 4.2.10 on 2026-10-18 03:05
+
+from django.db import migrations, models
+
+
+def backfill_category_paths(apps, schema_editor):
+    Category = apps.get_model('products', 'Category')
+    categories = {category.pk: category for category in Category.objects.only('id', 'parent_id', 'name')}
+    
+    def resolve(category):
+        if category.path:
+            return
+        parent = categories.get(category.parent_id)
+        if parent is None:
+            category.path = f'/{category.pk}/'
+            category.depth = 0
+            category.name_path = category.name
+            return
+        resolve(parent)
+        category.path = f'{parent.path}{category.pk}/'
+        category.depth = parent.depth + 1
+        category.name_path = f'{parent.name_path} > {category.name}'
+    
+    for category in categories.values():
+        resolve(category)
+    Category.objects.bulk_update(categories.values(), ['path', 'depth', 'name_path'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_product_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Depth'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='name_path',
+            field=models.TextField(default='', editable=False, verbose_name='Full Name Path'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='path',
+            field=models.CharField(default='', editable=False, max_length=255, verbose_name='Tree Path'),
+        ),
+        migrations.RunPython(backfill_category_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['path'], name='products_ca_path_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.10 on 2026-10-18 03:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_category_materialized_path'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ViewCountFlush',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('batch_id', models.CharField(max_length=32, unique=True, verbose_name='Batch ID')),
+                ('product_count', models.PositiveIntegerField(default=0, verbose_name='Products Updated')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+            ],
+            options={
+                'verbose_name': 'View Count Flush',
+                'verbose_name_plural': 'View Count Flushes',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.10 on 2026-10-18 03:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_viewcountflush'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productimage',
+            name='derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Derivatives'),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='derivatives_source',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='Derivatives Generated From'),
+        ),
+    ]
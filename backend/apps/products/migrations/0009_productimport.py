@@ -0,0 +1,41 @@
+# Generated by Django 4.2.10 on 2026-10-18 03:22
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('products', '0008_productimage_derivatives'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(upload_to='imports/', verbose_name='File')),
+                ('file_format', models.CharField(choices=[('csv', 'CSV'), ('jsonl', 'JSON Lines')], max_length=10, verbose_name='File Format')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20, verbose_name='Status')),
+                ('processed_rows', models.PositiveIntegerField(default=0, verbose_name='Processed Rows')),
+                ('created_count', models.PositiveIntegerField(default=0, verbose_name='Products Created')),
+                ('updated_count', models.PositiveIntegerField(default=0, verbose_name='Products Updated')),
+                ('error_count', models.PositiveIntegerField(default=0, verbose_name='Rows With Errors')),
+                ('errors', models.JSONField(blank=True, default=list, verbose_name='Row Errors')),
+                ('failure_reason', models.TextField(blank=True, verbose_name='Failure Reason')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Started At')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finished At')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('seller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='product_imports', to=settings.AUTH_USER_MODEL, verbose_name='Seller')),
+            ],
+            options={
+                'verbose_name': 'Product Import',
+                'verbose_name_plural': 'Product Imports',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.10 on 2026-10-18 03:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0009_productimport'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductRelation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField(verbose_name='Rank')),
+                ('score', models.FloatField(verbose_name='Similarity')),
+                ('product', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='relations', to='products.product', verbose_name='Product')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_to', to='products.product', verbose_name='Related Product')),
+            ],
+            options={
+                'verbose_name': 'Product Relation',
+                'verbose_name_plural': 'Product Relations',
+                'ordering': ['product', 'rank'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='productrelation',
+            constraint=models.UniqueConstraint(fields=('product', 'rank'), name='products_relation_rank_uniq'),
+        ),
+    ]
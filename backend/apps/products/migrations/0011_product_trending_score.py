@@ -0,0 +1,33 @@
+# Generated by Django 4.2.10 on 2026-10-18 03:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0010_productrelation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingEpoch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(verbose_name='Started At')),
+            ],
+            options={
+                'verbose_name': 'Trending Epoch',
+                'verbose_name_plural': 'Trending Epochs',
+            },
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='trending_score',
+            field=models.FloatField(default=0, editable=False, verbose_name='Trending Score'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-trending_score'], name='products_pr_trendin_cdbaa9_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.10 on 2026-10-18 03:36
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('products', '0011_product_trending_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='promocode',
+            name='usage_limit_per_user',
+            field=models.PositiveIntegerField(blank=True, default=1, null=True, verbose_name='Usage Limit Per User'),
+        ),
+        migrations.CreateModel(
+            name='PromoCodeRedemption',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('use_number', models.PositiveIntegerField(default=1, verbose_name='Use Number')),
+                ('discount_amount', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Discount Amount')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('promo_code', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='redemptions', to='products.promocode', verbose_name='Promo Code')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='promo_code_redemptions', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Promo Code Redemption',
+                'verbose_name_plural': 'Promo Code Redemptions',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='promocoderedemption',
+            constraint=models.UniqueConstraint(fields=('promo_code', 'user', 'use_number'), name='products_promo_redemption_uniq'),
+        ),
+    ]
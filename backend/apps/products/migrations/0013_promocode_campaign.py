@@ -0,0 +1,22 @@
+# Generated by Django 4.2.10 on 2026-10-18 03:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0012_promocoderedemption'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='promocode',
+            name='campaign',
+            field=models.CharField(blank=True, max_length=100, verbose_name='Campaign'),
+        ),
+        migrations.AddIndex(
+            model_name='promocode',
+            index=models.Index(fields=['campaign'], name='products_promo_campaign_idx'),
+        ),
+    ]
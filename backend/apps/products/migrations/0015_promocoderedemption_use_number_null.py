@@ -0,0 +1,18 @@
+# Generated by Django 4.2.10 on 2026-10-18 04:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0014_productimage_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='promocoderedemption',
+            name='use_number',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Use Number'),
+        ),
+    ]
@@ -1,8 +1,22 @@
-from django.db import models
+import re
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+from django.core.exceptions import ValidationError
+from django.db import connections, models, transaction
+from django.db.models.functions import Concat, Substr
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 from django.utils.text import slugify
 from decimal import Decimal
 from apps.users.models import User
+from .search import search_configs
+
+
+def default_rating_histogram():
+    """Empty per-star review histogram (keys are star values 1-5)."""
+    return {str(star): 0 for star in range(1, 6)}
 
 
 class Category(models.Model):
@@ -21,6 +35,12 @@ class Category(models.Model):
     is_active = models.BooleanField(default=True, verbose_name='Is Active')
     order = models.IntegerField(default=0, verbose_name='Display Order')
     description = models.TextField(blank=True, verbose_name='Description')
+    
+    # Materialized path, maintained in save(): "/1/5/12/" for 12 under 5 under 1
+    path = models.CharField(max_length=255, default='', editable=False, verbose_name='Tree Path')
+    depth = models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Depth')
+    name_path = models.TextField(default='', editable=False, verbose_name='Full Name Path')
+    
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Created At')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Updated At')
     
@@ -28,21 +48,158 @@ class Category(models.Model):
         verbose_name = 'Category'
         verbose_name_plural = 'Categories'
         ordering = ['order', 'name']
+        indexes = [
+            models.Index(fields=['path'], name='products_ca_path_idx', opclasses=['varchar_pattern_ops']),
+        ]
     
     def __str__(self):
         return self.name
     
+    def clean(self):
+        if self.parent_id and self.is_ancestor_of(self.parent):
+            raise ValidationError({'parent': 'A category cannot be moved under itself or its subcategories.'})
+    
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+        
+        with transaction.atomic():
+            parent = None
+            if self.parent_id:
+                parent = Category.objects.values('path', 'name_path', 'depth').get(pk=self.parent_id)
+                if self.pk and f'/{self.pk}/' in parent['path']:
+                    raise ValidationError({'parent': 'A category cannot be moved under itself or its subcategories.'})
+            previous = None
+            if self.pk:
+                previous = Category.objects.select_for_update().filter(pk=self.pk).values(
+                    'path', 'name_path', 'depth'
+                ).first()
+            super().save(*args, **kwargs)
+            self._update_path(parent, previous)
+    
+    def _update_path(self, parent, previous):
+        """
+        Store this node's path and rewrite the prefix of every descendant
+        with one UPDATE when the node was renamed or re-parented.
+        """
+        if parent:
+            self.path = f"{parent['path']}{self.pk}/"
+            self.depth = parent['depth'] + 1
+            self.name_path = f"{parent['name_path']} > {self.name}"
+        else:
+            self.path = f'/{self.pk}/'
+            self.depth = 0
+            self.name_path = self.name
+        
+        current = {'path': self.path, 'name_path': self.name_path, 'depth': self.depth}
+        if current == previous:
+            return
+        Category.objects.filter(pk=self.pk).update(**current)
+        
+        if previous and previous['path']:
+            Category.objects.filter(path__startswith=previous['path']).exclude(pk=self.pk).update(
+                path=Concat(
+                    models.Value(self.path), Substr('path', len(previous['path']) + 1),
+                    output_field=models.CharField()
+                ),
+                name_path=Concat(
+                    models.Value(self.name_path), Substr('name_path', len(previous['name_path']) + 1),
+                    output_field=models.TextField()
+                ),
+                depth=models.F('depth') + (self.depth - previous['depth']),
+                updated_at=timezone.now(),
+            )
+    
+    def is_ancestor_of(self, category):
+        """Whether `category` is this node or lies in its subtree."""
+        return bool(self.pk) and f'/{self.pk}/' in category.path
+    
+    def get_descendants(self, include_self=True):
+        """Whole subtree in a single indexed prefix query."""
+        queryset = Category.objects.filter(path__startswith=self.path)
+        if not include_self:
+            queryset = queryset.exclude(pk=self.pk)
+        return queryset
     
     @property
     def full_path(self):
         """Get full category path (e.g., 'Electronics > Phones > Smartphones')"""
-        if self.parent:
-            return f"{self.parent.full_path} > {self.name}"
-        return self.name
+        return self.name_path or self.name
+
+
+class ProductQuerySet(models.QuerySet):
+    """Reusable product query helpers."""
+    
+    IN_STOCK = (
+        models.Q(product_type='physical', stock_quantity__gt=0) |
+        models.Q(product_type='digital', available_keys_count__gt=0)
+    )
+    
+    def in_stock(self, value=True):
+        """Filter products by stock availability using stored counters only."""
+        if value:
+            return self.filter(self.IN_STOCK)
+        return self.exclude(self.IN_STOCK)
+    
+    def search(self, text):
+        """
+        Full-text product search used by the `?search=` API parameter.
+        
+        On PostgreSQL this matches the stored `search_vector` (GIN indexed)
+        against the query in every configured language, plus exact SKU
+        prefixes, and annotates `search_rank` for relevance ordering. Every
+        term also matches as a word prefix ("phon" finds "phone"), like the
+        substring search did; only text inside a word no longer matches
+        ("phone" does not find "smartphone"). Other databases keep the
+        case-insensitive substring match where every term must appear in the
+        name, description or SKU.
+        """
+        terms = text.replace(',', ' ').split()
+        if not terms:
+            return self
+        
+        if connections[self.db].vendor != 'postgresql':
+            queryset = self
+            for term in terms:
+                queryset = queryset.filter(
+                    models.Q(name__icontains=term) |
+                    models.Q(description__icontains=term) |
+                    models.Q(sku__icontains=term)
+                )
+            return queryset
+        
+        text = ' '.join(terms)
+        query = None
+        for config in search_configs():
+            language_query = SearchQuery(text, config=config, search_type='websearch')
+            query = language_query if query is None else query | language_query
+        # Every word as an unstemmed prefix
+        words = re.findall(r'\w+', text.lower())
+        if words:
+            query |= SearchQuery(
+                ' & '.join(f"'{word}':*" for word in words),
+                config='simple',
+                search_type='raw'
+            )
+        
+        sku_prefix = models.Q(sku__startswith=text) | models.Q(sku__startswith=text.upper())
+        return self.filter(models.Q(search_vector=query) | sku_prefix).annotate(
+            search_rank=SearchRank(models.F('search_vector'), query) + models.Case(
+                models.When(sku_prefix, then=models.Value(1.0)),
+                default=models.Value(0.0),
+                output_field=models.FloatField()
+            )
+        )
+    
+    def with_stock_status(self):
+        """Annotate `in_stock` so lists can be ordered by availability in SQL."""
+        return self.annotate(
+            in_stock=models.Case(
+                models.When(self.IN_STOCK, then=models.Value(True)),
+                default=models.Value(False),
+                output_field=models.BooleanField()
+            )
+        )
 
 
 class Product(models.Model):
@@ -90,13 +247,34 @@ class Product(models.Model):
     )
     sku = models.CharField(max_length=100, unique=True, verbose_name='SKU')
     stock_quantity = models.PositiveIntegerField(default=0, verbose_name='Stock Quantity')
+    available_keys_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Available Digital Keys'
+    )
     is_active = models.BooleanField(default=True, verbose_name='Is Active')
     is_approved = models.BooleanField(default=False, verbose_name='Is Approved by Admin')
     sold_count = models.PositiveIntegerField(default=0, verbose_name='Sold Count')
     view_count = models.PositiveIntegerField(default=0, verbose_name='View Count')
+    # Time-decayed sales/wishlist/view activity, see apps.products.trending
+    trending_score = models.FloatField(default=0, editable=False, verbose_name='Trending Score')
+    # Maintained by a database trigger on PostgreSQL, see migration 0005
+    search_vector = SearchVectorField(null=True, editable=False, verbose_name='Search Vector')
+    rating_average = models.DecimalField(
+        max_digits=3,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name='Average Rating'
+    )
+    rating_count = models.PositiveIntegerField(default=0, verbose_name='Rating Count')
+    rating_histogram = models.JSONField(
+        default=default_rating_histogram,
+        verbose_name='Rating Histogram'
+    )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Created At')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Updated At')
     
+    objects = ProductQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Product'
         verbose_name_plural = 'Products'
@@ -107,6 +285,9 @@ class Product(models.Model):
             models.Index(fields=['category', 'is_active', 'is_approved']),
             models.Index(fields=['-created_at']),
             models.Index(fields=['-sold_count']),
+            models.Index(fields=['-trending_score']),
+            models.Index(fields=['sku'], name='products_pr_sku_prefix_idx', opclasses=['varchar_pattern_ops']),
+            GinIndex(fields=['search_vector'], name='products_pr_search_gin_idx'),
         ]
     
     def __str__(self):
@@ -121,8 +302,8 @@ class Product(models.Model):
     def is_in_stock(self):
         """Check if product is in stock."""
         if self.product_type == 'digital':
-            # For digital products, check if there are unused keys
-            return self.digital_keys.filter(is_used=False).exists()
+            # For digital products, check the stored count of unused keys
+            return self.available_keys_count > 0
         return self.stock_quantity > 0
     
     @property
@@ -135,11 +316,8 @@ class Product(models.Model):
     
     @property
     def average_rating(self):
-        """Calculate average rating from reviews."""
-        reviews = self.reviews.filter(is_approved=True)
-        if reviews.exists():
-            return round(reviews.aggregate(models.Avg('rating'))['rating__avg'], 2)
-        return 0
+        """Average rating of approved reviews (denormalized, see Review.refresh_product_rating)."""
+        return float(self.rating_average)
 
 
 class ProductImage(models.Model):
@@ -153,7 +331,17 @@ class ProductImage(models.Model):
     image = models.ImageField(upload_to='products/', verbose_name='Image')
     is_primary = models.BooleanField(default=False, verbose_name='Is Primary Image')
     order = models.IntegerField(default=0, verbose_name='Display Order')
+    # Resized copies by format and width, see apps.products.images
+    derivatives = models.JSONField(default=dict, blank=True, editable=False, verbose_name='Derivatives')
+    derivatives_source = models.CharField(
+        max_length=255,
+        blank=True,
+        editable=False,
+        verbose_name='Derivatives Generated From'
+    )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Created At')
+    # Part of the product ETag, so queryset updates set it too
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Updated At')
     
     class Meta:
         verbose_name = 'Product Image'
@@ -166,7 +354,9 @@ class ProductImage(models.Model):
     def save(self, *args, **kwargs):
         # If this is set as primary, unset other primary images
         if self.is_primary:
-            ProductImage.objects.filter(product=self.product, is_primary=True).update(is_primary=False)
+            ProductImage.objects.filter(product=self.product, is_primary=True).update(
+                is_primary=False, updated_at=timezone.now()
+            )
         super().save(*args, **kwargs)
 
 
@@ -271,13 +461,25 @@ class PromoCode(models.Model):
         verbose_name='Usage Limit'
     )
     used_count = models.PositiveIntegerField(default=0, verbose_name='Used Count')
+    usage_limit_per_user = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        default=1,
+        verbose_name='Usage Limit Per User'
+    )
     is_active = models.BooleanField(default=True, verbose_name='Is Active')
+    # Set on codes generated in bulk, see apps.products.promo_generator
+    campaign = models.CharField(max_length=100, blank=True, verbose_name='Campaign')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Created At')
     
     class Meta:
         verbose_name = 'Promo Code'
         verbose_name_plural = 'Promo Codes'
         ordering = ['-created_at']
+        indexes = [
+            # Plain index, campaigns are never matched with LIKE
+            models.Index(fields=['campaign'], name='products_promo_campaign_idx'),
+        ]
     
     def __str__(self):
         return self.code
@@ -311,3 +513,155 @@ class PromoCode(models.Model):
             discount = self.discount_value
         
         return min(discount, order_amount)
+
+
+class PromoCodeRedemption(models.Model):
+    """A use of a promo code by a user, see apps.products.promo_codes."""
+    promo_code = models.ForeignKey(
+        PromoCode,
+        on_delete=models.CASCADE,
+        related_name='redemptions',
+        verbose_name='Promo Code'
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='promo_code_redemptions',
+        verbose_name='User'
+    )
+    # 1 for the user's first use of the code, 2 for the second, ...; empty
+    # for codes without a per-user limit, which need no uniqueness check
+    use_number = models.PositiveIntegerField(null=True, blank=True, verbose_name='Use Number')
+    discount_amount = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        verbose_name='Discount Amount'
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Created At')
+    
+    class Meta:
+        verbose_name = 'Promo Code Redemption'
+        verbose_name_plural = 'Promo Code Redemptions'
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['promo_code', 'user', 'use_number'],
+                name='products_promo_redemption_uniq'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.promo_code.code} by {self.user.email}"
+
+
+class ViewCountFlush(models.Model):
+    """Batches of buffered view counts already applied to products."""
+    batch_id = models.CharField(max_length=32, unique=True, verbose_name='Batch ID')
+    product_count = models.PositiveIntegerField(default=0, verbose_name='Products Updated')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Created At')
+    
+    class Meta:
+        verbose_name = 'View Count Flush'
+        verbose_name_plural = 'View Count Flushes'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return self.batch_id
+
+
+class ProductImport(models.Model):
+    """Bulk product upload from a CSV or JSONL file, see apps.products.importer."""
+    FORMAT_CHOICES = (
+        ('csv', 'CSV'),
+        ('jsonl', 'JSON Lines'),
+    )
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    )
+    
+    seller = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='product_imports',
+        verbose_name='Seller'
+    )
+    file = models.FileField(upload_to='imports/', verbose_name='File')
+    file_format = models.CharField(max_length=10, choices=FORMAT_CHOICES, verbose_name='File Format')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name='Status')
+    # Rows already committed, a resumed import skips them
+    processed_rows = models.PositiveIntegerField(default=0, verbose_name='Processed Rows')
+    created_count = models.PositiveIntegerField(default=0, verbose_name='Products Created')
+    updated_count = models.PositiveIntegerField(default=0, verbose_name='Products Updated')
+    error_count = models.PositiveIntegerField(default=0, verbose_name='Rows With Errors')
+    errors = models.JSONField(default=list, blank=True, verbose_name='Row Errors')
+    failure_reason = models.TextField(blank=True, verbose_name='Failure Reason')
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name='Started At')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Finished At')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Created At')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Updated At')
+    
+    class Meta:
+        verbose_name = 'Product Import'
+        verbose_name_plural = 'Product Imports'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"Import #{self.pk} by {self.seller.email}"
+    
+    @staticmethod
+    def stale_before():
+        """Running imports last saved before this time were killed."""
+        return timezone.now() - timedelta(seconds=settings.PRODUCT_IMPORT_STALE_AFTER)
+    
+    @property
+    def is_stale(self):
+        return self.status == 'running' and self.updated_at < self.stale_before()
+
+
+class ProductRelation(models.Model):
+    """
+    Precomputed "frequently bought together" products, rebuilt nightly by
+    apps.products.related.
+    """
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='relations',
+        # Covered by the (product, rank) constraint index
+        db_index=False,
+        verbose_name='Product'
+    )
+    related = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='related_to',
+        verbose_name='Related Product'
+    )
+    rank = models.PositiveSmallIntegerField(verbose_name='Rank')
+    score = models.FloatField(verbose_name='Similarity')
+    
+    class Meta:
+        verbose_name = 'Product Relation'
+        verbose_name_plural = 'Product Relations'
+        ordering = ['product', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'rank'], name='products_relation_rank_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.product_id} -> {self.related_id} ({self.score:.3f})"
+
+
+class TrendingEpoch(models.Model):
+    """Reference time of the stored trending scores (a single row)."""
+    started_at = models.DateTimeField(verbose_name='Started At')
+    
+    class Meta:
+        verbose_name = 'Trending Epoch'
+        verbose_name_plural = 'Trending Epochs'
+    
+    def __str__(self):
+        return f"Trending scores since {self.started_at}"
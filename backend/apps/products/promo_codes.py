@@ -0,0 +1,110 @@
+"""
+Promo code validation and redemption.
+
+Lookups read a PromoCode snapshot cached for PROMO_CODE_CACHE_TIMEOUT
+seconds (unknown codes are cached too), so checkout pages and guessing
+do not hit the database. The snapshot's `used_count` may be slightly
+stale, which is fine for validation only.
+
+Redemption is decided by the database: the use is recorded first, then a
+single conditional `UPDATE ... SET used_count = used_count + 1 WHERE
+used_count < usage_limit` claims it and the transaction rolls back if no
+row matched. The UPDATE is the last statement, so the promo code row is
+locked only for the commit; callers running redemption inside a larger
+checkout transaction should redeem as late as possible for the same reason.
+Per-user limits rely on the unique (promo code, user, use number)
+constraint, so two concurrent uses by the same user cannot both pass.
+Codes without a per-user limit record uses without a use number, NULLs
+never collide, so concurrent uses by one user all go through.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
+
+from .models import PromoCode, PromoCodeRedemption
+
+CACHE_KEY = 'promo_code:{}'
+# Cached for codes that do not exist
+MISSING = 'missing'
+
+
+class PromoCodeError(Exception):
+    """The code cannot be applied; the message is shown to the customer."""
+
+
+def get_promo_code(code):
+    """Cached PromoCode by code, or None."""
+    code = (code or '').strip()
+    if not code or len(code) > PromoCode._meta.get_field('code').max_length:
+        return None
+    
+    key = CACHE_KEY.format(code)
+    promo = cache.get(key)
+    if promo is None:
+        promo = PromoCode.objects.filter(code=code).first() or MISSING
+        cache.set(key, promo, settings.PROMO_CODE_CACHE_TIMEOUT)
+    return None if promo == MISSING else promo
+
+
+def invalidate_promo_code(code):
+    transaction.on_commit(lambda: cache.delete(CACHE_KEY.format(code)))
+
+
+def check_promo_code(code, order_amount):
+    """
+    Return the promo code and the discount it gives on `order_amount`, or
+    raise PromoCodeError. Nothing is reserved.
+    """
+    promo = get_promo_code(code)
+    if promo is None:
+        raise PromoCodeError('Promo code not found.')
+    
+    valid, message = promo.is_valid()
+    if not valid:
+        raise PromoCodeError(message)
+    if promo.min_purchase_amount and order_amount < promo.min_purchase_amount:
+        raise PromoCodeError(f'Minimum purchase amount is {promo.min_purchase_amount}.')
+    return promo, promo.calculate_discount(order_amount)
+
+
+def check_user_limit(promo, user):
+    """Number of earlier uses by `user`; raises when the per-user limit is reached."""
+    uses = PromoCodeRedemption.objects.filter(promo_code_id=promo.pk, user=user).count()
+    if promo.usage_limit_per_user is not None and uses >= promo.usage_limit_per_user:
+        raise PromoCodeError('You have already used this promo code.')
+    return uses
+
+
+def redeem_promo_code(code, user, order_amount):
+    """
+    Validate and use a promo code once. Returns the PromoCodeRedemption or
+    raises PromoCodeError; the use only counts if the caller's transaction
+    commits.
+    """
+    promo, discount = check_promo_code(code, order_amount)
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            use_number = None
+            if promo.usage_limit_per_user is not None:
+                use_number = check_user_limit(promo, user) + 1
+            redemption = PromoCodeRedemption.objects.create(
+                promo_code_id=promo.pk,
+                user=user,
+                use_number=use_number,
+                discount_amount=discount
+            )
+            claimed = PromoCode.objects.filter(
+                models.Q(usage_limit__isnull=True) | models.Q(used_count__lt=models.F('usage_limit')),
+                pk=promo.pk,
+                is_active=True,
+                valid_from__lte=now,
+                valid_to__gte=now,
+            ).update(used_count=models.F('used_count') + 1)
+            if not claimed:
+                raise PromoCodeError('Promo code is no longer available.')
+    except IntegrityError:
+        # A concurrent use by the same user took this use number
+        raise PromoCodeError('You have already used this promo code.')
+    return redemption
@@ -0,0 +1,165 @@
+"""
+Bulk generation of single-use campaign promo codes.
+
+A code is an optional prefix, random symbols from Crockford's base32
+alphabet (no I, L, O or U, so codes typed from a flyer are not ambiguous)
+and a Luhn mod 32 check symbol, which catches any single mistyped symbol
+and most swapped neighbours. Random bytes come from os.urandom and are
+turned into codes with numpy, a million codes take well under a second.
+
+Every chunk is deduplicated in memory and written in its own transaction.
+On PostgreSQL it is COPied into a staging table and moved over with one
+sorted `INSERT ... ON CONFLICT DO NOTHING`, so the unique index does the
+existence check for the whole chunk (a separate `code IN (...)` query per
+batch was slower than the insert itself). Elsewhere codes already taken are
+filtered out with batched `code IN (...)` queries and the rest is written
+with bulk_create, a code created concurrently fails the chunk. Codes
+skipped either way are generated again until the requested number exists.
+"""
+import io
+import os
+import string
+
+import numpy as np
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+
+from .models import PromoCode
+
+SYMBOLS = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+ALPHABET = np.frombuffer(SYMBOLS.encode('ascii'), dtype=np.uint8)
+# Every code of a campaign must fit in this share of the code space, which
+# keeps random collisions rare
+MAX_SPACE_USAGE = 0.001
+
+
+def make_codes(count, length, prefix=''):
+    """
+    `count` random codes with `length` random symbols and a check symbol.
+    Codes are not checked for duplicates.
+    """
+    symbols = np.frombuffer(os.urandom(count * length), dtype=np.uint8).reshape(count, length) & 31
+    
+    # Luhn mod N: double every second symbol counting from the check symbol
+    factors = np.where(np.arange(length)[::-1] % 2 == 0, 2, 1)
+    addends = symbols.astype(np.int64) * factors
+    check = -(addends // 32 + addends % 32).sum(axis=1) % 32
+    
+    prefix = prefix.encode('ascii')
+    chars = np.empty((count, len(prefix) + length + 1), dtype=np.uint8)
+    chars[:, :len(prefix)] = np.frombuffer(prefix, dtype=np.uint8)
+    chars[:, len(prefix):-1] = ALPHABET[symbols]
+    chars[:, -1] = ALPHABET[check]
+    return chars.view(f'S{chars.shape[1]}').ravel().astype(str).tolist()
+
+
+def is_valid_code(code, prefix=''):
+    """Whether `code` has the prefix and a matching check symbol."""
+    if not code.startswith(prefix) or len(code) < len(prefix) + 2:
+        return False
+    symbols = [SYMBOLS.find(char) for char in code[len(prefix):]]
+    if min(symbols) < 0:
+        return False
+    total = 0
+    for position, symbol in enumerate(reversed(symbols)):
+        if position % 2:
+            symbol *= 2
+        total += symbol // 32 + symbol % 32
+    return total % 32 == 0
+
+
+def generate_promo_codes(count, campaign, prefix='', length=None, chunk_size=None, progress=None, **attrs):
+    """
+    Create `count` new single-use promo codes for `campaign`; `attrs` are
+    the other PromoCode fields (discount_type, discount_value, valid_from,
+    valid_to, ...). Calls `progress(created, count)` after every chunk and
+    returns the number of codes created.
+    
+    Raises ValueError for a code format that cannot hold `count` codes and
+    ValidationError for invalid field values.
+    """
+    length = length or settings.PROMO_CODE_GENERATION_LENGTH
+    chunk_size = chunk_size or settings.PROMO_CODE_GENERATION_CHUNK_SIZE
+    prefix = prefix.upper()
+    if not all(char in string.ascii_uppercase + string.digits + '-' for char in prefix):
+        raise ValueError('The prefix may only contain Latin letters, digits and "-"')
+    if len(prefix) + length + 1 > PromoCode._meta.get_field('code').max_length:
+        raise ValueError('Codes would be longer than the promo code field allows')
+    if count > 32 ** length * MAX_SPACE_USAGE:
+        raise ValueError(f'Codes with {length} random symbols cannot hold {count} unique codes, use a longer length')
+    
+    template = PromoCode(campaign=campaign, usage_limit=1, usage_limit_per_user=1, **attrs)
+    template.full_clean(exclude=['code'], validate_unique=False)
+    
+    created = 0
+    while created < count:
+        codes = make_codes(min(chunk_size, count - created), length, prefix)
+        if connection.vendor == 'postgresql':
+            with transaction.atomic():
+                created += _copy_codes(set(codes), template)
+        else:
+            try:
+                with transaction.atomic():
+                    inserted = PromoCode.objects.bulk_create(
+                        [_from_template(template, code) for code in _unused(set(codes))]
+                    )
+                created += len(inserted)
+            except IntegrityError:
+                # A code was created concurrently, generate the chunk again
+                pass
+        if progress:
+            progress(created, count)
+    return created
+
+
+def _unused(codes):
+    """The codes not taken yet, in batches of one query each."""
+    codes = list(codes)
+    batch_size = settings.PROMO_CODE_GENERATION_EXISTS_BATCH_SIZE
+    taken = set()
+    for start in range(0, len(codes), batch_size):
+        taken.update(PromoCode.objects.filter(
+            code__in=codes[start:start + batch_size]
+        ).values_list('code', flat=True))
+    return [code for code in codes if code not in taken]
+
+
+def _from_template(template, code):
+    promo = PromoCode(code=code)
+    for field in PromoCode._meta.concrete_fields:
+        if not field.primary_key and field.name != 'code':
+            setattr(promo, field.attname, getattr(template, field.attname))
+    return promo
+
+
+def _copy_codes(codes, template):
+    if not codes:
+        return 0
+    
+    quote = connection.ops.quote_name
+    fields = [
+        field for field in PromoCode._meta.concrete_fields
+        if not field.primary_key and field.name != 'code'
+    ]
+    # pre_save fills created_at for the chunk
+    values = [field.get_db_prep_save(field.pre_save(template, True), connection) for field in fields]
+    columns = ', '.join(quote(field.column) for field in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    
+    with connection.cursor() as cursor:
+        # Dropped explicitly as well: inside a caller's transaction the
+        # chunk's atomic block is only a savepoint and the commit is later
+        cursor.execute('CREATE TEMPORARY TABLE promo_code_staging (code varchar(50)) ON COMMIT DROP')
+        cursor.copy_expert(
+            'COPY promo_code_staging (code) FROM STDIN',
+            io.StringIO('\n'.join(codes) + '\n')
+        )
+        cursor.execute(
+            f'INSERT INTO {quote(PromoCode._meta.db_table)} ({quote("code")}, {columns}) '
+            f'SELECT code, {placeholders} FROM promo_code_staging ORDER BY code '
+            f'ON CONFLICT ({quote("code")}) DO NOTHING',
+            values
+        )
+        inserted = cursor.rowcount
+        cursor.execute('DROP TABLE promo_code_staging')
+        return inserted
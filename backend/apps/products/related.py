@@ -0,0 +1,122 @@
+"""
+"Frequently bought together" recommendations.
+
+Order lines of paid orders are streamed ordered by order in chunks of
+RELATED_PRODUCTS_CHUNK_SIZE, so memory stays bounded by the chunk and the
+number of distinct product pairs, not by the order history. Each chunk
+becomes a sparse order x product matrix B and `B.T @ B` is added to the
+item-item co-occurrence matrix. Pairs are scored with cosine similarity
+(co-purchases / sqrt(orders of a * orders of b)) and the top
+RELATED_PRODUCTS_TOP_K per product are written to ProductRelation.
+"""
+from itertools import islice
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from scipy import sparse
+
+from .models import Product, ProductRelation
+
+
+def build_related_products(top_k=None, min_support=None, chunk_size=None):
+    """Rebuild ProductRelation. Returns the number of relations stored."""
+    top_k = top_k or settings.RELATED_PRODUCTS_TOP_K
+    min_support = min_support or settings.RELATED_PRODUCTS_MIN_SUPPORT
+    chunk_size = chunk_size or settings.RELATED_PRODUCTS_CHUNK_SIZE
+    
+    product_ids = np.fromiter(
+        Product.objects.order_by('pk').values_list('pk', flat=True).iterator(),
+        dtype=np.int64
+    )
+    if not len(product_ids):
+        return _store(product_ids, [], [], [], [])
+    
+    cooccurrence = sparse.csr_matrix((len(product_ids), len(product_ids)), dtype=np.int32)
+    for lines in _iter_order_lines(chunk_size):
+        cooccurrence = cooccurrence + _cooccurrence(lines, product_ids)
+    
+    rows, columns, scores, ranks = top_related(cooccurrence, top_k, min_support)
+    return _store(product_ids, rows, columns, scores, ranks)
+
+
+def _iter_order_lines(chunk_size):
+    """
+    Yield `(order_id, product_id)` arrays holding complete orders: the
+    lines of the last order in a chunk are carried over to the next one.
+    """
+    from apps.orders.models import OrderItem
+    
+    lines = OrderItem.objects.filter(
+        order__payment_status='completed',
+        product__isnull=False
+    ).exclude(
+        status__in=['cancelled', 'refunded']
+    ).order_by('order_id').values_list('order_id', 'product_id').iterator(chunk_size=chunk_size)
+    
+    carry = np.empty((0, 2), dtype=np.int64)
+    while True:
+        chunk = np.array(list(islice(lines, chunk_size)), dtype=np.int64).reshape(-1, 2)
+        if not len(chunk):
+            break
+        chunk = np.concatenate([carry, chunk])
+        last = chunk[:, 0] == chunk[-1, 0]
+        carry = chunk[last]
+        if (~last).any():
+            yield chunk[~last]
+    if len(carry):
+        yield carry
+
+
+def _cooccurrence(lines, product_ids):
+    """Product x product co-purchase counts of the orders in `lines`."""
+    columns = np.searchsorted(product_ids, lines[:, 1])
+    # Products created after the id snapshot are skipped
+    known = (columns < len(product_ids)) & (product_ids[np.minimum(columns, len(product_ids) - 1)] == lines[:, 1])
+    _, orders = np.unique(lines[known, 0], return_inverse=True)
+    baskets = sparse.csr_matrix(
+        (np.ones(known.sum(), dtype=np.int32), (orders, columns[known])),
+        shape=(orders.max() + 1 if len(orders) else 0, len(product_ids))
+    )
+    # Several lines of the same product (e.g. variants) count once per order
+    baskets.data[:] = 1
+    return (baskets.T @ baskets).tocsr()
+
+
+def top_related(cooccurrence, top_k, min_support=1):
+    """
+    Cosine-normalize a co-occurrence matrix (its diagonal holds the number
+    of orders per product) and keep the `top_k` best pairs of every row.
+    Returns `(rows, columns, scores, ranks)` arrays, ranks start at 1.
+    """
+    counts = cooccurrence.diagonal().astype(np.float64)
+    pairs = sparse.triu(cooccurrence, k=1).tocoo()
+    keep = pairs.data >= min_support
+    rows = np.concatenate([pairs.row[keep], pairs.col[keep]])
+    columns = np.concatenate([pairs.col[keep], pairs.row[keep]])
+    together = np.tile(pairs.data[keep].astype(np.float64), 2)
+    scores = together / np.sqrt(counts[rows] * counts[columns])
+    
+    order = np.lexsort((columns, -scores, rows))
+    rows, columns, scores = rows[order], columns[order], scores[order]
+    ranks = np.arange(len(rows)) - np.searchsorted(rows, rows) + 1
+    best = ranks <= top_k
+    return rows[best], columns[best], scores[best], ranks[best]
+
+
+def _store(product_ids, rows, columns, scores, ranks):
+    batch_size = settings.RELATED_PRODUCTS_WRITE_BATCH_SIZE
+    with transaction.atomic():
+        ProductRelation.objects.all().delete()
+        for start in range(0, len(rows), batch_size):
+            stop = start + batch_size
+            ProductRelation.objects.bulk_create([
+                ProductRelation(product_id=product, related_id=related, score=score, rank=rank)
+                for product, related, score, rank in zip(
+                    product_ids[rows[start:stop]].tolist(),
+                    product_ids[columns[start:stop]].tolist(),
+                    np.round(scores[start:stop], 6).tolist(),
+                    ranks[start:stop].tolist(),
+                )
+            ])
+    return len(rows)
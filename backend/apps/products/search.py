@@ -0,0 +1,86 @@
+"""
+PostgreSQL full-text search vector for products.
+
+`Product.search_vector` is filled by a trigger whose SQL is generated from
+SEARCH_LANGUAGE_CONFIGS: SKU, name and description in every configured
+language plus 'simple' (unstemmed words, used for prefix matching). The
+migration creates the trigger with the settings of the time, and after
+every `migrate` `sync_search_trigger` replaces it and refills the vectors
+if the settings changed since, so the stored vectors and the search query
+never use different languages.
+"""
+from django.conf import settings
+
+FUNCTION_NAME = 'products_product_search_vector_update'
+TRIGGER_NAME = 'products_product_search_vector_trigger'
+
+
+def search_configs():
+    """Text search configurations in use, 'simple' always last."""
+    configs = [config for config in settings.SEARCH_LANGUAGE_CONFIGS.values() if config != 'simple']
+    return list(dict.fromkeys(configs)) + ['simple']
+
+
+def search_vector_sql(row):
+    """SQL expression of the search vector of `row` (a table name or NEW)."""
+    parts = [f"setweight(to_tsvector('simple', coalesce({row}.sku, '')), 'A')"]
+    for column, weight in (('name', 'A'), ('description', 'B')):
+        parts += [
+            f"setweight(to_tsvector('{config}', coalesce({row}.{column}, '')), '{weight}')"
+            for config in search_configs()
+        ]
+    return ' || '.join(parts)
+
+
+def function_body():
+    return f"""
+BEGIN
+    NEW.search_vector := {search_vector_sql('NEW')};
+    RETURN NEW;
+END
+"""
+
+
+def create_search_trigger(connection, refill=True):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE OR REPLACE FUNCTION {FUNCTION_NAME}() RETURNS trigger AS $$'
+            f'{function_body()}$$ LANGUAGE plpgsql;'
+        )
+        cursor.execute(f'DROP TRIGGER IF EXISTS {TRIGGER_NAME} ON products_product;')
+        cursor.execute(
+            f'CREATE TRIGGER {TRIGGER_NAME} '
+            f'BEFORE INSERT OR UPDATE OF name, description, sku ON products_product '
+            f'FOR EACH ROW EXECUTE FUNCTION {FUNCTION_NAME}();'
+        )
+        if refill:
+            cursor.execute(f"UPDATE products_product SET search_vector = {search_vector_sql('products_product')};")
+
+
+def drop_search_trigger(connection):
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TRIGGER IF EXISTS {TRIGGER_NAME} ON products_product;')
+        cursor.execute(f'DROP FUNCTION IF EXISTS {FUNCTION_NAME}();')
+
+
+def search_trigger_in_sync(connection):
+    """
+    Whether the installed trigger function matches SEARCH_LANGUAGE_CONFIGS,
+    None when there is no trigger (not migrated yet, or not PostgreSQL).
+    """
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT prosrc FROM pg_proc WHERE proname = %s', [FUNCTION_NAME])
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    return row[0].strip() == function_body().strip()
+
+
+def sync_search_trigger(connection):
+    """Rebuild the trigger and all vectors if the settings changed. Returns True if it did."""
+    if search_trigger_in_sync(connection) is not False:
+        return False
+    create_search_trigger(connection)
+    return True
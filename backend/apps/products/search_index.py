@@ -0,0 +1,124 @@
+"""
+Batched synchronisation of products with the Elasticsearch index.
+
+Product, review and digital key events only add product ids to a pending set
+in Redis. The `flush_product_search_index` Celery task drains that set and
+sends the changes to Elasticsearch with one bulk request per batch, instead
+of one HTTP call per model save. Documents Elasticsearch rejects go back to
+the pending set for the next run.
+"""
+import logging
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+
+from apps.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = 'search_index:products:pending'
+
+
+def search_index_enabled():
+    return apps.is_installed('django_elasticsearch_dsl')
+
+
+def queue_product_index(product_ids):
+    """
+    Mark products as changed; they are pushed to Elasticsearch in the next
+    flush after the current transaction commits.
+    """
+    if not search_index_enabled():
+        return
+    
+    ids = {int(pk) for pk in product_ids if pk is not None}
+    if ids:
+        transaction.on_commit(lambda: _add_pending(ids))
+
+
+def _add_pending(ids):
+    redis = get_redis()
+    if redis is None:
+        # No shared queue available, index right away in a single batch. The
+        # transaction is already committed, a search index outage must not
+        # fail the request that saved the products
+        try:
+            failed = index_products(ids)
+        except Exception:
+            logger.exception('Failed to sync products %s with search index', sorted(ids))
+        else:
+            if failed:
+                logger.error('Products %s were not synced with search index', sorted(failed))
+        return
+    redis.sadd(PENDING_KEY, *ids)
+
+
+def flush_product_index(batch_size=None):
+    """
+    Drain the pending set in batches. Ids of a failed batch and of documents
+    Elasticsearch rejected are put back so the next run retries them.
+    Returns the number of products synced.
+    """
+    redis = get_redis()
+    if redis is None or not search_index_enabled():
+        return 0
+    
+    batch_size = batch_size or settings.PRODUCT_SEARCH_INDEX_BATCH_SIZE
+    processed = 0
+    retry = set()
+    try:
+        while True:
+            ids = [int(pk) for pk in redis.spop(PENDING_KEY, batch_size)]
+            if not ids:
+                break
+            try:
+                failed = index_products(ids)
+            except Exception:
+                retry.update(ids)
+                raise
+            retry.update(failed)
+            processed += len(ids) - len(failed)
+    finally:
+        # Put back only after the loop, this run would pop them again
+        if retry:
+            redis.sadd(PENDING_KEY, *retry)
+    return processed
+
+
+def index_products(product_ids, using='default'):
+    """
+    Index the given products and delete the ones that no longer exist with a
+    single bulk request. Returns the ids of the products that failed.
+    """
+    from elasticsearch.helpers import bulk
+    from elasticsearch_dsl.connections import connections
+    from .documents import ProductDocument
+    
+    product_ids = set(product_ids)
+    document = ProductDocument()
+    products = list(document.get_queryset().filter(pk__in=product_ids))
+    
+    actions = list(document.get_actions(products, 'index'))
+    deleted_ids = product_ids - {product.pk for product in products}
+    actions.extend(
+        {'_op_type': 'delete', '_index': document._index._name, '_id': pk}
+        for pk in deleted_ids
+    )
+    if not actions:
+        return set()
+    
+    _, errors = bulk(
+        connections.get_connection(using),
+        actions,
+        raise_on_error=False,
+    )
+    failed = set()
+    for error in errors:
+        # Deleting a product that was never indexed is not an error
+        if error.get('delete', {}).get('status') == 404:
+            continue
+        logger.error('Failed to sync product with search index: %s', error)
+        op, = error.values()
+        failed.add(int(op['_id']))
+    return failed
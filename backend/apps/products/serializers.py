@@ -1,24 +1,57 @@
+from decimal import Decimal
+
+from django.core.files.storage import default_storage
 from rest_framework import serializers
-from .models import Category, Product, ProductImage, Wishlist, PromoCode
+from apps.core.serializers import SparseFieldsetMixin
+from .images import srcset
+from .models import Category, Product, ProductImage, ProductImport, Wishlist, PromoCode
 
 
 class CategorySerializer(serializers.ModelSerializer):
+    full_path = serializers.CharField(read_only=True)
+    
     class Meta:
         model = Category
-        fields = ['id', 'name', 'slug', 'parent', 'icon', 'is_active', 'description']
+        fields = ['id', 'name', 'slug', 'parent', 'icon', 'is_active', 'description', 'depth', 'full_path']
+        read_only_fields = ['depth']
+    
+    def validate_parent(self, value):
+        if value and self.instance and self.instance.is_ancestor_of(value):
+            raise serializers.ValidationError('A category cannot be moved under itself or its subcategories.')
+        return value
 
 
 class ProductImageSerializer(serializers.ModelSerializer):
+    srcset = serializers.SerializerMethodField()
+    
     class Meta:
         model = ProductImage
-        fields = ['id', 'image', 'alt_text', 'order']
+        fields = ['id', 'image', 'is_primary', 'order', 'srcset']
+    
+    def get_srcset(self, obj):
+        """Resized copies per format, e.g. {'webp': 'url 160w, url 320w'}"""
+        request = self.context.get('request')
+        
+        def build_url(name):
+            url = default_storage.url(name)
+            return request.build_absolute_uri(url) if request else url
+        
+        return srcset(obj.derivatives, build_url)
+
 
+# Model properties used by the product serializers and the columns they read
+PRODUCT_FIELD_DEPENDENCIES = {
+    'discount_percentage': ['price', 'compare_at_price'],
+    'is_in_stock': ['product_type', 'stock_quantity', 'available_keys_count'],
+}
 
-class ProductListSerializer(serializers.ModelSerializer):
+
+class ProductListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Simplified product serializer for list views"""
+    field_dependencies = PRODUCT_FIELD_DEPENDENCIES
     category_name = serializers.CharField(source='category.name', read_only=True)
     seller_name = serializers.CharField(source='seller.email', read_only=True)
-    average_rating = serializers.FloatField(read_only=True)
+    average_rating = serializers.FloatField(source='rating_average', read_only=True)
     discount_percentage = serializers.FloatField(read_only=True)
     is_in_stock = serializers.BooleanField(read_only=True)
     
@@ -27,23 +60,24 @@ class ProductListSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'name', 'slug', 'price', 'stock_quantity', 'sku',
             'category', 'category_name', 'seller', 'seller_name', 'is_active',
-            'is_approved', 'product_type', 'average_rating', 
+            'is_approved', 'product_type', 'average_rating', 'rating_count',
             'discount_percentage', 'is_in_stock', 'view_count', 'sold_count',
             'description', 'compare_at_price'
         ]
         read_only_fields = [
             'id', 'slug', 'view_count', 'sold_count', 'is_approved',
-            'average_rating', 'discount_percentage', 'is_in_stock', 'seller',
-            'seller_name'
+            'average_rating', 'rating_count', 'discount_percentage',
+            'is_in_stock', 'seller', 'seller_name'
         ]
 
 
-class ProductDetailSerializer(serializers.ModelSerializer):
+class ProductDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Full product serializer for detail views"""
+    field_dependencies = PRODUCT_FIELD_DEPENDENCIES
     category_name = serializers.CharField(source='category.name', read_only=True)
     seller_name = serializers.CharField(source='seller.email', read_only=True)
     images = ProductImageSerializer(many=True, read_only=True)
-    average_rating = serializers.FloatField(read_only=True)
+    average_rating = serializers.FloatField(source='rating_average', read_only=True)
     discount_percentage = serializers.FloatField(read_only=True)
     is_in_stock = serializers.BooleanField(read_only=True)
     
@@ -53,20 +87,87 @@ class ProductDetailSerializer(serializers.ModelSerializer):
             'id', 'name', 'slug', 'description', 'price', 'compare_at_price',
             'sku', 'stock_quantity', 'category', 'category_name', 'seller', 'seller_name',
             'product_type', 'images', 'is_active', 'is_approved', 'sold_count', 
-            'view_count', 'average_rating', 'discount_percentage', 'is_in_stock',
-            'created_at', 'updated_at'
+            'view_count', 'average_rating', 'rating_count', 'rating_histogram',
+            'discount_percentage', 'is_in_stock', 'created_at', 'updated_at'
         ]
         read_only_fields = [
             'id', 'slug', 'view_count', 'sold_count', 'is_approved',
-            'created_at', 'updated_at', 'average_rating', 'discount_percentage',
-            'is_in_stock', 'seller', 'seller_name'
+            'created_at', 'updated_at', 'average_rating', 'rating_count',
+            'rating_histogram', 'discount_percentage', 'is_in_stock', 'seller',
+            'seller_name'
         ]
 
 
+class ProductStockPriceSerializer(serializers.Serializer):
+    """One entry of a bulk price/stock update, matched by SKU"""
+    UPDATE_FIELDS = ('price', 'compare_at_price', 'stock_quantity')
+    
+    sku = serializers.CharField(max_length=100)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'), required=False)
+    compare_at_price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=Decimal('0.00'), required=False, allow_null=True
+    )
+    stock_quantity = serializers.IntegerField(min_value=0, max_value=2147483647, required=False)
+    
+    def validate(self, attrs):
+        if not any(field in attrs for field in self.UPDATE_FIELDS):
+            raise serializers.ValidationError('Pass at least one of price, compare_at_price, stock_quantity.')
+        return attrs
+
+
 class WishlistSerializer(serializers.ModelSerializer):
     product = ProductListSerializer(read_only=True)
+    product_id = serializers.PrimaryKeyRelatedField(
+        source='product',
+        queryset=Product.objects.filter(is_active=True),
+        write_only=True
+    )
     
     class Meta:
         model = Wishlist
-        fields = ['id', 'product', 'user', 'created_at']
-        read_only_fields = ['id', 'created_at', 'user']
+        fields = ['id', 'product', 'product_id', 'user', 'added_at']
+        read_only_fields = ['id', 'added_at', 'user']
+    
+    def validate_product_id(self, product):
+        request = self.context.get('request')
+        if request and Wishlist.objects.filter(user=request.user, product=product).exists():
+            raise serializers.ValidationError('This product is already in your wishlist.')
+        return product
+
+
+class ProductImportSerializer(serializers.ModelSerializer):
+    file_format = serializers.ChoiceField(choices=ProductImport.FORMAT_CHOICES, required=False)
+    is_stale = serializers.BooleanField(read_only=True)
+    
+    class Meta:
+        model = ProductImport
+        fields = [
+            'id', 'file', 'file_format', 'status', 'is_stale', 'processed_rows', 'created_count',
+            'updated_count', 'error_count', 'errors', 'failure_reason',
+            'started_at', 'finished_at', 'created_at', 'updated_at'
+        ]
+        read_only_fields = [
+            'id', 'status', 'processed_rows', 'created_count', 'updated_count',
+            'error_count', 'errors', 'failure_reason', 'started_at', 'finished_at',
+            'created_at', 'updated_at'
+        ]
+    
+    def validate(self, attrs):
+        """Take the format from the file extension when it is not given"""
+        if 'file_format' not in attrs:
+            extension = attrs['file'].name.rsplit('.', 1)[-1].lower()
+            formats = {'csv': 'csv', 'jsonl': 'jsonl', 'ndjson': 'jsonl'}
+            if extension not in formats:
+                raise serializers.ValidationError({'file_format': 'Could not detect the file format, pass csv or jsonl.'})
+            attrs['file_format'] = formats[extension]
+        return attrs
+
+
+class ImportImageUploadSerializer(serializers.Serializer):
+    """Images for the `images` column of product imports, checked with Pillow"""
+    images = serializers.ListField(child=serializers.ImageField(), allow_empty=False, max_length=100)
+
+
+class PromoCodeValidateSerializer(serializers.Serializer):
+    code = serializers.CharField(max_length=50)
+    order_amount = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.00'))
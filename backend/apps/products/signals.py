@@ -0,0 +1,87 @@
+from django.db import connections, transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .cache import CATALOG_VERSION, CATEGORY_TREE_VERSION, WISHLIST_VERSION, bump_version
+from .images import delete_derivative_files
+from .models import Category, Product, ProductImage, PromoCode, Wishlist
+from .promo_codes import invalidate_promo_code
+from .search import sync_search_trigger
+from .search_index import queue_product_index
+from .trending import record_trending
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def queue_product_search_update(sender, instance, **kwargs):
+    """
+    Queue the product for the next search index flush.
+    """
+    queue_product_index([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+def queue_category_products_search_update(sender, instance, created, **kwargs):
+    """
+    Category names and paths are part of the indexed product data, and a
+    rename or move changes them for the whole subtree.
+    """
+    if not created and instance.path:
+        queue_product_index(
+            Product.objects.filter(category__path__startswith=instance.path).values_list('pk', flat=True)
+        )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_catalog_caches(sender, **kwargs):
+    """
+    Cached listing pages and the navigation tree (category data and product
+    counts) are versioned, bumping the versions drops them.
+    """
+    bump_version(CATALOG_VERSION)
+    bump_version(CATEGORY_TREE_VERSION)
+
+
+@receiver(post_save, sender=ProductImage)
+def queue_image_derivatives(sender, instance, **kwargs):
+    """
+    Resize new or replaced uploads in the background.
+    """
+    if instance.image and instance.image.name != instance.derivatives_source:
+        from .tasks import generate_product_image_derivatives
+        transaction.on_commit(lambda: generate_product_image_derivatives.delay(instance.pk))
+
+
+@receiver(post_delete, sender=ProductImage)
+def delete_image_derivatives(sender, instance, **kwargs):
+    derivatives = instance.derivatives
+    transaction.on_commit(lambda: delete_derivative_files(derivatives))
+
+
+@receiver(post_save, sender=Wishlist)
+def record_wishlist_trending(sender, instance, created, **kwargs):
+    if created:
+        record_trending('wishlist', {instance.product_id: 1})
+
+
+@receiver(post_save, sender=Wishlist)
+@receiver(post_delete, sender=Wishlist)
+def invalidate_wishlist_ids(sender, instance, **kwargs):
+    """The cached wishlisted-ids set and its ETag follow this version."""
+    bump_version(WISHLIST_VERSION.format(instance.user_id))
+
+
+@receiver(post_save, sender=PromoCode)
+@receiver(post_delete, sender=PromoCode)
+def invalidate_cached_promo_code(sender, instance, **kwargs):
+    invalidate_promo_code(instance.code)
+
+
+def sync_product_search_trigger(sender, using, **kwargs):
+    """
+    Regenerate the search vector trigger after `migrate` when
+    SEARCH_LANGUAGE_CONFIGS changed, connected in ProductsConfig.ready.
+    """
+    sync_search_trigger(connections[using])
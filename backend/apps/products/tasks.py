@@ -0,0 +1,119 @@
+from celery import shared_task
+from PIL import UnidentifiedImageError
+
+
+@shared_task(ignore_result=True)
+def flush_product_search_index():
+    """
+    Push queued product changes to Elasticsearch in bulk batches.
+    """
+    from apps.products.search_index import flush_product_index
+    
+    processed = flush_product_index()
+    return f"Synced {processed} products with the search index"
+
+
+@shared_task(ignore_result=True)
+def flush_product_view_counts():
+    """
+    Move buffered product view counts from Redis to the database.
+    """
+    from apps.products.view_counts import flush_view_counts
+    
+    updated = flush_view_counts()
+    return f"Flushed view counts for {updated} products"
+
+
+@shared_task(ignore_result=True)
+def flush_trending_scores():
+    """
+    Add buffered sale, wishlist and view events to the trending scores.
+    """
+    from apps.products.trending import flush_trending_scores as flush
+    
+    updated = flush()
+    return f"Updated trending scores of {updated} products"
+
+
+@shared_task
+def renormalize_trending_scores():
+    """
+    Move the trending epoch forward so stored scores stay small.
+    """
+    from apps.products.trending import renormalize_trending_scores as renormalize
+    
+    rescaled = renormalize()
+    return f"Renormalized trending scores of {rescaled} products"
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def generate_product_image_derivatives(self, image_id):
+    """
+    Create resized WebP/JPEG copies of an uploaded product image.
+    
+    Runs in the Celery worker pool; the backfill command
+    `generate_image_derivatives` renders existing images in a process pool.
+    """
+    from apps.products.images import generate_derivatives
+    from apps.products.models import ProductImage
+    
+    try:
+        product_image = ProductImage.objects.get(pk=image_id)
+    except ProductImage.DoesNotExist:
+        return f"Product image {image_id} no longer exists"
+    
+    if not product_image.image or product_image.derivatives_source == product_image.image.name:
+        return f"Product image {image_id} is up to date"
+    
+    try:
+        generate_derivatives(product_image)
+    except UnidentifiedImageError:
+        # Not an image Pillow can read, retrying will not change that
+        return f"Product image {image_id} is not a readable image"
+    except OSError as exc:
+        raise self.retry(exc=exc)
+    return f"Generated derivatives for product image {image_id}"
+
+
+@shared_task
+def run_product_import(import_id):
+    """
+    Run or resume a bulk product import, see apps.products.importer.
+    """
+    from apps.products.importer import run_import
+    from apps.products.models import ProductImport
+    
+    try:
+        product_import = ProductImport.objects.get(pk=import_id)
+    except ProductImport.DoesNotExist:
+        return f"Product import {import_id} no longer exists"
+    
+    if not run_import(product_import):
+        return f"Product import {import_id} is already running or finished"
+    return (
+        f"Product import {import_id} {product_import.status}: {product_import.processed_rows} rows, "
+        f"{product_import.created_count} created, {product_import.updated_count} updated, "
+        f"{product_import.error_count} errors"
+    )
+
+
+@shared_task
+def build_related_products():
+    """
+    Rebuild the "frequently bought together" table from paid orders.
+    """
+    from apps.products.related import build_related_products as build
+    
+    stored = build()
+    return f"Stored {stored} related product pairs"
+
+
+@shared_task
+def generate_promo_codes(count, campaign, **options):
+    """
+    Create a campaign of single-use promo codes, see apps.products.promo_generator.
+    """
+    from apps.products.promo_generator import generate_promo_codes as generate
+    
+    created = generate(count, campaign, **options)
+    return f"Created {created} promo codes for campaign {campaign}"
@@ -0,0 +1,31 @@
+"""
+Small model factories shared by the products tests.
+"""
+from decimal import Decimal
+from itertools import count
+
+from apps.products.models import Product
+from apps.users.models import User
+
+_sequence = count(1)
+
+
+def create_user(**fields):
+    number = next(_sequence)
+    fields.setdefault('email', f'user{number}@example.com')
+    fields.setdefault('username', f'user{number}')
+    return User.objects.create_user(password='password', **fields)
+
+
+def create_seller(**fields):
+    return create_user(user_type='seller', **fields)
+
+
+def create_product(seller=None, **fields):
+    number = next(_sequence)
+    fields.setdefault('name', f'Product {number}')
+    fields.setdefault('slug', f'product-{number}')
+    fields.setdefault('sku', f'SKU-{number}')
+    fields.setdefault('description', '')
+    fields.setdefault('price', Decimal('10.00'))
+    return Product.objects.create(seller=seller or create_seller(), **fields)
@@ -0,0 +1,155 @@
+"""
+In-process stand-in for Elasticsearch.
+
+`FakeElasticsearchNode` is an elastic_transport node that answers requests
+from a dict instead of the network, so the real client, the bulk helper and
+elasticsearch_dsl searches all run unchanged. It understands the bulk API
+and the queries ProductSearchView builds: bool, multi_match (all terms,
+case-insensitive, no fuzziness), prefix, term, range and sort.
+"""
+import json
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from elastic_transport import ApiResponseMeta, BaseNode, HttpHeaders
+from elastic_transport._node import NodeApiResponse
+from elasticsearch import Elasticsearch
+from elasticsearch_dsl.connections import connections
+
+
+class FakeElasticsearchNode(BaseNode):
+    _CLIENT_META_HTTP_CLIENT = ('fake', '1.0')
+    
+    # {index: {id: source}}, shared by every node of the test
+    indices = {}
+    # Document ids whose bulk operations fail with a 429 item error
+    rejected_ids = set()
+    # Set to an exception to fail every request
+    error = None
+    
+    @classmethod
+    def reset(cls):
+        cls.indices = {}
+        cls.rejected_ids = set()
+        cls.error = None
+    
+    def perform_request(self, method, target, body=None, headers=None, request_timeout=None):
+        if self.error is not None:
+            raise self.error
+        
+        path = urlsplit(target).path.strip('/').split('/')
+        if path[-1] == '_bulk':
+            status, response = 200, self.bulk(body)
+        elif path[-1] == '_search':
+            status, response = 200, self.search(path[0], json.loads(body) if body else {})
+        else:
+            status, response = 404, {'error': f'{method} {target} is not supported by the stand-in'}
+        
+        meta = ApiResponseMeta(
+            status=status,
+            http_version='1.1',
+            headers=HttpHeaders({'content-type': 'application/json', 'x-elastic-product': 'Elasticsearch'}),
+            duration=0.0,
+            node=self.config,
+        )
+        return NodeApiResponse(meta, json.dumps(response).encode())
+    
+    def bulk(self, body):
+        lines = [json.loads(line) for line in body.splitlines() if line.strip()]
+        items = []
+        while lines:
+            (op, action), = lines.pop(0).items()
+            source = lines.pop(0) if op in ('index', 'create', 'update') else None
+            index = self.indices.setdefault(action['_index'], {})
+            doc_id = str(action['_id'])
+            
+            if doc_id in self.rejected_ids:
+                result = {'status': 429, 'error': {'type': 'es_rejected_execution_exception'}}
+            elif op == 'delete':
+                found = index.pop(doc_id, None) is not None
+                result = {'status': 200 if found else 404, 'result': 'deleted' if found else 'not_found'}
+            else:
+                index[doc_id] = source.get('doc', source)
+                result = {'status': 200, 'result': 'updated'}
+            items.append({op: {'_index': action['_index'], '_id': doc_id, **result}})
+        return {
+            'took': 0,
+            'errors': any(item[op]['status'] >= 300 for item in items for op in item),
+            'items': items,
+        }
+    
+    def search(self, index, body):
+        hits = [
+            {'_index': index, '_id': doc_id, '_score': 1.0, '_source': source}
+            for doc_id, source in self.indices.get(index, {}).items()
+            if matches(source, body.get('query', {'match_all': {}}))
+        ]
+        for sort in reversed(body.get('sort', [])):
+            field, options = (sort, {}) if isinstance(sort, str) else next(iter(sort.items()))
+            if field != '_score':
+                hits.sort(key=lambda hit: value(hit['_source'], field), reverse=options.get('order') == 'desc')
+        
+        start = body.get('from', 0)
+        return {
+            'took': 0,
+            'timed_out': False,
+            'hits': {
+                'total': {'value': len(hits), 'relation': 'eq'},
+                'max_score': 1.0 if hits else None,
+                'hits': hits[start:start + body.get('size', 10)],
+            },
+        }
+
+
+def value(source, field):
+    for part in field.split('.'):
+        source = (source or {}).get(part)
+    return source
+
+
+def matches(source, query):
+    (kind, params), = query.items()
+    if kind == 'match_all':
+        return True
+    if kind == 'bool':
+        should = params.get('should', [])
+        return (
+            all(matches(source, clause) for clause in params.get('must', []) + params.get('filter', []))
+            and sum(matches(source, clause) for clause in should) >= params.get('minimum_should_match', 1 if should else 0)
+        )
+    if kind == 'multi_match':
+        text = ' '.join(str(value(source, field.split('^')[0]) or '') for field in params['fields']).lower()
+        return all(term in text for term in params['query'].lower().split())
+    
+    (field, condition), = params.items()
+    actual = value(source, field)
+    if kind == 'term':
+        return actual == (condition['value'] if isinstance(condition, dict) else condition)
+    if kind == 'prefix':
+        prefix = condition['value'] if isinstance(condition, dict) else condition
+        return isinstance(actual, str) and actual.startswith(prefix)
+    if kind == 'range':
+        operators = {
+            'gt': lambda a, b: a > b, 'gte': lambda a, b: a >= b,
+            'lt': lambda a, b: a < b, 'lte': lambda a, b: a <= b,
+        }
+        return actual is not None and all(operators[op](actual, float(bound)) for op, bound in condition.items())
+    raise NotImplementedError(f'The stand-in does not support {kind} queries')
+
+
+@contextmanager
+def fake_elasticsearch(alias='default'):
+    """Point the `alias` connection at an empty in-process stand-in."""
+    FakeElasticsearchNode.reset()
+    previous = connections._conns.get(alias)
+    connections.add_connection(alias, Elasticsearch(
+        'http://elasticsearch.test:9200', node_class=FakeElasticsearchNode, max_retries=0
+    ))
+    try:
+        yield FakeElasticsearchNode
+    finally:
+        if previous is None:
+            connections._conns.pop(alias, None)
+        else:
+            connections.add_connection(alias, previous)
+        FakeElasticsearchNode.reset()
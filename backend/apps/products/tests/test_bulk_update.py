@@ -0,0 +1,49 @@
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.products.models import Product
+
+from .factories import create_product, create_seller
+
+
+class BulkUpdateTests(TestCase):
+
+    def setUp(self):
+        self.seller = create_seller()
+        self.client = APIClient(SERVER_NAME='localhost', REMOTE_ADDR='10.0.0.1')
+        self.client.force_authenticate(self.seller)
+        self.product = create_product(seller=self.seller, sku='A', price=Decimal('5.00'))
+    
+    def post(self, items):
+        response = self.client.post('/api/products/products/bulk-update/', {'items': items}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+    
+    def test_updates_own_products(self):
+        other = create_product(sku='B')
+        data = self.post([
+            {'sku': 'A', 'price': '1.00'},
+            {'sku': 'A', 'price': '2.00', 'stock_quantity': 3},
+            {'sku': 'B', 'price': '1.00'},
+            {'sku': 'C', 'price': '1.00'},
+        ])
+        
+        self.assertEqual(data['updated'], 1)
+        self.assertEqual(
+            {result['sku']: result['status'] for result in data['results']},
+            {'A': 'updated', 'B': 'not_found', 'C': 'not_found'}
+        )
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.price, self.product.stock_quantity), (Decimal('2.00'), 3))
+        self.assertEqual(Product.objects.get(pk=other.pk).price, Decimal('10.00'))
+    
+    def test_unhashable_sku_is_reported_as_invalid(self):
+        data = self.post([{'sku': 'A', 'price': '1.00'}, {'sku': ['x']}, {'sku': {'a': 1}, 'price': '2.00'}])
+        
+        self.assertEqual(data['updated'], 1)
+        statuses = [(result['sku'], result['status']) for result in data['results']]
+        self.assertEqual(statuses, [('A', 'updated'), (['x'], 'invalid'), ({'a': 1}, 'invalid')])
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.price, Decimal('1.00'))
@@ -0,0 +1,87 @@
+import shutil
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models import F
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.products.images import store_derivatives
+from apps.products.models import Category, Product, ProductImage
+
+from .factories import create_product, create_user
+
+
+class ConditionalGetTests(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.client = APIClient(SERVER_NAME='localhost', REMOTE_ADDR='10.0.0.1')
+        self.product = create_product()
+        self.url = f'/api/products/products/{self.product.pk}/'
+    
+    def etag(self, url=None):
+        response = self.client.get(url or self.url)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+    
+    def test_unchanged_product_is_not_modified(self):
+        etag = self.etag()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+    
+    def test_counters_change_etag_without_last_modified(self):
+        response = self.client.get(self.url)
+        self.assertNotIn('Last-Modified', response)
+        
+        Product.objects.filter(pk=self.product.pk).update(stock_quantity=F('stock_quantity') + 1)
+        self.assertNotEqual(self.etag(), response['ETag'])
+    
+    def test_image_changes_change_etag(self):
+        etags = [self.etag()]
+        
+        image = ProductImage.objects.create(
+            product=self.product,
+            image=SimpleUploadedFile('photo.jpg', b'not rendered'),
+            is_primary=True,
+        )
+        etags.append(self.etag())
+        
+        # Derivatives are written with a queryset update by the worker
+        store_derivatives(image, [])
+        etags.append(self.etag())
+        
+        ProductImage.objects.create(
+            product=self.product,
+            image=SimpleUploadedFile('photo2.jpg', b'not rendered'),
+            is_primary=True,
+        )
+        etags.append(self.etag())
+        
+        image.delete()
+        etags.append(self.etag())
+        
+        self.assertEqual(len(set(etags)), len(etags))
+    
+    def test_category_detail_keeps_last_modified(self):
+        category = Category.objects.create(name='Audio', slug='audio')
+        url = f'/api/products/categories/{category.pk}/'
+        response = self.client.get(url)
+        self.assertIn('Last-Modified', response)
+        
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+    
+    def test_invalid_lookup_is_not_found(self):
+        self.client.force_authenticate(create_user())
+        for url in (
+            '/api/products/products/p0/',
+            '/api/products/categories/p0/',
+            '/api/auth/seller-profiles/p0/',
+            '/api/products/products/99999/',
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
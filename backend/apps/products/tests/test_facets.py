@@ -0,0 +1,35 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.products.cache import product_data_changed
+from apps.products.models import Product
+
+from .factories import create_product
+
+
+@override_settings(PRODUCT_PRICE_FACET_EDGES=[0, 50])
+class FacetsTests(TestCase):
+    url = '/api/products/products/facets/'
+    
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient(SERVER_NAME='localhost', REMOTE_ADDR='10.0.0.1')
+        self.product = create_product(price=Decimal('10.00'))
+    
+    def price_counts(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return [bucket['count'] for bucket in response.data['price']]
+    
+    def test_counts_follow_catalog_changes(self):
+        self.assertEqual(self.price_counts(), [1, 0])
+        
+        # Bulk updates bypass save(); they only bump the catalog version
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.filter(pk=self.product.pk).update(price=Decimal('80.00'))
+            product_data_changed([self.product.pk])
+        
+        self.assertEqual(self.price_counts(), [0, 1])
@@ -0,0 +1,72 @@
+import io
+import shutil
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from apps.products.images import render_derivatives
+from apps.products.models import ProductImage
+from apps.products.tasks import generate_product_image_derivatives
+
+from .factories import create_product
+
+
+def image_bytes(image, fmt):
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+class RenderDerivativesTests(TestCase):
+
+    def test_palette_transparency_is_kept(self):
+        image = Image.new('P', (40, 20))
+        image.putpalette([255, 0, 0, 0, 0, 255] + [0] * 762)
+        image.paste(1, (20, 0, 40, 20))
+        image.info['transparency'] = 0
+        
+        rendered = render_derivatives(image_bytes(image, 'PNG'), [20], {'webp': {'lossless': True}, 'jpeg': {}})
+        
+        formats = {fmt: Image.open(io.BytesIO(content)) for fmt, width, content in rendered}
+        webp = formats['webp'].convert('RGBA')
+        self.assertEqual(webp.size, (20, 10))
+        self.assertEqual(webp.getpixel((2, 5))[3], 0)
+        self.assertEqual(webp.getpixel((17, 5)), (0, 0, 255, 255))
+        # JPEG has no alpha, transparent areas become white
+        self.assertEqual(formats['jpeg'].mode, 'RGB')
+        self.assertGreater(min(formats['jpeg'].getpixel((2, 5))), 240)
+
+
+class GenerateDerivativesTaskTests(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+    
+    def create_image(self, content):
+        return ProductImage.objects.create(
+            product=create_product(),
+            image=SimpleUploadedFile('photo.png', content),
+        )
+    
+    def test_generates_derivatives(self):
+        product_image = self.create_image(image_bytes(Image.new('RGB', (60, 30)), 'PNG'))
+        
+        result = generate_product_image_derivatives.apply(args=[product_image.pk])
+        
+        self.assertEqual(result.get(), f'Generated derivatives for product image {product_image.pk}')
+        product_image.refresh_from_db()
+        self.assertEqual(product_image.derivatives_source, product_image.image.name)
+    
+    def test_unreadable_image_is_not_retried(self):
+        product_image = self.create_image(b'not an image')
+        
+        result = generate_product_image_derivatives.apply(args=[product_image.pk])
+        
+        self.assertEqual(result.state, 'SUCCESS')
+        self.assertEqual(result.get(), f'Product image {product_image.pk} is not a readable image')
+        product_image.refresh_from_db()
+        self.assertEqual(product_image.derivatives, {})
@@ -0,0 +1,130 @@
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+
+from apps.products.importer import image_prefix, run_import
+from apps.products.models import Product, ProductImage, ProductImport
+from apps.products.tasks import run_product_import
+
+from .factories import create_seller
+
+
+class ImportTestCase(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.seller = create_seller()
+        self.client = APIClient(SERVER_NAME='localhost', REMOTE_ADDR='10.0.0.1')
+        self.client.force_authenticate(self.seller)
+    
+    def create_import(self, content, **fields):
+        return ProductImport.objects.create(
+            seller=self.seller,
+            file=ContentFile(content.encode(), name='products.jsonl'),
+            file_format='jsonl',
+            **fields
+        )
+
+
+class StaleImportTests(ImportTestCase):
+
+    def create_running_import(self, last_heartbeat):
+        product_import = self.create_import(
+            '{"sku": "A-1", "name": "Lamp", "description": "Desk lamp", "price": "10.00"}\n',
+            status='running',
+        )
+        ProductImport.objects.filter(pk=product_import.pk).update(updated_at=last_heartbeat)
+        product_import.refresh_from_db()
+        return product_import
+    
+    @override_settings(PRODUCT_IMPORT_STALE_AFTER=60)
+    def test_stale_import_is_taken_over(self):
+        product_import = self.create_running_import(timezone.now() - timedelta(minutes=5))
+        self.assertTrue(product_import.is_stale)
+        
+        self.assertTrue(run_import(product_import))
+        self.assertEqual(product_import.status, 'completed')
+        self.assertTrue(Product.objects.filter(sku='A-1', seller=self.seller).exists())
+    
+    @override_settings(PRODUCT_IMPORT_STALE_AFTER=60)
+    def test_running_import_is_left_alone(self):
+        product_import = self.create_running_import(timezone.now())
+        self.assertFalse(product_import.is_stale)
+        
+        self.assertFalse(run_import(product_import))
+        self.assertFalse(Product.objects.filter(sku='A-1').exists())
+    
+    @override_settings(PRODUCT_IMPORT_STALE_AFTER=60)
+    def test_resume_through_api(self):
+        running = self.create_running_import(timezone.now())
+        stale = self.create_running_import(timezone.now() - timedelta(minutes=5))
+        
+        with mock.patch.object(run_product_import, 'delay') as delay:
+            response = self.client.post(f'/api/products/imports/{running.pk}/resume/')
+            self.assertEqual(response.status_code, 400)
+            delay.assert_not_called()
+            
+            response = self.client.post(f'/api/products/imports/{stale.pk}/resume/')
+            self.assertEqual(response.status_code, 202)
+            self.assertTrue(response.data['is_stale'])
+            delay.assert_called_once_with(stale.pk)
+
+
+class ImportImagesTests(ImportTestCase):
+
+    def png(self, name='photo.png'):
+        buffer = io.BytesIO()
+        Image.new('RGB', (4, 4)).save(buffer, format='PNG')
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+    
+    def test_upload(self):
+        response = self.client.post(
+            '/api/products/imports/images/',
+            {'images': [self.png(), self.png('../../other.png')]},
+            format='multipart'
+        )
+        self.assertEqual(response.status_code, 201)
+        names = response.data['images']
+        self.assertEqual(len(names), 2)
+        for name in names:
+            self.assertTrue(name.startswith(image_prefix(self.seller.pk)))
+            self.assertTrue(default_storage.exists(name))
+    
+    def test_upload_rejects_non_images(self):
+        response = self.client.post(
+            '/api/products/imports/images/',
+            {'images': [SimpleUploadedFile('photo.png', b'not an image')]},
+            format='multipart'
+        )
+        self.assertEqual(response.status_code, 400)
+    
+    def test_only_own_uploads_are_accepted(self):
+        own = image_prefix(self.seller.pk) + 'lamp.png'
+        other_seller = image_prefix(self.seller.pk + 1) + 'lamp.png'
+        escaping = image_prefix(self.seller.pk) + '../1/lamp.png'
+        product_import = self.create_import(
+            f'{{"sku": "A-1", "name": "Lamp", "description": "Lamp", "price": "10.00", "images": ["{own}"]}}\n'
+            f'{{"sku": "A-2", "name": "Lamp", "description": "Lamp", "price": "10.00", "images": ["{other_seller}"]}}\n'
+            f'{{"sku": "A-3", "name": "Lamp", "description": "Lamp", "price": "10.00", "images": ["{escaping}"]}}\n'
+            f'{{"sku": "A-4", "name": "Lamp", "description": "Lamp", "price": "10.00", "images": ["products/x.jpg"]}}\n'
+        )
+        
+        run_import(product_import)
+        
+        self.assertEqual(product_import.status, 'completed')
+        self.assertEqual(list(Product.objects.values_list('sku', flat=True)), ['A-1'])
+        self.assertEqual(list(ProductImage.objects.values_list('image', flat=True)), [own])
+        self.assertEqual([error['sku'] for error in product_import.errors], ['A-2', 'A-3', 'A-4'])
+        self.assertEqual(list(product_import.errors[0]['errors']), ['images'])
@@ -0,0 +1,71 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.products.cache import product_data_changed
+from apps.products.models import Category, Product
+
+from .factories import create_product, create_user
+
+
+class ListCacheTests(TestCase):
+    categories_url = '/api/products/categories/'
+    products_url = '/api/products/products/'
+    
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient(SERVER_NAME='localhost', REMOTE_ADDR='10.0.0.1')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category = Category.objects.create(name='Audio', slug='audio')
+            self.product = create_product(category=self.category, price=Decimal('10.00'))
+    
+    def test_cache_hit_and_revalidation_cost_no_query(self):
+        response = self.client.get(self.categories_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        
+        with self.assertNumQueries(0):
+            hit = self.client.get(self.categories_url)
+        self.assertEqual(hit['X-Cache'], 'HIT')
+        self.assertEqual(hit['ETag'], response['ETag'])
+        self.assertEqual(hit.json(), response.json())
+        
+        with self.assertNumQueries(0):
+            response = self.client.get(self.categories_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+    
+    def test_category_save_invalidates_list(self):
+        etag = self.client.get(self.categories_url)['ETag']
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.name = 'Sound'
+            self.category.save()
+        
+        response = self.client.get(self.categories_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual([row['name'] for row in response.json()['results']], ['Sound'])
+    
+    def test_bulk_product_change_invalidates_list(self):
+        self.assertEqual(self.client.get(self.products_url)['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(self.products_url)['X-Cache'], 'HIT')
+        
+        # Queryset updates skip the signals and bump the version explicitly
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.filter(pk=self.product.pk).update(price=Decimal('12.00'))
+            product_data_changed([self.product.pk])
+        
+        response = self.client.get(self.products_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['results'][0]['price'], '12.00')
+    
+    def test_authenticated_requests_are_not_cached(self):
+        self.client.force_authenticate(create_user())
+        self.client.get(self.categories_url)
+        
+        response = self.client.get(self.categories_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Cache', response)
+        self.assertIn('ETag', response)
@@ -0,0 +1,119 @@
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from apps.products.models import PromoCode, PromoCodeRedemption
+from apps.products.promo_codes import PromoCodeError, redeem_promo_code
+
+from .factories import create_user
+
+
+def create_promo_code(code, **fields):
+    now = timezone.now()
+    return PromoCode.objects.create(
+        code=code,
+        discount_type='fixed',
+        discount_value=Decimal('5.00'),
+        valid_from=now - timedelta(days=1),
+        valid_to=now + timedelta(days=1),
+        **fields
+    )
+
+
+class RedeemPromoCodeTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user()
+    
+    def test_usage_limit_per_user(self):
+        create_promo_code('TWICE', usage_limit_per_user=2)
+        redeem_promo_code('TWICE', self.user, Decimal('50.00'))
+        redeem_promo_code('TWICE', self.user, Decimal('50.00'))
+        with self.assertRaisesMessage(PromoCodeError, 'already used'):
+            redeem_promo_code('TWICE', self.user, Decimal('50.00'))
+        self.assertEqual(
+            sorted(PromoCodeRedemption.objects.values_list('use_number', flat=True)), [1, 2]
+        )
+    
+    def test_usage_limit(self):
+        promo = create_promo_code('ONCE', usage_limit=1, usage_limit_per_user=None)
+        redeem_promo_code('ONCE', self.user, Decimal('50.00'))
+        with self.assertRaisesMessage(PromoCodeError, 'no longer available'):
+            redeem_promo_code('ONCE', create_user(), Decimal('50.00'))
+        promo.refresh_from_db()
+        self.assertEqual(promo.used_count, 1)
+        self.assertEqual(PromoCodeRedemption.objects.count(), 1)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Needs row level locking')
+class ConcurrentRedemptionTests(TransactionTestCase):
+    threads = 8
+    
+    def setUp(self):
+        cache.clear()
+    
+    def redeem_concurrently(self, code, users):
+        """Redeem `code` once per user at the same time; returns the number of successes."""
+        barrier = threading.Barrier(len(users))
+        outcomes = []
+        
+        def redeem(user):
+            try:
+                barrier.wait()
+                redeem_promo_code(code, user, Decimal('50.00'))
+                outcomes.append(True)
+            except PromoCodeError:
+                outcomes.append(False)
+            finally:
+                connection.close()
+        
+        workers = [threading.Thread(target=redeem, args=[user]) for user in users]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(len(outcomes), len(users))
+        return outcomes.count(True)
+    
+    def test_usage_limit(self):
+        promo = create_promo_code('LIMITED', usage_limit=3, usage_limit_per_user=None)
+        users = [create_user() for _ in range(self.threads)]
+        
+        self.assertEqual(self.redeem_concurrently('LIMITED', users), 3)
+        promo.refresh_from_db()
+        self.assertEqual(promo.used_count, 3)
+        self.assertEqual(PromoCodeRedemption.objects.count(), 3)
+    
+    def test_usage_limit_per_user(self):
+        promo = create_promo_code('ONCE-EACH', usage_limit_per_user=1)
+        user = create_user()
+        
+        self.assertEqual(self.redeem_concurrently('ONCE-EACH', [user] * self.threads), 1)
+        promo.refresh_from_db()
+        self.assertEqual(promo.used_count, 1)
+    
+    def test_usage_limit_per_user_above_one(self):
+        promo = create_promo_code('TWICE-EACH', usage_limit_per_user=2)
+        user = create_user()
+        
+        redeemed = self.redeem_concurrently('TWICE-EACH', [user] * self.threads)
+        self.assertIn(redeemed, (1, 2))
+        redeemed += self.redeem_concurrently('TWICE-EACH', [user] * self.threads)
+        self.assertEqual(redeemed, 2)
+        promo.refresh_from_db()
+        self.assertEqual(promo.used_count, 2)
+    
+    def test_no_limits(self):
+        promo = create_promo_code('OPEN', usage_limit=None, usage_limit_per_user=None)
+        user = create_user()
+        
+        self.assertEqual(self.redeem_concurrently('OPEN', [user] * self.threads), self.threads)
+        promo.refresh_from_db()
+        self.assertEqual(promo.used_count, self.threads)
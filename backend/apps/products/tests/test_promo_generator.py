@@ -0,0 +1,62 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.products import promo_generator
+from apps.products.models import PromoCode
+from apps.products.promo_generator import generate_promo_codes, is_valid_code, make_codes
+
+
+class PromoGeneratorTests(TestCase):
+
+    def generate(self, count, **options):
+        now = timezone.now()
+        return generate_promo_codes(
+            count,
+            'spring',
+            discount_type='fixed',
+            discount_value=Decimal('5.00'),
+            valid_from=now,
+            valid_to=now + timedelta(days=30),
+            **options
+        )
+    
+    def test_codes_have_check_symbol(self):
+        for code in make_codes(100, 8, 'SUM-'):
+            self.assertTrue(code.startswith('SUM-'))
+            self.assertTrue(is_valid_code(code, 'SUM-'))
+            self.assertFalse(is_valid_code(code[:-1] + ('0' if code[-1] != '0' else '1'), 'SUM-'))
+    
+    def test_creates_requested_number(self):
+        # Runs inside the test case's transaction, every chunk is a savepoint
+        self.assertEqual(self.generate(50, chunk_size=20), 50)
+        self.assertEqual(PromoCode.objects.filter(campaign='spring', usage_limit=1).count(), 50)
+    
+    def test_skipped_codes_are_generated_again(self):
+        self.generate(1)
+        taken = PromoCode.objects.get().code
+        chunks = iter([['NEW1', 'NEW1', taken], ['NEW2', 'NEW3']])
+        
+        with mock.patch.object(promo_generator, 'make_codes', side_effect=lambda *args: next(chunks)):
+            self.assertEqual(self.generate(3), 3)
+        
+        self.assertEqual(
+            set(PromoCode.objects.values_list('code', flat=True)),
+            {taken, 'NEW1', 'NEW2', 'NEW3'}
+        )
+    
+    def test_inside_outer_transaction(self):
+        with transaction.atomic():
+            self.assertEqual(self.generate(30, chunk_size=10), 30)
+            self.assertEqual(self.generate(5), 5)
+        self.assertEqual(PromoCode.objects.count(), 35)
+    
+    def test_rejects_formats_too_small(self):
+        with self.assertRaises(ValueError):
+            self.generate(1000, length=2)
+        with self.assertRaises(ValueError):
+            self.generate(1, prefix='summer!')
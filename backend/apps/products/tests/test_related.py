@@ -0,0 +1,113 @@
+from decimal import Decimal
+
+import numpy as np
+from django.test import TestCase
+from rest_framework.test import APIClient
+from scipy import sparse
+
+from apps.orders.models import Order, OrderItem
+from apps.products.models import ProductRelation
+from apps.products.related import build_related_products, top_related
+
+from .factories import create_product, create_user
+
+
+def create_order(products, payment_status='completed', item_status='pending'):
+    order = Order.objects.create(
+        user=create_user(),
+        total_amount=Decimal('10.00') * len(products),
+        payment_status=payment_status,
+    )
+    for product in products:
+        OrderItem.objects.create(
+            order=order,
+            product=product,
+            seller=product.seller,
+            quantity=1,
+            price=product.price,
+            subtotal=product.price,
+            commission_rate=Decimal('10.00'),
+            commission_amount=Decimal('1.00'),
+            status=item_status,
+            product_name=product.name,
+            product_sku=product.sku,
+        )
+    return order
+
+
+class TopRelatedTests(TestCase):
+
+    def test_cosine_ranking(self):
+        # Diagonal: orders per product; off-diagonal: orders shared by a pair
+        cooccurrence = sparse.csr_matrix(np.array([
+            [5, 3, 2, 1],
+            [3, 3, 1, 0],
+            [2, 1, 2, 0],
+            [1, 0, 0, 1],
+        ]))
+        
+        rows, columns, scores, ranks = top_related(cooccurrence, top_k=2, min_support=1)
+        
+        related = {}
+        for row, column, score, rank in zip(rows, columns, scores, ranks):
+            related.setdefault(row, []).append((rank, column, round(score, 3)))
+        self.assertEqual(related, {
+            0: [(1, 1, 0.775), (2, 2, 0.632)],
+            1: [(1, 0, 0.775), (2, 2, 0.408)],
+            2: [(1, 0, 0.632), (2, 1, 0.408)],
+            3: [(1, 0, 0.447)],
+        })
+    
+    def test_min_support(self):
+        cooccurrence = sparse.csr_matrix(np.array([
+            [3, 2, 1],
+            [2, 2, 0],
+            [1, 0, 1],
+        ]))
+        rows, columns, _, _ = top_related(cooccurrence, top_k=5, min_support=2)
+        self.assertEqual(sorted(zip(rows.tolist(), columns.tolist())), [(0, 1), (1, 0)])
+
+
+class BuildRelatedProductsTests(TestCase):
+
+    def setUp(self):
+        self.a, self.b, self.c, self.d = [create_product(is_approved=True) for _ in range(4)]
+        create_order([self.a, self.b, self.c])
+        create_order([self.a, self.b])
+        create_order([self.a, self.c])
+        create_order([self.a, self.b])
+        create_order([self.d, self.a])
+        # Neither unpaid orders nor cancelled lines count
+        for _ in range(3):
+            create_order([self.c, self.d], payment_status='pending')
+            create_order([self.b, self.d], item_status='cancelled')
+    
+    def related(self, product):
+        return list(
+            ProductRelation.objects.filter(product=product).order_by('rank').values_list('related', flat=True)
+        )
+    
+    def test_rank_order(self):
+        # Small chunks split orders across reads
+        stored = build_related_products(top_k=5, min_support=1, chunk_size=2)
+        
+        self.assertEqual(stored, 8)
+        self.assertEqual(self.related(self.a), [self.b.pk, self.c.pk, self.d.pk])
+        self.assertEqual(self.related(self.b), [self.a.pk, self.c.pk])
+        self.assertEqual(self.related(self.c), [self.a.pk, self.b.pk])
+        self.assertEqual(self.related(self.d), [self.a.pk])
+    
+    def test_endpoint(self):
+        build_related_products(top_k=5, min_support=1)
+        self.c.is_approved = False
+        self.c.save()
+        client = APIClient(SERVER_NAME='localhost', REMOTE_ADDR='10.0.0.1')
+        
+        response = client.get(f'/api/products/products/{self.a.pk}/related/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['id'] for item in response.json()], [self.b.pk, self.d.pk])
+        
+        for pk in ('p0', 99999):
+            with self.subTest(pk=pk):
+                response = client.get(f'/api/products/products/{pk}/related/')
+                self.assertEqual(response.status_code, 404)
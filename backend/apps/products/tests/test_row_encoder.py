@@ -0,0 +1,79 @@
+import json
+from collections import OrderedDict
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from apps.core import encoders
+from apps.core.encoders import RowEncoder
+from apps.products.models import Category, Product
+from apps.products.serializers import ProductListSerializer
+
+from .factories import create_product
+
+
+class RowEncoderTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name='Audio', slug='audio')
+        # On sale, out of stock
+        create_product(
+            category=category, price=Decimal('80.00'), compare_at_price=Decimal('100.00'),
+            stock_quantity=0, description='Closed-back headphones',
+        )
+        # Digital, no category, keys available
+        create_product(product_type='digital', available_keys_count=3, price=Decimal('0.99'))
+        # Compare-at price below the price, no discount shown
+        create_product(
+            category=category, price=Decimal('25.50'), compare_at_price=Decimal('20.00'),
+            stock_quantity=7, is_approved=True,
+        )
+        self.queryset = Product.objects.with_stock_status().select_related(
+            'category', 'seller'
+        ).defer('search_vector').order_by('pk')
+        self.renderer = JSONRenderer()
+    
+    def serializer(self, query=''):
+        request = Request(APIRequestFactory().get(f'/api/products/products/{query}'))
+        return ProductListSerializer(context={'request': request})
+    
+    def test_same_bytes_as_serializer(self):
+        for query in ('', '?fields=id,name,price', '?omit=description,seller_name', '?fields=discount_percentage,category_name'):
+            with self.subTest(query=query):
+                serializer = self.serializer(query)
+                encoder = RowEncoder.for_serializer(serializer)
+                self.assertIsNotNone(encoder)
+                
+                expected = ProductListSerializer(
+                    list(self.queryset), many=True, context=serializer.context
+                ).data
+                rows = encoder.encode(self.queryset.values(*encoder.columns))
+                self.assertEqual(self.renderer.render(rows), self.renderer.render(expected))
+    
+    def test_list_endpoint_matches_serializer(self):
+        response = APIClient(SERVER_NAME='localhost', REMOTE_ADDR='10.0.0.1').get(
+            '/api/products/products/', {'ordering': 'created_at'}
+        )
+        self.assertEqual(response.status_code, 200)
+        expected = ProductListSerializer(list(self.queryset.order_by('created_at', 'id')), many=True).data
+        self.assertEqual(response.json()['results'], json.loads(self.renderer.render(expected)))
+    
+    def test_compiled_encoders_are_bounded(self):
+        with mock.patch.object(encoders, '_encoders', OrderedDict()), \
+                mock.patch.object(encoders, 'ENCODER_CACHE_SIZE', 2):
+            first = RowEncoder.for_serializer(self.serializer('?fields=id'))
+            RowEncoder.for_serializer(self.serializer('?fields=name'))
+            self.assertIs(RowEncoder.for_serializer(self.serializer('?fields=id')), first)
+            
+            RowEncoder.for_serializer(self.serializer('?fields=price'))
+            self.assertEqual(len(encoders._encoders), 2)
+            # `name` was the least recently used
+            self.assertEqual(
+                [fields for _, fields in encoders._encoders], [('id',), ('price',)]
+            )
@@ -0,0 +1,78 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from apps.products import search
+from apps.products.models import Product
+
+from .factories import create_product
+
+postgresql_only = skipUnless(connection.vendor == 'postgresql', 'Full-text search needs PostgreSQL')
+
+
+class ProductSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.headphones = create_product(
+            name='Wireless Headphones',
+            description='Noise cancelling over-ear headphones',
+            sku='WH-1000',
+        )
+        cls.keyboard = create_product(name='Mechanical keyboard', description='Hot-swappable switches', sku='KB-87')
+    
+    def search(self, text):
+        return set(Product.objects.search(text).values_list('pk', flat=True))
+    
+    def test_whole_words(self):
+        self.assertEqual(self.search('headphones'), {self.headphones.pk})
+        self.assertEqual(self.search('wireless headphones'), {self.headphones.pk})
+        self.assertEqual(self.search('keyboard'), {self.keyboard.pk})
+    
+    def test_every_term_must_match(self):
+        self.assertEqual(self.search('wireless keyboard'), set())
+    
+    def test_word_prefixes(self):
+        self.assertEqual(self.search('Head'), {self.headphones.pk})
+        self.assertEqual(self.search('mech keyb'), {self.keyboard.pk})
+    
+    def test_sku(self):
+        self.assertEqual(self.search('WH-1000'), {self.headphones.pk})
+        self.assertEqual(self.search('kb'), {self.keyboard.pk})
+    
+    def test_text_inside_words(self):
+        # Substring matching is kept on other databases; full-text search
+        # only matches whole words and word prefixes
+        expected = set() if connection.vendor == 'postgresql' else {self.headphones.pk}
+        self.assertEqual(self.search('phones'), expected)
+    
+    @postgresql_only
+    def test_stemming(self):
+        self.assertEqual(self.search('headphone cancelled'), {self.headphones.pk})
+
+
+@postgresql_only
+class SearchTriggerTests(TestCase):
+
+    def installed_function(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT prosrc FROM pg_proc WHERE proname = %s', [search.FUNCTION_NAME])
+            return cursor.fetchone()[0]
+    
+    def test_trigger_follows_settings(self):
+        self.assertTrue(search.search_trigger_in_sync(connection))
+        for config in search.search_configs():
+            self.assertIn(f"'{config}'", self.installed_function())
+    
+    @override_settings(SEARCH_LANGUAGE_CONFIGS={'en': 'english', 'de': 'german'})
+    def test_changed_settings_are_synced(self):
+        product = create_product(name='Kopfhörer', description='')
+        self.assertFalse(search.search_trigger_in_sync(connection))
+        
+        self.assertTrue(search.sync_search_trigger(connection))
+        self.assertTrue(search.search_trigger_in_sync(connection))
+        self.assertIn("'german'", self.installed_function())
+        self.assertNotIn("'russian'", self.installed_function())
+        self.assertTrue(Product.objects.filter(pk=product.pk, search_vector__isnull=False).exists())
+        self.assertFalse(search.sync_search_trigger(connection))
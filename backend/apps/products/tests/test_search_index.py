@@ -0,0 +1,155 @@
+from decimal import Decimal
+from unittest import mock
+
+from elastic_transport import ConnectionError as TransportConnectionError
+from django.test import TestCase, modify_settings
+from rest_framework.test import APIClient
+
+from apps.products import search_index
+
+from .factories import create_product
+from .fake_elasticsearch import fake_elasticsearch
+
+
+class PendingSet:
+    """The part of a Redis client search_index uses, for one set."""
+    
+    def __init__(self):
+        self.members = set()
+    
+    def sadd(self, key, *values):
+        self.members.update(str(value).encode() for value in values)
+    
+    def spop(self, key, count):
+        return [self.members.pop() for _ in range(min(count, len(self.members)))]
+
+
+@modify_settings(INSTALLED_APPS={'append': 'django_elasticsearch_dsl'})
+class SearchIndexTestCase(TestCase):
+
+    def setUp(self):
+        self.elasticsearch = self.enterContext(fake_elasticsearch())
+    
+    def indexed(self):
+        return {int(pk) for pk in self.elasticsearch.indices.get('products', {})}
+
+
+class IndexProductsTests(SearchIndexTestCase):
+
+    def test_indexes_products_and_deletes_missing_ones(self):
+        product = create_product(name='Desk lamp', price=Decimal('25.50'))
+        self.elasticsearch.indices['products'] = {'999': {'name': 'Deleted'}}
+        
+        failed = search_index.index_products([product.pk, 999, 1000])
+        
+        self.assertEqual(failed, set())
+        self.assertEqual(self.indexed(), {product.pk})
+        document = self.elasticsearch.indices['products'][str(product.pk)]
+        self.assertEqual(document['name'], 'Desk lamp')
+        self.assertEqual(document['price'], 25.5)
+    
+    def test_returns_rejected_products(self):
+        first, second = create_product(), create_product()
+        self.elasticsearch.rejected_ids = {str(second.pk)}
+        
+        with self.assertLogs('apps.products.search_index', 'ERROR'):
+            failed = search_index.index_products([first.pk, second.pk])
+        
+        self.assertEqual(failed, {second.pk})
+        self.assertEqual(self.indexed(), {first.pk})
+
+
+class FlushProductIndexTests(SearchIndexTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.pending = PendingSet()
+        self.enterContext(mock.patch.object(search_index, 'get_redis', return_value=self.pending))
+    
+    def test_saves_are_queued_and_flushed_in_batches(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            products = [create_product() for _ in range(5)]
+        self.assertEqual(self.indexed(), set())
+        
+        self.assertEqual(search_index.flush_product_index(batch_size=2), 5)
+        self.assertEqual(self.indexed(), {product.pk for product in products})
+        self.assertEqual(self.pending.members, set())
+    
+    def test_rejected_products_stay_pending(self):
+        accepted, rejected = create_product(), create_product()
+        self.pending.sadd(search_index.PENDING_KEY, accepted.pk, rejected.pk)
+        self.elasticsearch.rejected_ids = {str(rejected.pk)}
+        
+        with self.assertLogs('apps.products.search_index', 'ERROR'):
+            self.assertEqual(search_index.flush_product_index(batch_size=1), 1)
+        self.assertEqual(self.pending.members, {str(rejected.pk).encode()})
+        
+        self.elasticsearch.rejected_ids = set()
+        self.assertEqual(search_index.flush_product_index(), 1)
+        self.assertEqual(self.indexed(), {accepted.pk, rejected.pk})
+    
+    def test_failed_batch_stays_pending(self):
+        product = create_product()
+        self.pending.sadd(search_index.PENDING_KEY, product.pk)
+        self.elasticsearch.error = TransportConnectionError('Connection refused')
+        
+        with self.assertRaises(TransportConnectionError):
+            search_index.flush_product_index()
+        self.assertEqual(self.pending.members, {str(product.pk).encode()})
+
+
+class IndexWithoutRedisTests(SearchIndexTestCase):
+
+    def test_saves_are_indexed_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            product = create_product()
+        self.assertEqual(self.indexed(), {product.pk})
+    
+    def test_search_index_outage_does_not_fail_saves(self):
+        self.elasticsearch.error = TransportConnectionError('Connection refused')
+        
+        with self.assertLogs('apps.products.search_index', 'ERROR'):
+            with self.captureOnCommitCallbacks(execute=True):
+                create_product()
+
+
+class ProductSearchViewTests(SearchIndexTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient(SERVER_NAME='localhost', REMOTE_ADDR='10.0.0.1')
+        self.headphones = create_product(name='Wireless headphones', sku='WH-1000', price=Decimal('99.00'))
+        self.cheap_headphones = create_product(name='Wired headphones', sku='WD-10', price=Decimal('9.00'))
+        self.keyboard = create_product(name='Mechanical keyboard', sku='KB-87', price=Decimal('49.00'))
+        search_index.index_products([self.headphones.pk, self.cheap_headphones.pk, self.keyboard.pk])
+    
+    def search(self, **params):
+        response = self.client.get('/api/products/search/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+    
+    def test_text_and_filters(self):
+        data = self.search(q='headphones', ordering='-price')
+        self.assertEqual(data['count'], 2)
+        self.assertEqual([item['id'] for item in data['results']], [self.headphones.pk, self.cheap_headphones.pk])
+        
+        data = self.search(q='headphones', max_price='50')
+        self.assertEqual([item['id'] for item in data['results']], [self.cheap_headphones.pk])
+        
+        data = self.search(q='KB')
+        self.assertEqual([item['id'] for item in data['results']], [self.keyboard.pk])
+    
+    def test_pagination(self):
+        data = self.search(ordering='price', page_size=2)
+        self.assertEqual(data['count'], 3)
+        self.assertEqual([item['id'] for item in data['results']], [self.cheap_headphones.pk, self.keyboard.pk])
+        self.assertIsNotNone(data['next'])
+        
+        data = self.search(ordering='price', page_size=2, page=2)
+        self.assertEqual([item['id'] for item in data['results']], [self.headphones.pk])
+        self.assertIsNone(data['next'])
+    
+    def test_not_configured(self):
+        with modify_settings(INSTALLED_APPS={'remove': 'django_elasticsearch_dsl'}):
+            response = self.client.get('/api/products/search/')
+        self.assertEqual(response.status_code, 503)
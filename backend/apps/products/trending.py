@@ -0,0 +1,184 @@
+"""
+Time-decayed trending scores.
+
+An event at time t adds `weight * 2 ** ((t - epoch) / TRENDING_HALF_LIFE)`
+to `Product.trending_score` (forward decay): newer events weigh more, and
+comparing stored scores gives the same order as decaying every score to
+now, so nothing has to be rewritten as time passes and `-trending_score`
+is a plain indexed sort. Because the stored values only grow,
+`renormalize_trending_scores` regularly moves the epoch to now and scales
+all scores down by the same factor.
+
+Sales, wishlist adds and flushed view counts are buffered in a Redis hash
+of weights. The `flush_trending_scores` task applies it with one bulk
+UPDATE, taking the growth factor at flush time (off by at most the flush
+interval, which is negligible against the half-life). Flushes and
+renormalization lock the TrendingEpoch row, so a flush never combines the
+old epoch with rescaled scores.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+from redis.exceptions import LockError, ResponseError
+
+from apps.core.db import bulk_increment, bulk_update_from_values
+from apps.core.redis import get_redis
+
+PENDING_KEY = 'trending:pending'
+INFLIGHT_KEY = 'trending:inflight'
+LOCK_KEY = 'trending:flush_lock'
+LOCK_TIMEOUT = 300  # seconds
+
+
+def record_trending(event, counts):
+    """
+    Add `counts` (`{product_id: number of events}`) of an event type from
+    TRENDING_EVENT_WEIGHTS once the current transaction commits.
+    """
+    weight = settings.TRENDING_EVENT_WEIGHTS.get(event)
+    weights = {
+        int(pk): weight * count
+        for pk, count in counts.items()
+        if pk is not None and count
+    } if weight else {}
+    if not weights:
+        return
+    
+    redis = get_redis()
+    if redis is None:
+        # No shared buffer available, write through
+        transaction.on_commit(lambda: apply_trending(weights))
+        return
+    transaction.on_commit(lambda: _buffer(redis, weights))
+
+
+def _buffer(redis, weights):
+    pipeline = redis.pipeline(transaction=False)
+    for pk, weight in weights.items():
+        pipeline.hincrbyfloat(PENDING_KEY, pk, weight)
+    pipeline.execute()
+
+
+def flush_trending_scores():
+    """
+    Apply buffered event weights. Returns the number of products updated.
+    
+    A flush interrupted after its commit applies its batch again on the
+    next run; unlike view counts this is left as is, scores are approximate.
+    """
+    redis = get_redis()
+    if redis is None:
+        return 0
+    
+    lock = redis.lock(LOCK_KEY, timeout=LOCK_TIMEOUT)
+    if not lock.acquire(blocking=False):
+        # Another worker is flushing
+        return 0
+    try:
+        if not redis.exists(INFLIGHT_KEY):
+            try:
+                redis.rename(PENDING_KEY, INFLIGHT_KEY)
+            except ResponseError:
+                # No events since the last flush
+                return 0
+        weights = {int(pk): float(weight) for pk, weight in redis.hgetall(INFLIGHT_KEY).items()}
+        updated = apply_trending(weights)
+        redis.delete(INFLIGHT_KEY)
+        return updated
+    finally:
+        try:
+            lock.release()
+        except LockError:
+            pass
+
+
+def apply_trending(weights):
+    """Add event weights, scaled to the current epoch, to the products."""
+    from .models import Product
+    
+    with transaction.atomic():
+        growth = _growth(_locked_epoch().started_at, timezone.now())
+        return bulk_increment(
+            Product,
+            'trending_score',
+            {pk: weight * growth for pk, weight in weights.items()}
+        )
+
+
+def renormalize_trending_scores():
+    """
+    Move the epoch to now and scale every score by the same factor, so the
+    ordering is unchanged and values stay small. Scores that decayed below
+    TRENDING_MIN_SCORE are reset to zero. Returns the number of products
+    rescaled.
+    """
+    from .models import Product
+    
+    with transaction.atomic():
+        epoch = _locked_epoch()
+        now = timezone.now()
+        scale = 1 / _growth(epoch.started_at, now)
+        rescaled = Product.objects.filter(trending_score__gt=0).update(
+            trending_score=models.F('trending_score') * scale
+        )
+        Product.objects.filter(
+            trending_score__gt=0,
+            trending_score__lt=settings.TRENDING_MIN_SCORE
+        ).update(trending_score=0)
+        epoch.started_at = now
+        epoch.save(update_fields=['started_at'])
+    return rescaled
+
+
+def rebuild_trending_scores(days):
+    """
+    Recompute all scores from the sales and wishlist adds of the last
+    `days` days, with a new epoch. Views are not stored per day and only
+    count again from the next flush. Returns the number of products scored.
+    """
+    from apps.orders.models import OrderItem
+    from .models import Product, Wishlist
+    
+    weights = settings.TRENDING_EVENT_WEIGHTS
+    with transaction.atomic():
+        epoch = _locked_epoch()
+        now = timezone.now()
+        since = now - timedelta(days=days)
+        
+        sales = OrderItem.objects.filter(
+            order__payment_status='completed',
+            order__created_at__gte=since,
+            product__isnull=False
+        ).exclude(
+            status__in=['cancelled', 'refunded']
+        ).values_list('product_id', 'order__created_at', 'quantity')
+        wishlist = Wishlist.objects.filter(added_at__gte=since).values_list('product_id', 'added_at')
+        
+        scores = {}
+        for pk, at, quantity in sales.iterator():
+            scores[pk] = scores.get(pk, 0) + weights.get('sale', 0) * quantity * _growth(now, at)
+        for pk, at in wishlist.iterator():
+            scores[pk] = scores.get(pk, 0) + weights.get('wishlist', 0) * _growth(now, at)
+        
+        Product.objects.filter(trending_score__gt=0).update(trending_score=0)
+        bulk_update_from_values(
+            Product,
+            {pk: {'trending_score': score} for pk, score in scores.items()},
+            ['trending_score']
+        )
+        epoch.started_at = now
+        epoch.save(update_fields=['started_at'])
+    return len(scores)
+
+
+def _growth(epoch, at):
+    return 2 ** ((at - epoch) / settings.TRENDING_HALF_LIFE)
+
+
+def _locked_epoch():
+    from .models import TrendingEpoch
+    
+    TrendingEpoch.objects.get_or_create(pk=1, defaults={'started_at': timezone.now()})
+    return TrendingEpoch.objects.select_for_update().get(pk=1)
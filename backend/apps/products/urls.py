@@ -1,17 +1,19 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
-    CategoryViewSet, ProductViewSet, ProductImageViewSet,
-    WishlistViewSet, PromoCodeView
+    CategoryViewSet, ProductViewSet, ProductImageViewSet, ProductImportViewSet,
+    WishlistViewSet, PromoCodeView, ProductSearchView
 )
 
 router = DefaultRouter()
 router.register(r'categories', CategoryViewSet, basename='category')
 router.register(r'products', ProductViewSet, basename='product')
 router.register(r'images', ProductImageViewSet, basename='product-image')
+router.register(r'imports', ProductImportViewSet, basename='product-import')
 router.register(r'wishlist', WishlistViewSet, basename='wishlist')
 
 urlpatterns = [
+    path('search/', ProductSearchView.as_view(), name='product-search'),
     path('', include(router.urls)),
     path('promo-code/validate/', PromoCodeView.as_view(), name='validate-promo-code'),
 ]
@@ -0,0 +1,100 @@
+"""
+Buffered product view counters.
+
+Detail views only increment a Redis hash. The `flush_product_view_counts`
+Celery task periodically moves the accumulated deltas into
+`Product.view_count` with one bulk UPDATE, so hot products are not
+row-locked on every page view.
+
+The flush is safe to interrupt and retry: the pending hash is atomically
+renamed to an in-flight hash that stays in Redis until the database
+transaction has committed, and every in-flight hash carries a batch id
+that is recorded in `ViewCountFlush` in the same transaction. A retry of a
+batch that was already applied only deletes the leftover hash.
+"""
+import uuid
+from datetime import timedelta
+
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
+from redis.exceptions import LockError, ResponseError
+
+from apps.core.db import bulk_increment
+from apps.core.redis import get_redis
+
+from .trending import record_trending
+
+PENDING_KEY = 'product_views:pending'
+INFLIGHT_KEY = 'product_views:inflight'
+BATCH_FIELD = 'batch'
+LOCK_KEY = 'product_views:flush_lock'
+LOCK_TIMEOUT = 300  # seconds
+
+# Markers only need to outlive any realistic retry of their batch
+FLUSH_MARKER_RETENTION = timedelta(days=1)
+
+
+def record_product_view(product_id):
+    redis = get_redis()
+    if redis is None:
+        # No shared buffer available, write through
+        from .models import Product
+        Product.objects.filter(pk=product_id).update(view_count=models.F('view_count') + 1)
+        return
+    redis.hincrby(PENDING_KEY, product_id, 1)
+
+
+def flush_view_counts():
+    """
+    Apply buffered view counts. Returns the number of products updated.
+    """
+    redis = get_redis()
+    if redis is None:
+        return 0
+    
+    lock = redis.lock(LOCK_KEY, timeout=LOCK_TIMEOUT)
+    if not lock.acquire(blocking=False):
+        # Another worker is flushing
+        return 0
+    try:
+        return _flush(redis)
+    finally:
+        try:
+            lock.release()
+        except LockError:
+            pass
+
+
+def _flush(redis):
+    # A leftover in-flight hash belongs to an interrupted flush, finish it first
+    if not redis.exists(INFLIGHT_KEY):
+        try:
+            redis.rename(PENDING_KEY, INFLIGHT_KEY)
+        except ResponseError:
+            # Nothing has been viewed since the last flush
+            return 0
+    
+    redis.hsetnx(INFLIGHT_KEY, BATCH_FIELD, uuid.uuid4().hex)
+    buffered = redis.hgetall(INFLIGHT_KEY)
+    batch_id = buffered.pop(BATCH_FIELD.encode()).decode()
+    deltas = {int(pk): int(delta) for pk, delta in buffered.items()}
+    
+    updated = _apply_batch(batch_id, deltas)
+    redis.delete(INFLIGHT_KEY)
+    return updated
+
+
+def _apply_batch(batch_id, deltas):
+    from .models import Product, ViewCountFlush
+    
+    try:
+        with transaction.atomic():
+            ViewCountFlush.objects.create(batch_id=batch_id, product_count=len(deltas))
+            updated = bulk_increment(Product, 'view_count', deltas)
+            record_trending('view', deltas)
+    except IntegrityError:
+        # Batch was committed by an earlier attempt
+        return 0
+    
+    ViewCountFlush.objects.filter(created_at__lt=timezone.now() - FLUSH_MARKER_RETENTION).delete()
+    return updated
@@ -1,40 +1,104 @@
 """
 Products app views
 """
-from rest_framework import viewsets, status, views, permissions
+import posixpath
+
+from django.db import transaction
+from django.db.models import Count, Max
+from rest_framework import mixins, viewsets, status, views, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.utils.urls import replace_query_param
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.text import get_valid_filename
+
+from apps.core.db import bulk_update_from_values
+from apps.core.mixins import ConditionalGetMixin, SparseFieldsetQuerysetMixin, ValuesListMixin
+from apps.users.permissions import IsSellerUser
 
-from .models import Category, Product, ProductImage, Wishlist, PromoCode
+from .cache import (
+    CATALOG_VERSION, CATEGORY_TREE_VERSION, WISHLIST_VERSION, CachedListMixin, get_version,
+    product_data_changed, query_signature, strong_etag
+)
+from .category_tree import build_category_tree
+from .facets import compute_facets
+from .filters import ProductFilter, ProductOrderingFilter, ProductSearchFilter
+from .importer import image_prefix
+from .models import Category, Product, ProductImage, ProductImport, Wishlist, PromoCode
+from .promo_codes import PromoCodeError, check_promo_code, check_user_limit
+from .search_index import search_index_enabled
+from .tasks import run_product_import
+from .view_counts import record_product_view
 from .serializers import (
-    CategorySerializer, ProductListSerializer, ProductDetailSerializer,
-    ProductImageSerializer, WishlistSerializer
+    CategorySerializer, ImportImageUploadSerializer, ProductListSerializer, ProductDetailSerializer,
+    ProductImageSerializer, ProductImportSerializer, ProductStockPriceSerializer,
+    PromoCodeValidateSerializer, WishlistSerializer
 )
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ConditionalGetMixin, CachedListMixin, viewsets.ModelViewSet):
     """Category viewset"""
     queryset = Category.objects.all()
+    # Path rewrites of moved subtrees touch updated_at as well
+    conditional_fields = ('updated_at',)
+    conditional_list = True
     serializer_class = CategorySerializer
     permission_classes = [AllowAny]
     filter_backends = [SearchFilter, OrderingFilter]
     search_fields = ['name', 'description']
     ordering_fields = ['name', 'order', 'created_at']
     ordering = ['order', 'name']
+    
+    @action(detail=False, methods=['get'])
+    def tree(self, request):
+        """
+        Nested active category tree with product counts, cached until a
+        category or product changes. Supports If-None-Match.
+        """
+        cache_key = f'category_tree:{get_version(CATEGORY_TREE_VERSION)}'
+        cached = cache.get(cache_key)
+        if cached is None:
+            tree = build_category_tree()
+            cached = {'etag': strong_etag(tree), 'tree': tree}
+            cache.set(cache_key, cached, settings.CATEGORY_TREE_CACHE_TIMEOUT)
+        
+        response = get_conditional_response(request, etag=cached['etag'])
+        if response is None:
+            response = Response(cached['tree'])
+        response['ETag'] = cached['etag']
+        return response
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(
+    ConditionalGetMixin, CachedListMixin, SparseFieldsetQuerysetMixin, ValuesListMixin, viewsets.ModelViewSet
+):
     """Product viewset"""
-    queryset = Product.objects.all()
+    queryset = Product.objects.with_stock_status().select_related(
+        'category', 'seller'
+    ).defer('search_vector')
     serializer_class = ProductListSerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ['category', 'product_type', 'is_active', 'is_approved']
+    filter_backends = [DjangoFilterBackend, ProductSearchFilter, ProductOrderingFilter]
+    filterset_class = ProductFilter
     search_fields = ['name', 'description', 'sku']
-    ordering_fields = ['created_at', 'price', 'sold_count', 'view_count']
+    ordering_fields = ['created_at', 'price', 'sold_count', 'view_count', 'in_stock', 'trending']
     ordering = ['-created_at']
+    # Counters written with F() expressions do not touch updated_at;
+    # view_count is deliberately left out, it changes on every flush.
+    # Images are covered by their latest change and their count (deletes)
+    conditional_fields = (
+        'updated_at', 'category__updated_at', 'seller__email',
+        'stock_quantity', 'available_keys_count', 'sold_count',
+        'rating_average', 'rating_count', 'rating_histogram',
+        Max('images__updated_at'), Count('images'),
+    )
     
     def get_serializer_class(self):
         """Use different serializers for list and detail views"""
@@ -42,20 +106,125 @@ class ProductViewSet(viewsets.ModelViewSet):
             return ProductDetailSerializer
         return ProductListSerializer
     
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related('images')
+        return queryset
+    
     def get_permissions(self):
         """
         Permissions:
         - Anyone can list and retrieve products
         - Only admins can create, update, delete
         """
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'facets', 'related']:
             permission_classes = [AllowAny]
+        elif self.action == 'bulk_update':
+            permission_classes = [IsSellerUser]
         elif self.action in ['create', 'update', 'partial_update', 'destroy']:
             permission_classes = [IsAuthenticated]
         else:
             permission_classes = [IsAuthenticated]
         return [permission() for permission in permission_classes]
     
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """
+        Category, product type, price range and rating counts for the
+        current filter set, computed in one grouped query and cached per
+        catalog version and normalized filter signature.
+        """
+        cache_key = 'product_facets:{}:{}'.format(
+            get_version(CATALOG_VERSION), query_signature(request.query_params)
+        )
+        data = cache.get(cache_key)
+        if data is None:
+            data = compute_facets(self.filter_queryset(self.get_queryset()))
+            cache.set(cache_key, data, settings.PRODUCT_FACETS_CACHE_TIMEOUT)
+        return Response(data)
+    
+    @action(detail=False, methods=['post'], url_path='bulk-update')
+    def bulk_update(self, request):
+        """
+        Update price, compare_at_price and stock of the seller's own products
+        by SKU. Entries are grouped by the fields they set and written with
+        one UPDATE per group and batch; caches are invalidated once.
+        """
+        items = request.data.get('items') if isinstance(request.data, dict) else request.data
+        max_items = settings.PRODUCT_BULK_UPDATE_MAX_ITEMS
+        if not isinstance(items, list) or not items:
+            return Response({'detail': 'Pass a non-empty list of items.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > max_items:
+            return Response(
+                {'detail': f'At most {max_items} items can be updated per request.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        results = {}
+        invalid = []
+        groups = {}
+        for item in items:
+            serializer = ProductStockPriceSerializer(data=item)
+            valid = serializer.is_valid()
+            sku = serializer.validated_data['sku'] if valid else item.get('sku') if isinstance(item, dict) else None
+            if isinstance(sku, str):
+                # A SKU sent twice keeps its last entry
+                for rows in groups.values():
+                    rows.pop(sku, None)
+            if not valid:
+                result = {'sku': sku, 'status': 'invalid', 'errors': serializer.errors}
+                if isinstance(sku, str):
+                    results[sku] = result
+                else:
+                    invalid.append(result)
+                continue
+            values = dict(serializer.validated_data)
+            del values['sku']
+            groups.setdefault(tuple(sorted(values)), {})[sku] = values
+            results[sku] = {'sku': sku, 'status': 'not_found'}
+        
+        updated = {}
+        with transaction.atomic():
+            for fields, rows in groups.items():
+                updated.update(bulk_update_from_values(
+                    Product,
+                    rows,
+                    fields,
+                    key='sku',
+                    filters={'seller_id': request.user.pk},
+                    constants={'updated_at': timezone.now()},
+                    batch_size=settings.PRODUCT_BULK_UPDATE_BATCH_SIZE,
+                ))
+            if updated:
+                product_data_changed(updated.values())
+        
+        for sku in updated:
+            results[sku]['status'] = 'updated'
+        return Response({'updated': len(updated), 'results': [*results.values(), *invalid]})
+    
+    @action(detail=True, methods=['get'])
+    def related(self, request, pk=None):
+        """
+        Products frequently bought together with this one, best first, read
+        from the nightly ProductRelation table.
+        """
+        product = self.get_object()
+        products = self.get_queryset().filter(
+            related_to__product=product,
+            is_active=True,
+            is_approved=True
+        ).order_by('related_to__rank')
+        serializer = ProductListSerializer(products, many=True, context=self.get_serializer_context())
+        return Response(serializer.data)
+    
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            # Buffered in Redis, see apps.products.view_counts
+            record_product_view(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+        return response
+    
     def perform_create(self, serializer):
         """Set seller to current user when creating product as seller"""
         user = self.request.user
@@ -79,24 +248,215 @@ class ProductImageViewSet(viewsets.ModelViewSet):
     ordering = ['order']
 
 
+class ProductImportViewSet(mixins.CreateModelMixin, mixins.ListModelMixin,
+                           mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    Bulk product uploads. A POSTed CSV/JSONL file is imported in the
+    background, the import can be polled for progress and row errors.
+    """
+    serializer_class = ProductImportSerializer
+    
+    def get_queryset(self):
+        """Staff see all imports, sellers only their own"""
+        queryset = ProductImport.objects.select_related('seller')
+        if self.request.user.is_staff:
+            return queryset
+        return queryset.filter(seller=self.request.user)
+    
+    def get_permissions(self):
+        if self.action in ['create', 'resume', 'images']:
+            permission_classes = [IsSellerUser]
+        else:
+            permission_classes = [IsAuthenticated]
+        return [permission() for permission in permission_classes]
+    
+    def perform_create(self, serializer):
+        product_import = serializer.save(seller=self.request.user)
+        transaction.on_commit(lambda: run_product_import.delay(product_import.pk))
+    
+    @action(detail=True, methods=['post'])
+    def resume(self, request, pk=None):
+        """Continue a failed or stale import after its last committed chunk"""
+        product_import = self.get_object()
+        if product_import.status != 'failed' and not product_import.is_stale:
+            return Response(
+                {'detail': 'Only failed imports and running imports that stopped responding can be resumed.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        run_product_import.delay(product_import.pk)
+        return Response(self.get_serializer(product_import).data, status=status.HTTP_202_ACCEPTED)
+    
+    @action(detail=False, methods=['post'])
+    def images(self, request):
+        """
+        Upload images for the `images` column of import files; returns the
+        names to put there.
+        """
+        serializer = ImportImageUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        prefix = image_prefix(request.user.pk)
+        names = [
+            default_storage.save(prefix + get_valid_filename(posixpath.basename(image.name)), image)
+            for image in serializer.validated_data['images']
+        ]
+        return Response({'images': names}, status=status.HTTP_201_CREATED)
+
+
 class WishlistViewSet(viewsets.ModelViewSet):
     """Wishlist viewset"""
     serializer_class = WishlistSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        """Return only current user's wishlist items"""
-        return Wishlist.objects.filter(user=self.request.user)
+        """Return only current user's wishlist items, with the product joins the serializer reads"""
+        return Wishlist.objects.filter(user=self.request.user).select_related(
+            'product__category', 'product__seller'
+        ).defer('product__search_vector')
     
     def perform_create(self, serializer):
         """Set user to current user"""
         serializer.save(user=self.request.user)
+    
+    @action(detail=False, methods=['get'])
+    def ids(self, request):
+        """
+        IDs of all wishlisted products, for marking product cards on the
+        client. The ETag is the user's wishlist version, so revalidation is
+        answered from the cache without touching the database.
+        """
+        version = get_version(WISHLIST_VERSION.format(request.user.pk))
+        etag = f'"wishlist-{version}"'
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            cache_key = f'wishlist_ids:{request.user.pk}:{version}'
+            ids = cache.get(cache_key)
+            if ids is None:
+                ids = sorted(Wishlist.objects.filter(user=request.user).values_list('product_id', flat=True))
+                cache.set(cache_key, ids, settings.WISHLIST_IDS_CACHE_TIMEOUT)
+            response = Response({'ids': ids})
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
 
 
 class PromoCodeView(views.APIView):
-    """Promo code validation view - to be implemented"""
+    """
+    Check a promo code against an order amount for the current user.
+    
+    Nothing is reserved; the code is used with
+    apps.products.promo_codes.redeem_promo_code when the order is placed.
+    """
     permission_classes = [IsAuthenticated]
     
     def post(self, request):
-        return Response({'detail': 'Not implemented'}, status=status.HTTP_501_NOT_IMPLEMENTED)
+        serializer = PromoCodeValidateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        order_amount = serializer.validated_data['order_amount']
+        try:
+            promo, discount = check_promo_code(serializer.validated_data['code'], order_amount)
+            check_user_limit(promo, request.user)
+        except PromoCodeError as exc:
+            return Response({'valid': False, 'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'valid': True,
+            'code': promo.code,
+            'discount_type': promo.discount_type,
+            'discount_value': promo.discount_value,
+            'discount_amount': discount,
+            'final_amount': order_amount - discount,
+        })
+
 
+class ProductSearchView(views.APIView):
+    """
+    Product search served from the Elasticsearch index.
+    
+    Query parameters: q, category, product_type, in_stock, min_price,
+    max_price, ordering, page and page_size.
+    """
+    permission_classes = [AllowAny]
+    ordering_fields = {
+        'price': 'price',
+        'created_at': 'created_at',
+        'sold_count': 'sold_count',
+        'rating': 'rating',
+    }
+    page_size = 20
+    max_page_size = 100
+    # Elasticsearch refuses to page past index.max_result_window
+    max_result_window = 10000
+    
+    def get(self, request):
+        if not search_index_enabled():
+            return Response(
+                {'detail': 'Search index is not configured.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        
+        from elasticsearch_dsl import Q as ES_Q
+        from .documents import ProductDocument
+        
+        params = request.query_params
+        search = ProductDocument.search()
+        
+        text = params.get('q', '').strip()
+        if text:
+            search = search.query(ES_Q(
+                'bool',
+                should=[
+                    ES_Q('multi_match', query=text, fuzziness='AUTO',
+                         fields=['name^3', 'category_path^2', 'description']),
+                    ES_Q('prefix', sku={'value': text, 'boost': 5}),
+                ],
+                minimum_should_match=1
+            ))
+        
+        if params.get('category'):
+            search = search.filter('term', **{'category.id': params['category']})
+        if params.get('product_type'):
+            search = search.filter('term', product_type=params['product_type'])
+        if params.get('in_stock') in ('true', 'false'):
+            search = search.filter('term', in_stock=params['in_stock'] == 'true')
+        price_range = {}
+        if params.get('min_price'):
+            price_range['gte'] = params['min_price']
+        if params.get('max_price'):
+            price_range['lte'] = params['max_price']
+        if price_range:
+            search = search.filter('range', price=price_range)
+        
+        ordering = params.get('ordering', '')
+        if ordering.lstrip('-') in self.ordering_fields:
+            field = self.ordering_fields[ordering.lstrip('-')]
+            search = search.sort({field: {'order': 'desc' if ordering.startswith('-') else 'asc'}}, '_score')
+        elif not text:
+            search = search.sort({'created_at': {'order': 'desc'}})
+        
+        try:
+            page = max(int(params.get('page', 1)), 1)
+            page_size = min(max(int(params.get('page_size', self.page_size)), 1), self.max_page_size)
+        except ValueError:
+            return Response({'detail': 'Invalid page.'}, status=status.HTTP_400_BAD_REQUEST)
+        start = (page - 1) * page_size
+        if start + page_size > self.max_result_window:
+            return Response({'detail': 'Invalid page.'}, status=status.HTTP_404_NOT_FOUND)
+        
+        result = search[start:start + page_size].execute()
+        total = result.hits.total.value
+        
+        results = []
+        for hit in result.hits:
+            item = hit.to_dict()
+            item['score'] = hit.meta.score
+            results.append(item)
+        
+        def page_link(number):
+            return replace_query_param(request.build_absolute_uri(), 'page', number)
+        
+        return Response({
+            'count': total,
+            'next': page_link(page + 1) if start + page_size < min(total, self.max_result_window) else None,
+            'previous': page_link(page - 1) if page > 1 else None,
+            'results': results,
+        })
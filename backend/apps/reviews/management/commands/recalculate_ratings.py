@@ -0,0 +1,83 @@
+"""
+Management command to backfill and verify denormalized product ratings.
+"""
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+from apps.products.models import Product, default_rating_histogram
+from apps.reviews.models import Review
+
+
+class Command(BaseCommand):
+    help = 'Recalculate product rating average, count and histogram from approved reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report products with stale rating data, do not write changes',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of products updated per query',
+        )
+
+    def handle(self, *args, **options):
+        check_only = options['check']
+        batch_size = options['batch_size']
+
+        # One grouped query for all products that have approved reviews
+        star_counts = {
+            f'star_{star}': models.Count('id', filter=models.Q(rating=star))
+            for star in range(1, 6)
+        }
+        expected = {}
+        stats = Review.objects.filter(is_approved=True).values('product_id').annotate(
+            count=models.Count('id'),
+            average=models.Avg('rating'),
+            **star_counts
+        ).order_by()
+        for row in stats.iterator():
+            expected[row['product_id']] = (
+                row['count'],
+                Decimal(str(round(row['average'] or 0, 2))),
+                {str(star): row[f'star_{star}'] for star in range(1, 6)},
+            )
+
+        empty = (0, Decimal('0.00'), default_rating_histogram())
+        stale = []
+        checked = 0
+        products = Product.objects.only(
+            'id', 'rating_count', 'rating_average', 'rating_histogram'
+        ).order_by('pk')
+        for product in products.iterator(chunk_size=batch_size):
+            checked += 1
+            count, average, histogram = expected.get(product.pk, empty)
+            if (product.rating_count, product.rating_average, product.rating_histogram) == (count, average, histogram):
+                continue
+
+            product.rating_count = count
+            product.rating_average = average
+            product.rating_histogram = histogram
+            stale.append(product)
+
+        if check_only:
+            for product in stale:
+                self.stdout.write(self.style.WARNING(
+                    f'Stale rating for product #{product.pk}: '
+                    f'{product.rating_count} reviews, average {product.rating_average}'
+                ))
+        else:
+            with transaction.atomic():
+                Product.objects.bulk_update(
+                    stale,
+                    ['rating_count', 'rating_average', 'rating_histogram'],
+                    batch_size=batch_size,
+                )
+
+        action = 'need updating' if check_only else 'updated'
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {checked} products, {len(stale)} {action}'
+        ))
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.10 on 2026-10-18 02:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['product', '-created_at'], name='reviews_rev_product_d800fc_idx'),
+        ),
+    ]
@@ -1,3 +1,4 @@
+from decimal import Decimal
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from apps.users.models import User
@@ -46,6 +47,7 @@ class Review(models.Model):
         unique_together = ['product', 'user']
         indexes = [
             models.Index(fields=['product', 'is_approved']),
+            models.Index(fields=['product', '-created_at']),
             models.Index(fields=['-created_at']),
         ]
     
@@ -57,6 +59,38 @@ class Review(models.Model):
         if self.order_item and self.order_item.order.payment_status == 'completed':
             self.is_verified_purchase = True
         super().save(*args, **kwargs)
+    
+    @staticmethod
+    def refresh_product_rating(product_id):
+        """
+        Recalculate the denormalized rating columns of a product.
+        
+        Average, count and per-star histogram of approved reviews are
+        computed with a single aggregate query and written with a single
+        UPDATE. Returns the stored values.
+        """
+        star_counts = {
+            f'star_{star}': models.Count('id', filter=models.Q(rating=star))
+            for star in range(1, 6)
+        }
+        stats = Review.objects.filter(
+            product_id=product_id,
+            is_approved=True
+        ).aggregate(
+            count=models.Count('id'),
+            average=models.Avg('rating'),
+            **star_counts
+        )
+        
+        values = {
+            'rating_count': stats['count'],
+            'rating_average': Decimal(str(round(stats['average'] or 0, 2))),
+            'rating_histogram': {
+                str(star): stats[f'star_{star}'] for star in range(1, 6)
+            },
+        }
+        Product.objects.filter(pk=product_id).update(**values)
+        return values
 
 
 class ReviewHelpful(models.Model):
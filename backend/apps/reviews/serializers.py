@@ -0,0 +1,19 @@
+from rest_framework import serializers
+from .models import Review
+
+
+class ReviewSerializer(serializers.ModelSerializer):
+    """Serializer for product reviews."""
+    user_name = serializers.CharField(source='user.email', read_only=True)
+    
+    class Meta:
+        model = Review
+        fields = [
+            'id', 'product', 'user', 'user_name', 'order_item', 'rating', 'title',
+            'comment', 'is_verified_purchase', 'is_approved', 'helpful_count',
+            'created_at', 'updated_at'
+        ]
+        read_only_fields = [
+            'id', 'user', 'user_name', 'is_verified_purchase', 'is_approved',
+            'helpful_count', 'created_at', 'updated_at'
+        ]
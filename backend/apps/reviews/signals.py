@@ -0,0 +1,23 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from apps.products.cache import product_data_changed
+from .models import Review
+
+
+@receiver(post_save, sender=Review)
+def update_product_rating_on_save(sender, instance, created, **kwargs):
+    """
+    Keep product rating aggregates in sync when a review is created,
+    edited or (un)approved.
+    """
+    Review.refresh_product_rating(instance.product_id)
+    product_data_changed([instance.product_id])
+
+
+@receiver(post_delete, sender=Review)
+def update_product_rating_on_delete(sender, instance, **kwargs):
+    """
+    Keep product rating aggregates in sync when a review is deleted.
+    """
+    Review.refresh_product_rating(instance.product_id)
+    product_data_changed([instance.product_id])
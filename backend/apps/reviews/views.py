@@ -1,15 +1,31 @@
 """
 Reviews app views
 """
+from django.db.models import Q
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.filters import OrderingFilter
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
 from .models import Review, ReviewHelpful
+from .serializers import ReviewSerializer
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
-    """Review viewset - to be implemented"""
-    queryset = Review.objects.all()
+class ReviewViewSet(viewsets.ReadOnlyModelViewSet):
+    """Review viewset - read access, writing reviews is to be implemented"""
+    queryset = Review.objects.select_related('user')
+    serializer_class = ReviewSerializer
     permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_fields = ['product', 'rating']
+    ordering_fields = ['created_at', 'rating', 'helpful_count']
+    ordering = ['-created_at']
+    
+    def get_queryset(self):
+        """Approved reviews plus the user's own"""
+        queryset = super().get_queryset()
+        if self.request.user.is_staff:
+            return queryset
+        return queryset.filter(Q(is_approved=True) | Q(user=self.request.user))
@@ -1,10 +1,11 @@
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth import authenticate
+from apps.core.serializers import SparseFieldsetMixin
 from .models import User, SellerProfile
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for User model."""
     
     class Meta:
@@ -23,8 +24,9 @@ class UserSerializer(serializers.ModelSerializer):
         if request and hasattr(request, 'user') and request.user.is_authenticated:
             if request.user.user_type != 'admin':
                 # Regular users can't modify balance and verification status
-                self.fields['balance'].read_only = True
-                self.fields['is_verified'].read_only = True
+                for name in ('balance', 'is_verified'):
+                    if name in self.fields:
+                        self.fields[name].read_only = True
 
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -111,7 +113,7 @@ class SellerProfileSerializer(serializers.ModelSerializer):
         return f"{obj.user.first_name} {obj.user.last_name}"
 
 
-class UserDetailSerializer(serializers.ModelSerializer):
+class UserDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Detailed user serializer with seller profile."""
     seller_profile = SellerProfileSerializer(read_only=True)
     
@@ -131,5 +133,6 @@ class UserDetailSerializer(serializers.ModelSerializer):
         if request and hasattr(request, 'user') and request.user.is_authenticated:
             if request.user.user_type != 'admin':
                 # Regular users can't modify balance and verification status
-                self.fields['balance'].read_only = True
-                self.fields['is_verified'].read_only = True
+                for name in ('balance', 'is_verified'):
+                    if name in self.fields:
+                        self.fields[name].read_only = True
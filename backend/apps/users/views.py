@@ -5,6 +5,8 @@ from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
 from django.contrib.auth import login
+from apps.cart.storage import merge_guest_cart
+from apps.core.mixins import ConditionalGetMixin, SparseFieldsetQuerysetMixin
 from .models import User, SellerProfile
 from .serializers import (
     UserSerializer, UserDetailSerializer, RegisterSerializer,
@@ -14,7 +16,11 @@ from .permissions import IsOwnerOrReadOnly, IsSellerUser
 
 
 class RegisterView(generics.CreateAPIView):
-    """API endpoint for user registration."""
+    """
+    API endpoint for user registration. A guest cart, identified by the
+    session or by the X-Cart-Token header or `cart_token` field, is moved
+    into the new account.
+    """
     queryset = User.objects.all()
     serializer_class = RegisterSerializer
     permission_classes = [permissions.AllowAny]
@@ -23,6 +29,7 @@ class RegisterView(generics.CreateAPIView):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
+        merge_guest_cart(request, user)
         
         # Generate JWT tokens
         refresh = RefreshToken.for_user(user)
@@ -37,7 +44,11 @@ class RegisterView(generics.CreateAPIView):
 
 
 class LoginView(APIView):
-    """API endpoint for user login."""
+    """
+    API endpoint for user login. A guest cart, identified by the session
+    or by the X-Cart-Token header or `cart_token` field, is merged into the
+    user's cart.
+    """
     permission_classes = [permissions.AllowAny]
     serializer_class = LoginSerializer
     
@@ -45,6 +56,7 @@ class LoginView(APIView):
         serializer = LoginSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.validated_data['user']
+        merge_guest_cart(request, user)
         
         # Generate JWT tokens
         refresh = RefreshToken.for_user(user)
@@ -97,7 +109,7 @@ class ChangePasswordView(generics.UpdateAPIView):
         return Response({'detail': 'Password updated successfully.'}, status=status.HTTP_200_OK)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseFieldsetQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for User model."""
     queryset = User.objects.all()
     permission_classes = [permissions.IsAuthenticated]
@@ -137,11 +149,15 @@ class UserViewSet(viewsets.ModelViewSet):
         })
 
 
-class SellerProfileViewSet(viewsets.ModelViewSet):
+class SellerProfileViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for Seller Profile."""
     queryset = SellerProfile.objects.select_related('user').all()
     serializer_class = SellerProfileSerializer
     permission_classes = [permissions.IsAuthenticated]
+    conditional_fields = (
+        'updated_at', 'total_sales', 'rating',
+        'user__email', 'user__first_name', 'user__last_name',
+    )
     
     def get_queryset(self):
         queryset = super().get_queryset()
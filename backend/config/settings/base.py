@@ -4,6 +4,7 @@ Base settings for Marketplace project.
 from pathlib import Path
 from decouple import config
 from datetime import timedelta
+from celery.schedules import crontab
 
 # Build paths inside the project
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -31,6 +32,7 @@ INSTALLED_APPS = [
     'django_elasticsearch_dsl',
     
     # Local apps
+    'apps.core',
     'apps.users',
     'apps.products',
     'apps.orders',
@@ -99,6 +101,14 @@ LANGUAGES = (
 
 LOCALE_PATHS = [BASE_DIR / 'locale']
 
+# PostgreSQL text search configuration per site language
+# (there is no built-in Ukrainian dictionary, so it uses 'simple')
+SEARCH_LANGUAGE_CONFIGS = {
+    'ru': 'russian',
+    'en': 'english',
+    'uk': 'simple',
+}
+
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
@@ -119,7 +129,16 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_RENDERER_CLASSES': [
+        'apps.core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'apps.core.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'apps.core.pagination.KeysetPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -167,6 +186,32 @@ CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes
+CELERY_BEAT_SCHEDULE = {
+    'reconcile-available-key-counts': {
+        'task': 'apps.digital_keys.tasks.reconcile_available_key_counts',
+        'schedule': timedelta(hours=1),
+    },
+    'flush-product-search-index': {
+        'task': 'apps.products.tasks.flush_product_search_index',
+        'schedule': timedelta(seconds=10),
+    },
+    'flush-product-view-counts': {
+        'task': 'apps.products.tasks.flush_product_view_counts',
+        'schedule': timedelta(seconds=30),
+    },
+    'flush-trending-scores': {
+        'task': 'apps.products.tasks.flush_trending_scores',
+        'schedule': timedelta(seconds=60),
+    },
+    'renormalize-trending-scores': {
+        'task': 'apps.products.tasks.renormalize_trending_scores',
+        'schedule': crontab(hour=4, minute=0),
+    },
+    'build-related-products': {
+        'task': 'apps.products.tasks.build_related_products',
+        'schedule': crontab(hour=3, minute=30),
+    },
+}
 
 # Redis Cache
 CACHES = {
@@ -189,6 +234,65 @@ ELASTICSEARCH_DSL = {
         'hosts': config('ELASTICSEARCH_URL', default='localhost:9200')
     },
 }
+# Product changes are queued and sent in bulk by apps.products.tasks
+ELASTICSEARCH_DSL_AUTOSYNC = False
+ELASTICSEARCH_DSL_SIGNAL_PROCESSOR = 'django_elasticsearch_dsl.signals.BaseSignalProcessor'
+PRODUCT_SEARCH_INDEX_BATCH_SIZE = 500
+
+# Product list facets
+PRODUCT_PRICE_FACET_EDGES = [0, 500, 1000, 5000, 10000, 50000]
+PRODUCT_FACETS_CACHE_TIMEOUT = 60  # seconds
+
+# Navigation category tree, invalidated by version bumps on catalog changes
+CATEGORY_TREE_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Anonymous product/category list pages, invalidated by catalog version bumps
+LIST_RESPONSE_CACHE_TIMEOUT = 60 * 10
+LIST_RESPONSE_CACHE_MAX_BYTES = 256 * 1024
+
+# Promo code lookups, redemption always checks the database
+PROMO_CODE_CACHE_TIMEOUT = 30
+
+# Bulk generated campaign codes: random symbols per code, codes written per
+# transaction and codes checked for existence per query
+PROMO_CODE_GENERATION_LENGTH = 10
+PROMO_CODE_GENERATION_CHUNK_SIZE = 50000
+PROMO_CODE_GENERATION_EXISTS_BATCH_SIZE = 10000
+
+# Guest carts live in this storage (one Redis hash per session) until login
+CART_GUEST_STORAGE = 'apps.cart.storage.RedisCartStorage'
+GUEST_CART_TTL = 60 * 60 * 24 * 14  # seconds since the last change
+
+# Per-user wishlisted product ids, invalidated by a per-user version
+WISHLIST_IDS_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Bulk product imports, rows written per transaction
+PRODUCT_IMPORT_CHUNK_SIZE = 1000
+PRODUCT_IMPORT_MAX_STORED_ERRORS = 1000
+# Every committed chunk is a heartbeat; a task cannot outlive its time
+# limit, so a running import silent for longer was killed and may be resumed
+PRODUCT_IMPORT_STALE_AFTER = CELERY_TASK_TIME_LIMIT
+# The images column may only name files a seller uploaded below this prefix
+PRODUCT_IMPORT_IMAGE_PREFIX = 'imports/images/{seller_id}/'
+
+# Seller price/stock sync endpoint, entries per request and per UPDATE
+PRODUCT_BULK_UPDATE_MAX_ITEMS = 5000
+PRODUCT_BULK_UPDATE_BATCH_SIZE = 1000
+
+# "Frequently bought together", rebuilt nightly from paid order lines
+RELATED_PRODUCTS_TOP_K = 20
+RELATED_PRODUCTS_MIN_SUPPORT = 2  # orders a pair must share
+RELATED_PRODUCTS_CHUNK_SIZE = 100000  # order lines read at a time
+RELATED_PRODUCTS_WRITE_BATCH_SIZE = 5000
+
+# Trending scores: event weights halve every TRENDING_HALF_LIFE
+TRENDING_HALF_LIFE = timedelta(days=3)
+TRENDING_EVENT_WEIGHTS = {
+    'sale': 1.0,
+    'wishlist': 0.25,
+    'view': 0.02,
+}
+TRENDING_MIN_SCORE = 1e-6
 
 # File Upload Settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
@@ -196,6 +300,13 @@ DATA_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
 ALLOWED_IMAGE_TYPES = ['image/jpeg', 'image/png', 'image/webp']
 MAX_UPLOAD_SIZE = 5242880  # 5MB
 
+# Resized product image copies generated after upload
+PRODUCT_IMAGE_DERIVATIVE_WIDTHS = [160, 320, 640, 1280]
+PRODUCT_IMAGE_DERIVATIVE_FORMATS = {
+    'webp': {'quality': 80, 'method': 4},
+    'jpeg': {'quality': 82, 'optimize': True, 'progressive': True},
+}
+
 # Email Configuration (configure for production)
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 DEFAULT_FROM_EMAIL = 'noreply@marketplace.com'